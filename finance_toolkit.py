@@ -1,8 +1,16 @@
 import tkinter as tk
 from tkinter import filedialog
-from tkinter import ttk, messagebox
-import csv
-import os, datetime
+from tkinter import ttk, messagebox, simpledialog
+import csv, json, io
+import os, datetime, calendar, math, threading, uuid, zlib, atexit, sys, weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import islice, chain
+import heapq
+from collections import deque
 
 # ---------- Optional libraries ----------
 try:
@@ -14,14 +22,35 @@ except Exception:
     OPENPYXL_AVAILABLE = False
 
 try:
+    # Figures are built directly (no pyplot), so no global backend is selected: screens embed them
+    # through FigureCanvasTkAgg and headless renders go through FigureCanvasAgg
     import matplotlib
-    matplotlib.use("TkAgg")
     from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
     from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     MATPLOTLIB_AVAILABLE = True
 except Exception:
     MATPLOTLIB_AVAILABLE = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
 # ---------- Theme ----------
 PRIMARY_BG = "#1D3557"   # Main screen background
 SIDEBAR_BG = "#1A2C4A"   # Sidebar + buttons
@@ -36,50 +65,2386 @@ TABLE_HEADER_FILL = "2563EB"
 REPORTS_DIR = "FinanceReports"
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# ---------- Money ----------
+# MONEY_MODE "float" keeps ledger amounts as rupee floats; "paise" stores exact int64 paise.
+# ROUNDING_POLICY is the projection default: "float", or integer-paise fixed point with
+# interest credited monthly and rounded "half_up" or "half_even" like a bank statement.
+# Both come from FinanceReports/settings.json, then the FINANCE_MONEY_MODE / FINANCE_ROUNDING
+# environment variables, then --money-mode / --rounding (see configure()).
+MONEY_MODE = "float"
+ROUNDING_POLICY = "float"
+MONEY_MODES = ("float", "paise")
+ROUNDING_POLICIES = ("float", "half_up", "half_even")
+ROUNDING_LABELS = {"Unrounded": "float", "Paise, half up": "half_up", "Paise, half even": "half_even"}
+SETTINGS_PATH = os.path.join(REPORTS_DIR, "settings.json")
+
+def load_settings(path=SETTINGS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    # A malformed file raises ValueError (JSONDecodeError is one) for the caller to report
+    if not isinstance(data, dict):
+        raise ValueError("Settings must be a JSON object")
+    return {"money_mode": os.environ.get("FINANCE_MONEY_MODE") or data.get("money_mode", MONEY_MODE),
+            "rounding": os.environ.get("FINANCE_ROUNDING") or data.get("rounding", ROUNDING_POLICY)}
+
+def configure(money_mode=None, rounding=None):
+    # Set the process-wide money mode and default rounding policy; None leaves one unchanged.
+    # Worker processes are started with the parent's values through this as their initializer.
+    global MONEY_MODE, ROUNDING_POLICY
+    if money_mode is not None and money_mode not in MONEY_MODES:
+        raise ValueError(f"Money mode must be one of {', '.join(MONEY_MODES)}")
+    if rounding is not None and rounding not in ROUNDING_POLICIES:
+        raise ValueError(f"Rounding policy must be one of {', '.join(ROUNDING_POLICIES)}")
+    MONEY_MODE = money_mode or MONEY_MODE
+    ROUNDING_POLICY = rounding or ROUNDING_POLICY
+
+def to_paise(x, rounding=ROUND_HALF_UP):
+    if isinstance(x, int):
+        return x*100
+    return int((Decimal(str(x).strip()) * 100).quantize(Decimal(1), rounding=rounding))
+
+def format_paise(p):
+    sign = "-" if p < 0 else ""
+    rupees, paise = divmod(abs(int(p)), 100)
+    return f"₹{sign}{rupees:,}.{paise:02d}"
+
+def ledger_amount(x):
+    return to_paise(x) if MONEY_MODE == "paise" else float(x)
+
+def ledger_amount_header():
+    return "Amount (paise)" if MONEY_MODE == "paise" else "Amount"
+
+def format_amount(x):
+    return format_paise(x) if MONEY_MODE == "paise" else format_currency(x)
+
+def ledger_unit():
+    return "paise" if MONEY_MODE == "paise" else "rupees"
+
+def in_money_mode(amount, unit="rupees"):
+    # An amount saved in unit expressed in the current MONEY_MODE, so data written under one
+    # mode reads correctly under the other
+    if unit == ledger_unit():
+        return amount
+    return to_paise(amount) if MONEY_MODE == "paise" else amount/100
+
+def ledger_entry(e):
+    # Ledger row or rule in the current MONEY_MODE; rows saved before units were recorded are rupees
+    unit = e.get("unit", "rupees")
+    if unit == ledger_unit():
+        return e
+    return dict(e, amount=in_money_mode(e["amount"], unit), unit=ledger_unit())
+
+def ledger_totals(entries):
+    # Single pass; int paise sums are exact and no slower than float sums
+    income = expense = 0 if MONEY_MODE == "paise" else 0.0
+    for e in entries:
+        if e["type"] == "Income": income += e["amount"]
+        elif e["type"] == "Expense": expense += e["amount"]
+    return income, expense
+
+def _rate_ratio(annual_pct, periods=12):
+    # Exact rational periodic rate num/den from the decimal string the user typed
+    num, den = Decimal(str(annual_pct)).as_integer_ratio()
+    return num, den*100*periods
+
+def _credit_interest(balance_p, num, den, policy):
+    q, r = divmod(balance_p*num, den)
+    if 2*r > den or (2*r == den and (policy == "half_up" or q % 2)):
+        q += 1
+    return q
+
 # ---------- Helpers ----------
 def format_currency(x):
+    if isinstance(x, Decimal):
+        return f"₹{x:,.2f}"
     try:
         return f"₹{float(x):,.2f}"
     except Exception:
         return x
 
+def format_compact(x):
+    if abs(x) >= 1e7: return f"{x/1e7:,.1f}Cr"
+    if abs(x) >= 1e5: return f"{x/1e5:,.1f}L"
+    return f"{x:,.0f}"
+
 def today_str():
     return datetime.date.today().strftime("%Y-%m-%d")
 
+REPORT_FILETYPES = [("Excel files","*.xlsx"),("CSV files","*.csv")]
+COLUMNAR_FILETYPES = [("Parquet files","*.parquet"),("Arrow IPC files","*.arrow")]
+ARROW_BATCH_ROWS = 65536      # rows per record batch / Parquet row group
+ARROW_COMPRESSION = "zstd"
+
+def report_filetypes():
+    return REPORT_FILETYPES + (COLUMNAR_FILETYPES if PYARROW_AVAILABLE else [])
+
+def split_summary(rows):
+    # Reports are a typed table, then a blank row, then "label, value" summary rows
+    for i, r in enumerate(rows):
+        if not r:
+            return list(rows[:i]), [list(x) for x in rows[i+1:] if x]
+    return list(rows), []
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _arrow_type(header, values):
+    present = [v for v in values if v is not None and v != ""]
+    if not present:
+        return pa.string()
+    if header.lower() == "date":
+        try:
+            for v in present:
+                if not isinstance(v, datetime.date):
+                    datetime.date.fromisoformat(v)
+            return pa.date32()
+        except (TypeError, ValueError):
+            pass
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return pa.int64()
+    if all(_is_number(v) for v in present):
+        return pa.float64()
+    return pa.string()
+
+def _arrow_value(v, typ):
+    if v is None or v == "":
+        return None
+    if typ == pa.date32():
+        return v if isinstance(v, datetime.date) else datetime.date.fromisoformat(v)
+    if typ == pa.string():
+        return str(v)
+    return v
+
+def _columns(headers, rows):
+    return [[r[i] if i < len(r) else None for r in rows] for i in range(len(headers))]
+
+def _arrow_batch(cols, schema):
+    return pa.record_batch(
+        [pa.array([_arrow_value(v, f.type) for v in c], type=f.type) for c, f in zip(cols, schema)],
+        schema=schema)
+
+def _columnar_writer(filename, schema):
+    if filename.lower().endswith(".parquet"):
+        return pq.ParquetWriter(filename, schema, compression=ARROW_COMPRESSION)
+    opts = pa.ipc.IpcWriteOptions(compression=ARROW_COMPRESSION)
+    return pa.ipc.new_file(filename, schema, options=opts)
+
+def write_columnar(filename, headers, rows):
+    table_rows, summary = split_summary(rows)
+    cols = _columns(headers, table_rows)
+    schema = pa.schema([pa.field(str(h), _arrow_type(h, c)) for h, c in zip(headers, cols)],
+                       metadata={"summary": json.dumps(summary, default=str)})
+    with _columnar_writer(filename, schema) as w:
+        for start in range(0, len(table_rows), ARROW_BATCH_ROWS):
+            w.write_batch(_arrow_batch([c[start:start+ARROW_BATCH_ROWS] for c in cols], schema))
+    return filename
+
+@contextmanager
+def atomic_path(filename):
+    # Write to a private temp name beside the target and rename it into place in one step,
+    # so concurrent exports to the same report never leave a torn or interleaved file
+    root, ext = os.path.splitext(filename)
+    tmp = f"{root}.{os.getpid()}-{threading.get_ident()}.tmp{ext}"
+    try:
+        yield tmp
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _report_target(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".parquet", ".arrow") and not PYARROW_AVAILABLE:
+        return os.path.splitext(filename)[0] + ".csv", ".csv"
+    return filename, ext
+
+def _header_cells(ws, headers):
+    # Styled header row for a write-only sheet (cells can't be restyled once appended)
+    from openpyxl.cell import WriteOnlyCell
+    bold = Font(bold=True)
+    fill = PatternFill(start_color=TABLE_HEADER_FILL, end_color=TABLE_HEADER_FILL, fill_type="solid")
+    head = []
+    for h in headers:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.font = bold; cell.fill = fill; cell.alignment = Alignment(horizontal="center")
+        head.append(cell)
+    return head
+
+def _stream_type(header, values, int_columns):
+    # The schema is fixed from the first batch, so a numeric column is float64 unless the caller
+    # declares it integral: a later 2.5 in an int64 column would be truncated to 2
+    typ = _arrow_type(header, values)
+    return pa.float64() if typ == pa.int64() and header not in int_columns else typ
+
+def stream_report(filename, headers, rows, int_columns=()):
+    # write_report for a (possibly huge) iterable of table rows, held ARROW_BATCH_ROWS at a time.
+    # int_columns names the columns that only ever hold integers (Year, Rank).
+    filename, ext = _report_target(filename)
+    rows = iter(rows)
+    with atomic_path(filename) as tmp:
+        if ext in (".parquet", ".arrow"):
+            chunk = list(islice(rows, ARROW_BATCH_ROWS))
+            cols = _columns(headers, chunk)
+            schema = pa.schema([pa.field(str(h), _stream_type(h, c, int_columns)) for h, c in zip(headers, cols)])
+            with _columnar_writer(tmp, schema) as w:
+                while chunk:
+                    w.write_batch(_arrow_batch(_columns(headers, chunk), schema))
+                    chunk = list(islice(rows, ARROW_BATCH_ROWS))
+        elif OPENPYXL_AVAILABLE and ext == ".xlsx":
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet()
+            ws.append(_header_cells(ws, headers))
+            for r in rows:
+                ws.append(r)
+            wb.save(tmp)
+        else:
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(headers)
+                w.writerows(rows)
+    return filename
+
+def write_report(filename, headers, rows):
+    filename, ext = _report_target(filename)
+    with atomic_path(filename) as tmp:
+        if ext in (".parquet", ".arrow"):
+            write_columnar(tmp, headers, rows)
+        elif OPENPYXL_AVAILABLE and ext == ".xlsx":
+            wb = Workbook()
+            ws = wb.active
+            ws.append(headers)
+            for r in rows:
+                ws.append(r)
+            bold = Font(bold=True)
+            fill = PatternFill(start_color=TABLE_HEADER_FILL, end_color=TABLE_HEADER_FILL, fill_type="solid")
+            for c in range(1, len(headers)+1):
+                cell = ws.cell(row=1, column=c)
+                cell.font = bold
+                cell.fill = fill
+                cell.alignment = Alignment(horizontal="center")
+            for i, col in enumerate(ws.columns, start=1):
+                max_len = max(len(str(cell.value)) if cell.value else 0 for cell in col)
+                ws.column_dimensions[get_column_letter(i)].width = max_len + 4
+            wb.save(tmp)
+        else:
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(headers)
+                for r in rows:
+                    w.writerow(r)
+    return filename
+
 def save_to_excel_or_csv(default_name, headers, rows):
     filename = filedialog.asksaveasfilename(
         defaultextension=".xlsx" if OPENPYXL_AVAILABLE else ".csv",
         initialfile=default_name,
-        filetypes=[("Excel files","*.xlsx"),("CSV files","*.csv")]
+        filetypes=report_filetypes()
     )
     if not filename:
         return None
-    if OPENPYXL_AVAILABLE and filename.endswith(".xlsx"):
-        wb = Workbook()
-        ws = wb.active
-        ws.append(headers)
+    return write_report(filename, headers, rows)
+
+def load_report(filename):
+    # Returns (headers, table rows, summary rows) for any format write_report produces
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".parquet", ".arrow"):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Install pyarrow to read Parquet/Arrow files.")
+        if ext == ".parquet":
+            table = pq.read_table(filename)
+        else:
+            with pa.memory_map(filename) as src:
+                table = pa.ipc.open_file(src).read_all()
+        meta = table.schema.metadata or {}
+        summary = json.loads(meta.get(b"summary", b"[]"))
+        cols = [table.column(i).to_pylist() for i in range(table.num_columns)]
+        return table.column_names, [list(r) for r in zip(*cols)], summary
+    if ext == ".xlsx":
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("Install openpyxl to read Excel files.")
+        from openpyxl import load_workbook
+        wb = load_workbook(filename, read_only=True, data_only=True)
+        raw = [list(r) for r in wb.active.iter_rows(values_only=True)]
+        wb.close()
+        raw = [[] if all(v is None for v in r) else r for r in raw]
+    else:
+        with open(filename, newline="", encoding="utf-8") as f:
+            raw = [r if any(r) else [] for r in csv.reader(f)]
+    if not raw:
+        return [], [], []
+    table_rows, summary = split_summary(raw[1:])
+    return list(raw[0]), table_rows, summary
+
+# ---------- Projection engines ----------
+# Rates and inflation are annual %. Anywhere one is accepted, a schedule also works:
+# one value per year (a shorter list holds its last value) or one per month (years*12).
+SCHEDULE_HINT = "Return / inflation accept a yearly glide path, e.g. 12, 11, 10, 9, 8"
+
+def is_schedule(x):
+    return not isinstance(x, (int, float, Decimal))
+
+def parse_schedule(text):
+    vals = [float(v) for v in str(text).replace(";", ",").split(",") if v.strip()]
+    if not vals: raise ValueError("empty rate")
+    return vals[0] if len(vals) == 1 else vals
+
+def rate_schedule(rate, years):
+    # Annual % for each of the years*12 months
+    if not is_schedule(rate):
+        return [rate]*(years*12)
+    rate = list(rate)
+    if len(rate) == years*12:
+        return rate
+    if 0 < len(rate) <= years:
+        rate = rate + [rate[-1]]*(years - len(rate))
+        return [r for r in rate for _ in range(12)]
+    raise ValueError(f"Schedule needs 1..{years} yearly or {years*12} monthly values, got {len(rate)}")
+
+def growth_factors(rate, years):
+    # Cumulative product of monthly growth: G[m] = prod(1 + r_k/12/100 for k <= m)
+    monthly = rate_schedule(rate, years)
+    if NUMPY_AVAILABLE:
+        return np.cumprod(1 + np.asarray(monthly, dtype=float)/12/100)
+    out, g = [], 1.0
+    for r in monthly:
+        g *= 1 + r/12/100
+        out.append(g)
+    return out
+
+def price_index(inflation, years):
+    # Year-end cumulative price level P[y] for y = 0..years-1 (monthly values compound to the year)
+    if not is_schedule(inflation):
+        return [(1+inflation/100)**(y+1) for y in range(years)]
+    inflation = list(inflation)
+    if len(inflation) == years*12:
+        yearly = [1.0]*years
+        for m, i in enumerate(inflation):
+            yearly[m//12] *= (1+i/100)**(1/12)
+    else:
+        yearly = [1+i/100 for i in rate_schedule(inflation, years)[::12]]
+    out, p = [], 1.0
+    for f in yearly:
+        p *= f
+        out.append(p)
+    return out
+
+def inflation_adjust(fv_by_year, inflation):
+    # Each year's value expressed in the money of the final year; returns (by_year, total)
+    years = len(fv_by_year)
+    if not is_schedule(inflation):
+        return ([fv_by_year[i]/((1+inflation/100)**(years-i-1)) for i in range(years)],
+                fv_by_year[-1] / ((1+inflation/100)**years))
+    p = price_index(inflation, years)
+    return [fv_by_year[i]*p[i]/p[-1] for i in range(years)], fv_by_year[-1]/p[-1]
+
+def annuity_factor(rate, years):
+    # Value at the horizon of 1 ₹ paid at the end of every month: sum(G[n-1] / G[m])
+    g = growth_factors(rate, years)
+    if NUMPY_AVAILABLE:
+        return float(g[-1]), float(np.sum(g[-1]/g))
+    return g[-1], sum(g[-1]/x for x in g)
+
+def _contributions(sip, years, step_up):
+    return [sip*((1+step_up/100)**y) for y in range(years)]
+
+def project_sip(sip, years, rate, step_up=0.0, start=0.0, rounding=None):
+    # Month-by-month SIP from an opening balance; returns (invested_by_year, fv_by_year)
+    rounding = rounding or ROUNDING_POLICY
+    invested_by_year = [0.0]*years
+    fv_by_year = [0.0]*years
+    if rounding == "float" and is_schedule(rate):
+        return _project_sip_schedule(sip, years, rate, step_up, start)
+    if rounding == "float":
+        monthly_rate = rate/12/100
+        fv = start
+        for m in range(years*12):
+            y = m//12
+            monthly = sip*((1+step_up/100)**y)
+            fv = fv*(1+monthly_rate) + monthly
+            invested_by_year[y] += monthly
+            if (m+1)%12 == 0: fv_by_year[y] = fv
+        return invested_by_year, fv_by_year
+    if rounding not in ROUNDING_POLICIES:
+        raise ValueError(f"Unknown rounding policy {rounding!r}")
+    ratios = {}
+    schedule = rate_schedule(rate, years)
+    fv_p = to_paise(start)
+    for y, monthly in enumerate(_contributions(sip, years, step_up)):
+        monthly_p = to_paise(monthly)
+        for r in schedule[y*12:(y+1)*12]:
+            if r not in ratios: ratios[r] = _rate_ratio(r)
+            num, den = ratios[r]
+            fv_p += _credit_interest(fv_p, num, den, rounding) + monthly_p
+        invested_by_year[y] = monthly_p*12/100
+        fv_by_year[y] = fv_p/100
+    return invested_by_year, fv_by_year
+
+def _project_sip_schedule(sip, years, rate, step_up, start):
+    # fv[m] = G[m] * (start + sum(c[k] / G[k], k <= m)), so one cumprod + one cumsum
+    yearly = _contributions(sip, years, step_up)
+    g = growth_factors(rate, years)
+    if NUMPY_AVAILABLE:
+        c = np.repeat(np.asarray(yearly, dtype=float), 12)
+        fv = g * (start + np.cumsum(c/g))
+        return [m*12 for m in yearly], fv[11::12].tolist()
+    fv_by_year, acc = [], start
+    for m, gm in enumerate(g):
+        acc += yearly[m//12]/gm
+        if (m+1)%12 == 0: fv_by_year.append(gm*acc)
+    return [m*12 for m in yearly], fv_by_year
+
+def loan_emi(principal, annual_rate, years):
+    # Discounted form: (1+r)^-n underflows to 0 on very long tenures (EMI → interest only)
+    # where (1+r)^n would overflow
+    n = years*12
+    r = annual_rate/12/100
+    if r == 0:
+        return principal/n
+    return principal * r / (1 - (1+r)**-n)
+
+# ---------- Tax ----------
+# Income-tax slabs as (lower bound ₹, marginal %) plus the rebate (income limit, max rebate);
+# "relief" caps tax just above the rebate limit at the income over it (new regime marginal relief)
+TAX_REGIMES = {
+    "new": {"slabs": ((0, 0), (400000, 5), (800000, 10), (1200000, 15), (1600000, 20),
+                      (2000000, 25), (2400000, 30)),
+            "rebate": (1200000, 60000), "relief": True},
+    "old": {"slabs": ((0, 0), (250000, 5), (500000, 20), (1000000, 30)),
+            "rebate": (500000, 12500), "relief": False},
+}
+TAX_REGIME = "new"
+HEALTH_CESS = 4.0
+# Capital gains on redemption: months held before a lot is long-term (None = never), LTCG / STCG %
+# (None = added to income and taxed at slab), yearly LTCG exemption, and whether the long-term
+# cost is indexed (cost grown by the projected inflation, standing in for the Cost Inflation Index)
+CAPITAL_GAINS = {
+    "Equity":  {"long_after": 12, "ltcg": 12.5, "stcg": 20.0, "exempt": 125000, "indexed": False},
+    "Debt":    {"long_after": None, "ltcg": None, "stcg": None, "exempt": 0, "indexed": False},
+    "Gold":    {"long_after": 24, "ltcg": 12.5, "stcg": None, "exempt": 0, "indexed": False},
+    "Indexed": {"long_after": 24, "ltcg": 20.0, "stcg": None, "exempt": 0, "indexed": True},
+}
+TAX_TREATMENTS = ("None",) + tuple(CAPITAL_GAINS)
+
+def _slab_table(regime):
+    # Bounds, marginal rates and tax already due at each bound, so tax(x) is one lookup
+    bounds, rates = zip(*TAX_REGIMES[regime]["slabs"])
+    base = [0.0]
+    for k in range(1, len(bounds)):
+        base.append(base[-1] + (bounds[k] - bounds[k-1])*rates[k-1]/100)
+    return bounds, rates, tuple(base)
+
+SLAB_TABLES = {regime: _slab_table(regime) for regime in TAX_REGIMES}
+MAX_TAX_SHARE = (1 + HEALTH_CESS/100) * max(
+    [r for b, r in TAX_REGIMES["new"]["slabs"] + TAX_REGIMES["old"]["slabs"]] +
+    [c[k] for c in CAPITAL_GAINS.values() for k in ("ltcg", "stcg") if c[k] is not None]) / 100
+
+def _clip0(x):
+    return np.maximum(x, 0.0) if is_schedule(x) else max(x, 0.0)
+
+def income_tax(income, regime=None):
+    # Slab tax with rebate and cess; income may be a number or a numpy array
+    regime = regime or TAX_REGIME
+    bounds, rates, base = SLAB_TABLES[regime]
+    limit, rebate = TAX_REGIMES[regime]["rebate"]
+    if is_schedule(income):
+        x = np.maximum(np.asarray(income, dtype=float), 0.0)
+        i = np.searchsorted(bounds, x, side="right") - 1
+        tax = np.asarray(base)[i] + (x - np.asarray(bounds)[i])*np.asarray(rates)[i]/100
+        tax = np.where(x <= limit, np.maximum(tax - rebate, 0.0), tax)
+        if TAX_REGIMES[regime]["relief"]:
+            tax = np.where(x > limit, np.minimum(tax, x - limit), tax)
+    else:
+        x = max(float(income), 0.0)
+        i = bisect_right(bounds, x) - 1
+        tax = base[i] + (x - bounds[i])*rates[i]/100
+        if x <= limit:
+            tax = max(tax - rebate, 0.0)
+        elif TAX_REGIMES[regime]["relief"]:
+            tax = min(tax, x - limit)
+    return tax*(1 + HEALTH_CESS/100)
+
+def capital_gains_tax(lt_gain, st_gain, asset, other_income=0.0, regime=None):
+    # Tax on one year's redemptions; gains may be numbers or numpy arrays of the same shape
+    rules = CAPITAL_GAINS[asset]
+    special, at_slab = 0.0, 0.0
+    if rules["ltcg"] is None:
+        at_slab = at_slab + _clip0(lt_gain)
+    else:
+        special = special + _clip0(lt_gain - rules["exempt"])*rules["ltcg"]/100
+    if rules["stcg"] is None:
+        at_slab = at_slab + _clip0(st_gain)
+    else:
+        special = special + _clip0(st_gain)*rules["stcg"]/100
+    tax = special*(1 + HEALTH_CESS/100)
+    if rules["ltcg"] is None or rules["stcg"] is None:
+        tax = tax + income_tax(other_income + at_slab, regime) - income_tax(other_income, regime)
+    return tax
+
+def _monthly_index(inflation, years):
+    # Price level at the end of each month; each year's inflation compounds over its 12 months
+    out, p = [], 1.0
+    for i in rate_schedule(inflation, years):
+        p *= (1 + i/100)**(1/12)
+        out.append(p)
+    return out
+
+def redemption_table(sip, years, rate, step_up=0.0, start=0.0, asset="Equity", inflation=0.0):
+    # What selling everything at each year end would realise: value, cost, and the long-term part
+    # (value, cost, indexed cost). The lot bought in month k is worth c[k]*G[n]/G[k] at month n,
+    # so running sums of c/G, c and c/I answer every year end without revisiting lots. The opening
+    # balance is one lot bought at month 0 at its current value.
+    held = CAPITAL_GAINS[asset]["long_after"]
+    held = years*12 + 1 if held is None else held
+    yearly = _contributions(sip, years, step_up)
+    g = growth_factors(rate, years)
+    idx = _monthly_index(inflation, years)
+    s_g, s_c, s_i = [0.0], [0.0], [0.0]          # prefix sums over lots 0..k-1
+    for m in range(years*12):
+        c = yearly[m//12]
+        s_g.append(s_g[-1] + c/g[m]); s_c.append(s_c[-1] + c); s_i.append(s_i[-1] + c/idx[m])
+    table = {k: [] for k in ("value", "cost", "lt_value", "lt_cost", "lt_indexed")}
+    for y in range(years):
+        n = y*12 + 11
+        lt = max(n - held + 1, 0)                # lots 0..lt-1 held at least `held` months
+        opening = n + 1 >= held
+        table["value"].append(g[n]*(start + s_g[n+1]))
+        table["cost"].append(start + s_c[n+1])
+        table["lt_value"].append(g[n]*(start*opening + s_g[lt]))
+        table["lt_cost"].append(start*opening + s_c[lt])
+        table["lt_indexed"].append(idx[n]*(start*opening + s_i[lt]))
+    return table
+
+def realised_gains(table, asset):
+    # (long-term, short-term) gains from redemption_table columns, lists or arrays
+    lt_basis = table["lt_indexed"] if CAPITAL_GAINS[asset]["indexed"] else table["lt_cost"]
+    if NUMPY_AVAILABLE:
+        t = {k: np.asarray(v, dtype=float) for k, v in table.items()}
+        lt_basis = np.asarray(lt_basis, dtype=float)
+        return t["lt_value"] - lt_basis, (t["value"] - t["lt_value"]) - (t["cost"] - t["lt_cost"])
+    return ([v - b for v, b in zip(table["lt_value"], lt_basis)],
+            [v - lv - (c - lc) for v, lv, c, lc in
+             zip(table["value"], table["lt_value"], table["cost"], table["lt_cost"])])
+
+def post_tax_values(sip, years, rate, asset, step_up=0.0, start=0.0, inflation=0.0,
+                    other_income=0.0, regime=None):
+    # Tax due and net proceeds if the whole corpus were redeemed at each year end
+    if asset in (None, "None"):
+        _inv, fv = project_sip(sip, years, rate, step_up, start)
+        return [0.0]*years, fv
+    table = redemption_table(sip, years, rate, step_up, start, asset, inflation)
+    lt, st = realised_gains(table, asset)
+    if NUMPY_AVAILABLE:
+        tax = capital_gains_tax(lt, st, asset, other_income, regime).tolist()
+    else:
+        tax = [capital_gains_tax(a, b, asset, other_income, regime) for a, b in zip(lt, st)]
+    return tax, [v - t for v, t in zip(table["value"], tax)]
+
+def fire_required_sip_after_tax(target, current, years, rate, asset, other_income=0.0, regime=None):
+    # Monthly SIP whose corpus, net of tax on redeeming it all, reaches target. Every column of
+    # redemption_table is linear in the SIP, so two tables price any SIP without re-projecting.
+    base = redemption_table(0.0, years, rate, start=current, asset=asset)
+    unit = redemption_table(1.0, years, rate, asset=asset)
+    base, unit = {k: v[-1] for k, v in base.items()}, {k: v[-1] for k, v in unit.items()}
+    def net(sip):
+        t = {k: [base[k] + sip*unit[k]] for k in base}
+        lt, st = realised_gains(t, asset)
+        return t["value"][0] - capital_gains_tax(float(lt[0]), float(st[0]), asset, other_income, regime)
+    if net(0.0) >= target:
+        return 0.0
+    return _solve_increasing(net, target, 0.0, max(target/(1 - MAX_TAX_SHARE)/unit["value"], 1.0))
+
+def slab_gain_table(other_income=0.0, regime=None):
+    # Extra slab tax on gains x added to other income, at every x where its slope changes
+    # (slab bounds, rebate limit, end of marginal relief); linear in between, so np.interp over
+    # this table is exact
+    regime = regime or TAX_REGIME
+    bounds, _rates, _base = SLAB_TABLES[regime]
+    limit = TAX_REGIMES[regime]["rebate"][0]
+    kinks = set(bounds) | {limit}
+    if TAX_REGIMES[regime]["relief"]:
+        lo, hi = float(limit), float(limit)*2
+        for _ in range(60):                      # where relief stops binding
+            mid = (lo + hi)/2
+            plain = income_tax(mid + 1e-9, regime) < (mid - limit)*(1 + HEALTH_CESS/100) - 1e-9
+            lo, hi = (lo, mid) if plain else (mid, hi)
+        kinks.add(hi)
+    else:
+        kinks.add(limit + 1e-6)                  # the rebate ends in a step
+    x = sorted({0.0} | {k - other_income for k in kinks if k > other_income})
+    x.append(x[-1] + max(bounds[-1], 1.0)*10)
+    base_tax = income_tax(other_income, regime)
+    return x, [income_tax(other_income + v, regime) - base_tax for v in x]
+
+def withdrawal_gross_up(net, gain_share, asset, other_income=0.0, regime=None):
+    # Amount to redeem so that `net` is left after tax, when gain_share of every rupee redeemed is a
+    # long-term gain; works elementwise on arrays. A flat LTCG rate inverts in closed form; gains
+    # taxed at slab invert exactly between the kinks of slab_gain_table.
+    rules = CAPITAL_GAINS[asset]
+    vec = is_schedule(net) or is_schedule(gain_share)
+    if rules["ltcg"] is not None:
+        c = rules["ltcg"]/100*(1 + HEALTH_CESS/100)
+        taxed = (net - c*rules["exempt"])/(1 - c*gain_share)
+        if vec:
+            return np.where(gain_share*net <= rules["exempt"], net, taxed)
+        return net if gain_share*net <= rules["exempt"] else taxed
+    x, tax = slab_gain_table(other_income, regime)
+    if not vec:
+        # The same segments walked in plain Python, so the scalar drawdown runs without numpy
+        if gain_share <= 0: return float(net)
+        w = [v/gain_share for v in x]
+        left = [a - b for a, b in zip(w, tax)]
+        k = next((j for j in range(len(w) - 1) if left[j+1] >= net), len(w) - 2)
+        return w[k] + (net - left[k])*(w[k+1] - w[k])/(left[k+1] - left[k])
+    x, tax = np.asarray(x), np.asarray(tax)
+    net_b, g = np.broadcast_arrays(np.asarray(net, dtype=float), np.asarray(gain_share, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.where(g[..., None] > 0, x/g[..., None], np.inf)      # redemption at each kink
+    left = w - tax                                                    # net proceeds there
+    reach = left[..., 1:] >= net_b[..., None]
+    # First segment reaching net; past the last kink the top rate carries on along the last one
+    k = np.where(reach.any(-1), np.argmax(reach, -1), reach.shape[-1] - 1)
+    take = lambda a, i: np.take_along_axis(a, i[..., None], -1)[..., 0]
+    w0, w1, n0, n1 = take(w, k), take(w, k+1), take(left, k), take(left, k+1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(g > 0, w0 + (net_b - n0)*(w1 - w0)/(n1 - n0), net_b)
+    return out
+
+def _solve_increasing(f, target, lo, hi, iters=60):
+    # Bisection for f(x) = target with f nondecreasing; scalars or numpy arrays alike
+    vec = is_schedule(lo) or is_schedule(hi) or is_schedule(target)
+    for _ in range(64):                          # widen hi until it brackets the target
+        short = f(hi) < target
+        if not (short.any() if vec else short): break
+        hi = np.where(short, hi*2, hi) if vec else hi*2
+    for _ in range(iters):
+        mid = (lo + hi)/2
+        below = f(mid) < target
+        lo = np.where(below, mid, lo) if vec else (mid if below else lo)
+        hi = np.where(below, hi, mid) if vec else (hi if below else mid)
+    return hi
+
+# ---------- Loan offer comparison ----------
+LOAN_OFFER_HEADERS = ["Lender","Principal","Rate (%)","Spread (%)","Tenure (years)",
+                      "Fee (%)","Fee (₹)","Prepayment Penalty (%)"]
+LOAN_RANK_HEADERS = ["Rank","Lender","Rate (%)","EMI (₹)","Fees (₹)","Total Cost (₹)",
+                     "Effective APR (%)","Break-even (months)","Cost if Closed at Horizon (₹)"]
+
+def _annuity_vec(i, n):
+    # expm1/log1p keep full precision for tiny rates, where 1 - (1+i)^-n cancels
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(i == 0, n, -np.expm1(-n*np.log1p(i))/np.where(i == 0, 1, i))
+
+def loan_offers_batch(principal, rate, years, spread=0.0, fee_pct=0.0, fee_flat=0.0,
+                      penalty_pct=0.0, horizon_months=None, current_emi=None, switch_cost=0.0):
+    # Every argument broadcasts, so N offers cost one pass of array arithmetic.
+    # Total cost = interest + fees. Effective APR is the annual rate at which the EMI stream repays
+    # the amount actually received (principal - fees). Break-even is the month in which EMI
+    # savings against current_emi have paid back fees + switch_cost.
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Install numpy to compare loan offers.")
+    P = np.asarray(principal, dtype=float)
+    annual = np.asarray(rate, dtype=float) + np.asarray(spread, dtype=float)
+    n = np.asarray(years, dtype=float)*12
+    P, annual, n = np.broadcast_arrays(P, annual, n)
+    i = annual/12/100
+    emi = P/_annuity_vec(i, n)
+    fees = P*np.asarray(fee_pct, dtype=float)/100 + np.asarray(fee_flat, dtype=float)
+    total_interest = emi*n - P
+    out = {"rate": annual, "emi": emi, "fees": fees + 0*P, "total_interest": total_interest,
+           "total_cost": total_interest + fees}
+
+    # Annuity value falls as the rate rises, so bisection on the monthly rate converges once hi is
+    # doubled past the root. Fees that use up the whole principal leave no APR.
+    net = P - fees
+    valid = net > 0
+    lo, hi = np.zeros_like(P), np.ones_like(P)
+    for _ in range(1100):
+        short = valid & (emi*_annuity_vec(hi, n) > net)
+        if not short.any(): break
+        lo, hi = np.where(short, hi, lo), np.where(short, hi*2, hi)
+    for _ in range(64):
+        mid = (lo + hi)/2
+        above = emi*_annuity_vec(mid, n) > net
+        lo, hi = np.where(above, mid, lo), np.where(above, hi, mid)
+    with np.errstate(over="ignore", invalid="ignore"):
+        out["apr"] = np.where(valid, ((1 + (lo + hi)/2)**12 - 1)*100, np.nan)
+
+    if horizon_months is not None:
+        h = np.minimum(float(horizon_months), n)
+        g = (1+i)**h
+        with np.errstate(divide="ignore", invalid="ignore"):
+            paid_down = np.where(i == 0, emi*h, emi*(g - 1)/np.where(i == 0, 1, i))
+        outstanding = np.maximum(np.where(i == 0, P, P*g) - paid_down, 0.0)
+        out["cost_at_horizon"] = (emi*h + outstanding*(1 + np.asarray(penalty_pct, dtype=float)/100)
+                                  - P + fees)
+    if current_emi is not None:
+        saving = current_emi - emi
+        with np.errstate(divide="ignore", invalid="ignore"):
+            months = np.ceil((fees + switch_cost)/saving)
+        out["break_even"] = np.where((saving > 0) & (months <= n), np.maximum(months, 0), np.nan)
+    return out
+
+def rank_offers(result, key="total_cost"):
+    return np.argsort(result[key], kind="stable")
+
+def iter_ranked_offer_rows(names, result, key="total_cost"):
+    # Optional columns are looked up once, not per row
+    break_even = result.get("break_even")
+    at_horizon = result.get("cost_at_horizon")
+    for rank, k in enumerate(rank_offers(result, key).tolist(), start=1):
+        be = float("nan") if break_even is None else break_even[k]
+        yield [rank, names[k], round(float(result["rate"][k]), 4), round(float(result["emi"][k]), 2),
+               round(float(result["fees"][k]), 2), round(float(result["total_cost"][k]), 2),
+               round(float(result["apr"][k]), 3), None if be != be else int(be),
+               None if at_horizon is None else round(float(at_horizon[k]), 2)]
+
+def load_loan_offers(filename):
+    headers, rows, _summary = load_report(filename)
+    idx = {h: i for i, h in enumerate(headers)}
+    missing = [h for h in ("Principal","Rate (%)","Tenure (years)") if h not in idx]
+    if missing:
+        raise ValueError(f"Offer file is missing columns: {', '.join(missing)}")
+    def col(h, default=0.0):
+        if h not in idx: return [default]*len(rows)
+        return [default if r[idx[h]] in (None, "") else float(r[idx[h]]) for r in rows]
+    names = [str(r[idx["Lender"]]) if "Lender" in idx else f"Offer {k+1}" for k, r in enumerate(rows)]
+    offers = {"principal": col("Principal"), "rate": col("Rate (%)"), "years": col("Tenure (years)"),
+              "spread": col("Spread (%)"), "fee_pct": col("Fee (%)"), "fee_flat": col("Fee (₹)"),
+              "penalty_pct": col("Prepayment Penalty (%)")}
+    # Offers whose fees use up the whole principal have no APR: drop them and name them to the caller
+    net = [p - p*pct/100 - flat for p, pct, flat in zip(offers["principal"], offers["fee_pct"],
+                                                        offers["fee_flat"])]
+    keep = [k for k, v in enumerate(net) if v > 0]
+    skipped = [names[k] for k, v in enumerate(net) if not v > 0]
+    return [names[k] for k in keep], {h: [v[k] for k in keep] for h, v in offers.items()}, skipped
+
+INFLATION_GRID_HEADERS = ["Amount (₹)","Inflation Rate (%)","Year","Cumulative Inflation (%)",
+                          "Future Cost (₹)","Purchasing Power (₹)"]
+
+def inflation_grid(amounts, rates, years):
+    # Broadcast amounts (A) × rates % (R) × years 1..Y; the (R, Y) power table is shared by all amounts
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Install numpy for batch inflation tables.")
+    amounts = np.asarray(amounts, dtype=float).reshape(-1, 1, 1)
+    factor = np.power(1 + np.asarray(rates, dtype=float).reshape(-1, 1)/100,
+                      np.arange(1, years+1, dtype=float))
+    return {
+        "factor": factor,
+        "cum_infl": factor - 1,
+        "future_cost": amounts * factor,
+        "purch_power": amounts / factor,
+    }
+
+def iter_inflation_grid_rows(amounts, rates, years):
+    # One amount bucket at a time so a large grid streams in O(rates × years) memory
+    amounts = [float(a) for a in amounts]
+    rates = [float(r) for r in rates]
+    if NUMPY_AVAILABLE:
+        factor = inflation_grid([1.0], rates, years)["factor"]
+        year_col = np.arange(1, years+1)
+        for amount in amounts:
+            fc = (amount * factor).round(2); pp = (amount / factor).round(2)
+            cum = ((factor - 1) * 100).round(2)
+            for i, rate in enumerate(rates):
+                yield from zip([amount]*years, [rate]*years, year_col.tolist(),
+                               cum[i].tolist(), fc[i].tolist(), pp[i].tolist())
+        return
+    table = [[(1+rate/100)**y for y in range(1, years+1)] for rate in rates]
+    for amount in amounts:
+        for rate, row in zip(rates, table):
+            for y, f in enumerate(row, start=1):
+                yield (amount, rate, y, round((f-1)*100, 2), round(amount*f, 2), round(amount/f, 2))
+
+def export_inflation_grid(filename, amounts, rates, years):
+    return stream_report(filename, INFLATION_GRID_HEADERS, iter_inflation_grid_rows(amounts, rates, years),
+                         int_columns=("Year",))
+
+# ---------- Sensitivity sweeps ----------
+SWEEP_CHUNK = 1 << 18     # grid points evaluated per vectorized pass
+
+def sweep(func, axes, chunk=SWEEP_CHUNK):
+    # Evaluate func over the full grid of axes {name: values}; output shape follows axes order.
+    # Points are visited in flat chunks so temporaries stay O(chunk) whatever the grid size.
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Install numpy for sensitivity sweeps.")
+    names = list(axes)
+    values = [np.asarray(axes[n], dtype=float) for n in names]
+    shape = tuple(len(v) for v in values)
+    out = np.empty(int(np.prod(shape)))
+    for start in range(0, out.size, chunk):
+        idx = np.unravel_index(np.arange(start, min(start+chunk, out.size)), shape)
+        out[start:start+len(idx[0])] = func(**{n: v[i] for n, v, i in zip(names, values, idx)})
+    return out.reshape(shape)
+
+def sweep_axis(center, step, n=9, low=0.0):
+    vals = [center + (k - n//2)*step for k in range(n)]
+    return [v for v in vals if v >= low] or [center]
+
+def step_up_fv_vec(sip, rate, step_up, years):
+    # Closed form of project_sip's final FV: sip * A12 * sum(g^y * q^(T-1-y)), broadcast over arrays
+    i = np.asarray(rate, dtype=float)/12/100
+    g = 1 + np.asarray(step_up, dtype=float)/100
+    t = np.asarray(years, dtype=float)
+    q = (1 + i)**12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a12 = np.where(i == 0, 12.0, (q - 1)/np.where(i == 0, 1, i))
+        close = np.abs(q - g) < 1e-12
+        geo = np.where(close, t*q**(t - 1), (q**t - g**t)/np.where(close, 1, q - g))
+    return sip*a12*geo
+
+def post_tax_fv_vec(sip, rate, step_up, years, asset, start=0.0, inflation=0.0,
+                    other_income=0.0, regime=None):
+    # Closed-form counterpart of post_tax_values' final year. The short-term lots are the last
+    # `long_after` months of contributions, i.e. a step-up SIP of that many years scaled by
+    # g^(T-k); costs and indexed costs are the same sums at 0% and at the inflation rate.
+    rules = CAPITAL_GAINS[asset]
+    t = np.asarray(years, dtype=float)
+    g = 1 + np.asarray(step_up, dtype=float)/100
+    infl = ((1 + np.asarray(inflation, dtype=float)/100)**(1/12) - 1)*1200
+    q = (1 + np.asarray(rate, dtype=float)/1200)**(12*t)
+    k = t + 1 if rules["long_after"] is None else np.minimum(rules["long_after"]/12, t + 1)
+    opening = (12*t >= (rules["long_after"] or np.inf))
+    def split(r):
+        full = step_up_fv_vec(sip, r, step_up, t)
+        tail = np.where(k > t, full, g**np.maximum(t - k, 0)*step_up_fv_vec(sip, r, step_up, np.minimum(k, t)))
+        return full, full - tail
+    value, lt_value = split(rate)
+    cost, lt_cost = split(0.0)
+    value, lt_value = value + start*q, lt_value + start*q*opening
+    cost, lt_cost = cost + start, lt_cost + start*opening
+    lt_basis = lt_cost
+    if rules["indexed"]:
+        _full, lt_idx = split(infl)
+        lt_basis = lt_idx + start*(1 + np.asarray(inflation, dtype=float)/100)**t*opening
+    lt = lt_value - lt_basis
+    st = (value - lt_value) - (cost - lt_cost)
+    return value - capital_gains_tax(lt, st, asset, other_income, regime)
+
+def fire_required_sip_vec(monthly_exp, current, rate, years, asset=None, other_income=0.0, regime=None,
+                          withdrawal_rate=4.0):
+    # Required monthly investment to reach yearly expenses / withdrawal rate, as in calculate_fire;
+    # with a tax treatment the corpus must still cover the target after tax on redeeming it
+    target = np.asarray(monthly_exp, dtype=float)*12*100/withdrawal_rate
+    i = np.asarray(rate, dtype=float)/12/100
+    n = np.asarray(years, dtype=float)*12
+    growth = (1 + i)**n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = np.where(i == 0, n, (growth - 1)/np.where(i == 0, 1, i))
+    pre_tax = np.maximum((target - current*growth)/denom, 0.0)
+    if asset in (None, "None"):
+        return pre_tax
+    shape = np.broadcast(target, i, n).shape
+    target, rate, years = (np.broadcast_to(a, shape).astype(float) for a in
+                           (target, np.asarray(rate, dtype=float), np.asarray(years, dtype=float)))
+    net = lambda s: post_tax_fv_vec(s, rate, 0.0, years, asset, current, 0.0, other_income, regime)
+    hi = np.maximum(pre_tax/(1 - MAX_TAX_SHARE), 1.0)
+    sip = _solve_increasing(net, target, np.zeros(shape), hi)
+    return np.where(net(np.zeros(shape)) >= target, 0.0, sip)
+
+# ---------- Cashflow analytics ----------
+# Dated flows use actual/365 year fractions from the first date (the spreadsheet XIRR convention).
+# Negative amounts go into the portfolio, positive amounts come out.
+XIRR_TOL = 1e-9
+XIRR_MAX_ITER = 50
+XIRR_LOW, XIRR_HIGH = -0.999999, 1e6
+
+def _as_date(d):
+    return d if isinstance(d, datetime.date) else datetime.datetime.strptime(str(d), "%Y-%m-%d").date()
+
+def year_fractions(dates, start=None):
+    dates = [_as_date(d) for d in dates]
+    d0 = start or min(dates)
+    return [(d - d0).days/365 for d in dates]
+
+def _log_npv(log_base, amounts, t):
+    # NPV and its derivative times (1 + rate), from log(1 + rate). Near -100% the discount factors
+    # pass the float range for long spans (1e-6**-52 > 1e308), so the terms are summed scaled by
+    # the largest factor and only the totals saturate to ±inf. Takes one list of flows, or numpy
+    # rows: log_base (R, 1) against amounts and t (R, N).
+    if NUMPY_AVAILABLE and isinstance(amounts, np.ndarray):
+        e = -t*log_base
+        top = e.max(1)
+        v = amounts*np.exp(e - top[:, None])
+        f, g = v.sum(1), (-t*v).sum(1)
+        scale = np.where(top < 709, np.exp(np.minimum(top, 709)), np.inf)
+        return np.where(f == 0, 0.0, f*scale), np.where(g == 0, 0.0, g*scale)
+    top = max((-y*log_base for y in t), default=0.0)
+    f = g = 0.0
+    for a, y in zip(amounts, t):
+        v = a * math.exp(-y*log_base - top)
+        f += v
+        g -= y*v
+    scale = math.exp(top) if top < 709 else math.inf
+    return (f*scale if f else 0.0), (g*scale if g else 0.0)
+
+def _npv_and_slope(rate, amounts, t):
+    f, g = _log_npv(math.log1p(rate), amounts, t)
+    return f, g/(1 + rate)
+
+def xnpv(rate, amounts, dates):
+    return _npv_and_slope(rate, amounts, year_fractions(dates))[0]
+
+def xirr_from_fractions(amounts, t, guess=0.1):
+    if not (any(a > 0 for a in amounts) and any(a < 0 for a in amounts)):
+        return None
+    r = guess
+    for _ in range(XIRR_MAX_ITER):
+        f, df = _npv_and_slope(r, amounts, t)
+        if df == 0: break
+        nxt = r - f/df
+        if not (XIRR_LOW < nxt < XIRR_HIGH): break
+        if abs(nxt - r) < XIRR_TOL: return nxt
+        r = nxt
+    # Newton left the domain or stalled: bisect on a bracket with a sign change
+    lo, hi = XIRR_LOW, 1.0
+    f_lo = _npv_and_slope(lo, amounts, t)[0]
+    while f_lo*_npv_and_slope(hi, amounts, t)[0] > 0:
+        if hi >= XIRR_HIGH: return None
+        hi *= 4
+    for _ in range(200):
+        mid = (lo + hi)/2
+        f_mid = _npv_and_slope(mid, amounts, t)[0]
+        if f_lo*f_mid <= 0: hi = mid
+        else: lo, f_lo = mid, f_mid
+        if hi - lo < XIRR_TOL: break
+    return (lo + hi)/2
+
+def xirr(amounts, dates, guess=0.1):
+    return xirr_from_fractions(list(amounts), year_fractions(dates), guess)
+
+def xirr_batch(amounts, t, guess=0.1):
+    # amounts (P, N) for P portfolios (pad short ones with 0), t (N,) or (P, N) year fractions.
+    # Vectorized Newton over all rows, then bracketed bisection for the rows it could not solve.
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Install numpy for batch XIRR.")
+    a = np.atleast_2d(np.asarray(amounts, dtype=float))
+    t = np.broadcast_to(np.asarray(t, dtype=float), a.shape)
+    p = a.shape[0]
+    solvable = (a > 0).any(1) & (a < 0).any(1)
+
+    def npv(r, rows):
+        f, g = _log_npv(np.log1p(r)[:, None], a[rows], t[rows])
+        return f, g/(1 + r)
+
+    r = np.full(p, float(guess))
+    done = ~solvable
+    with np.errstate(all="ignore"):
+        for _ in range(XIRR_MAX_ITER):
+            rows = np.flatnonzero(~done)
+            if not rows.size: break
+            f, df = npv(r[rows], rows)
+            nxt = r[rows] - f/df
+            bad = ~np.isfinite(nxt) | (nxt <= XIRR_LOW) | (nxt >= XIRR_HIGH)
+            conv = ~bad & (np.abs(nxt - r[rows]) < XIRR_TOL)
+            r[rows[~bad]] = nxt[~bad]
+            done[rows[conv]] = True
+            r[rows[bad]] = np.nan
+            done[rows[bad]] = True
+        left = np.flatnonzero(solvable & (~done | np.isnan(r)))
+        if left.size:
+            lo = np.full(left.size, XIRR_LOW); hi = np.ones(left.size)
+            f_lo = npv(lo, left)[0]
+            for _ in range(12):
+                need = f_lo*npv(hi, left)[0] > 0
+                if not need.any(): break
+                hi[need] *= 4
+            ok = f_lo*npv(hi, left)[0] <= 0
+            for _ in range(200):
+                mid = (lo + hi)/2
+                f_mid = npv(mid, left)[0]
+                left_side = f_lo*f_mid <= 0
+                hi = np.where(left_side, mid, hi)
+                lo, f_lo = np.where(left_side, lo, mid), np.where(left_side, f_lo, f_mid)
+                if (hi - lo).max() < XIRR_TOL: break
+            r[left] = np.where(ok, (lo + hi)/2, np.nan)
+    r[~solvable] = np.nan
+    return r
+
+class CashflowSeries:
+    # Growing set of dated flows whose XIRR is re-solved warm-started from the last answer,
+    # so appending one cashflow costs a couple of O(n) Newton steps rather than a cold solve.
+    def __init__(self, flows=()):
+        self.start = None
+        self.t = []
+        self.amounts = []
+        self._rate = None
+        self._dirty = True
+        for d, a in flows:
+            self.append(d, a)
+
+    def append(self, date, amount):
+        d = _as_date(date)
+        if self.start is None:
+            self.start = d
+        elif d < self.start:
+            shift = (self.start - d).days/365
+            self.t = [y + shift for y in self.t]
+            self.start = d
+        self.t.append((d - self.start).days/365)
+        self.amounts.append(float(amount))
+        self._dirty = True
+
+    def xnpv(self, rate):
+        return _npv_and_slope(rate, self.amounts, self.t)[0]
+
+    def xirr(self):
+        if self._dirty:
+            guess = self._rate if self._rate is not None else 0.1
+            self._rate = xirr_from_fractions(self.amounts, self.t, guess)
+            self._dirty = False
+        return self._rate
+
+def ledger_cashflows(entries, categories=("Investment",)):
+    # Investment expenses are contributions (outflows), investment income is a redemption
+    flows = []
+    for e in entries:
+        if e["category"] in categories:
+            amt = e["amount"]/100 if MONEY_MODE == "paise" else e["amount"]
+            flows.append((e["date"], -amt if e["type"] == "Expense" else amt))
+    return flows
+
+def sip_cashflows(sip, years, start_date, step_up=0.0, final_value=None):
+    # Dated monthly debits for a (step-up) SIP, optionally closed by the redemption value
+    flows = [(d, -a) for d, a in sip_calendar(sip, years, start_date, step_up=step_up)]
+    if final_value is not None:
+        flows.append((flows[-1][0], final_value))
+    return flows
+
+# ---------- Calendar compounding ----------
+# Interest accrues simple-interest style on actual days / basis and is credited (compounded) on
+# each credit date of the convention; growth between credit dates comes from one cumulative table.
+COMPOUNDING_CONVENTIONS = ("daily", "monthly", "quarterly", "annual")
+COMPOUNDING_LABELS = {"Monthly steps": None, "Daily (act/365)": "daily",
+                      "Monthly (act/365)": "monthly", "Quarterly (act/365)": "quarterly"}
+
+def _add_months(d, months, day=None):
+    y, m = divmod(d.month - 1 + months, 12)
+    y += d.year
+    return datetime.date(y, m + 1, min(day or d.day, calendar.monthrange(y, m + 1)[1]))
+
+def sip_calendar(sip, years, start_date, debit_day=None, step_up=0.0):
+    # (date, amount) for each monthly debit from the first debit day on or after start_date,
+    # on debit_day clamped to the month's length
+    d0 = _as_date(start_date)
+    skip = 1 if _add_months(d0, 0, debit_day) < d0 else 0
+    for m in range(years*12):
+        yield _add_months(d0, m + skip, debit_day), sip*((1+step_up/100)**(m//12))
+
+def credit_dates(start, end, compounding="monthly"):
+    # start, every credit date of the convention strictly inside (start, end), then end
+    if compounding not in COMPOUNDING_CONVENTIONS:
+        raise ValueError(f"Unknown compounding {compounding!r}")
+    out = [start]
+    if compounding == "daily":
+        o = start.toordinal()
+        out += [datetime.date.fromordinal(k) for k in range(o + 1, end.toordinal())]
+    else:
+        step = {"monthly": 1, "quarterly": 3, "annual": 12}[compounding]
+        d = datetime.date(start.year, 1, 1)
+        while d <= start:
+            d = _add_months(d, step, 1)
+        while d < end:
+            out.append(d)
+            d = _add_months(d, step, 1)
+    if end > start:
+        out.append(end)
+    return out
+
+def project_calendar(contributions, rate, query_dates, compounding="monthly", basis=365):
+    # Value of dated contributions at each query date, interest credited per the convention
+    flows = sorted((_as_date(d), float(a)) for d, a in contributions)
+    queries = [_as_date(q) for q in query_dates]
+    if not flows:
+        return [0.0]*len(queries)
+    bounds = [b.toordinal() for b in credit_dates(flows[0][0], max(queries + [flows[-1][0]]), compounding)]
+    r = rate/100
+    growth = [1.0]                       # cumulative credited growth at each credit date
+    for k in range(1, len(bounds)):
+        growth.append(growth[-1]*(1 + r*(bounds[k] - bounds[k-1])/basis))
+    credited = [0.0]*len(bounds)
+    flow_days = [d.toordinal() for d, _ in flows]
+    for day, (_, a) in zip(flow_days, flows):
+        k = bisect_right(bounds, day)    # first credit date after the debit
+        if k < len(bounds):
+            credited[k] += a*(1 + r*(bounds[k] - day)/basis)
+    balance, acc = [], 0.0
+    for c, g in zip(credited, growth):
+        acc += c/g
+        balance.append(acc*g)
+    out = []
+    for q in queries:
+        q = q.toordinal()
+        j = bisect_right(bounds, q) - 1
+        if j < 0:
+            out.append(0.0); continue
+        v = balance[j]*(1 + r*(q - bounds[j])/basis)
+        # debits since the last credit date accrue simple interest up to q
+        for k in range(bisect_left(flow_days, bounds[j]), bisect_right(flow_days, q)):
+            v += flows[k][1]*(1 + r*(q - flow_days[k])/basis)
+        out.append(v)
+    return out
+
+def project_sip_calendar(sip, years, rate, start_date, debit_day=None, step_up=0.0,
+                         compounding="daily", basis=365):
+    # Drop-in for project_sip on a real debit calendar; values are read at each anniversary
+    d0 = _as_date(start_date)
+    flows = list(sip_calendar(sip, years, d0, debit_day, step_up))
+    anniversaries = [_add_months(d0, 12*(y+1)) for y in range(years)]
+    invested_by_year = [0.0]*years
+    for d, a in flows:
+        # A debit on an anniversary is in that year's value, so it belongs to that year's invested too
+        invested_by_year[min(bisect_left(anniversaries, d), years - 1)] += a
+    return invested_by_year, project_calendar(flows, rate, anniversaries, compounding, basis)
+
+# ---------- Asset allocation ----------
+# Default expected annual return %, volatility % and correlations for the asset classes offered
+ASSET_CLASSES = {"Equity": (12.0, 18.0), "Debt": (7.0, 3.0), "Gold": (8.0, 15.0)}
+ASSET_CORRELATION = [[1.0, -0.1, 0.1], [-0.1, 1.0, 0.0], [0.1, 0.0, 1.0]]
+REBALANCE_MONTHS = {"none": 0, "monthly": 1, "quarterly": 3, "annual": 12}
+SIM_CHUNK_ELEMENTS = 1 << 22     # random draws (paths × months × assets) held at once
+
+def _monthly_growth(rng, paths, months, returns, vols, chol):
+    # Lognormal monthly gross returns whose mean compounds to the expected annual return
+    sigma = np.asarray(vols, dtype=float)/100/np.sqrt(12)
+    mu = np.log1p(np.asarray(returns, dtype=float)/100)/12 - sigma**2/2
+    z = rng.standard_normal((paths, months, len(sigma))) @ chol.T
+    return np.exp(mu + sigma*z)
+
+def simulate_portfolios(weights, returns, vols, monthly, years, paths=1000, start=0.0,
+                        rebalance="annual", band=None, correlation=None, seed=None,
+                        chunk_elements=SIM_CHUNK_ELEMENTS):
+    # weights (K, A) target allocations for K portfolios over A assets; every portfolio sees the
+    # same simulated markets. Contributions are invested at target weights each month; holdings
+    # are reset to target on the rebalance calendar, or whenever any weight drifts past band.
+    # Paths are simulated in chunks so the (paths × months × assets) draws stay bounded.
+    # Returns year-end portfolio values, shape (K, paths, years).
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Install numpy for portfolio simulation.")
+    w = np.atleast_2d(np.asarray(weights, dtype=float))
+    w = w / w.sum(1, keepdims=True)
+    k, a = w.shape
+    months = years*12
+    every = REBALANCE_MONTHS[rebalance]
+    corr = np.eye(a) if correlation is None else np.asarray(correlation, dtype=float)
+    chol = np.linalg.cholesky(corr)
+    rng = np.random.default_rng(seed)
+    out = np.empty((k, paths, years))
+    step = max(1, chunk_elements // (months*a))
+    for p0 in range(0, paths, step):
+        n = min(step, paths - p0)
+        growth = _monthly_growth(rng, n, months, returns, vols, chol)     # (n, months, A)
+        h = np.broadcast_to(start*w[:, None, :], (k, n, a)).copy()
+        for m in range(months):
+            h *= growth[None, :, m, :]
+            h += monthly*w[:, None, :]
+            due = every and (m+1) % every == 0
+            if due or band is not None:
+                total = h.sum(-1, keepdims=True)
+                if due:
+                    h = total*w[:, None, :]
+                else:
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        drift = np.abs(h/total - w[:, None, :]).max(-1, keepdims=True) > band
+                    h = np.where(drift, total*w[:, None, :], h)
+            if (m+1) % 12 == 0:
+                out[:, p0:p0+n, m//12] = h.sum(-1)
+    return out
+
+def portfolio_percentiles(values, q=(10, 50, 90)):
+    # (K, paths, years) -> (len(q), K, years)
+    return np.percentile(values, q, axis=1)
+
+# ---------- Retirement drawdown ----------
+# Guyton-Klinger style guardrails, all in %: cut spending by `adjust` when the current withdrawal
+# rate rises `upper` above the initial one, raise it when the rate falls `lower` below, and skip
+# the inflation raise after a losing year while the rate is above the initial one. Cuts never take
+# spending below `floor` % of the fully indexed plan, so a path still fails if it cannot fund that.
+GUARDRAILS = {"upper": 20.0, "lower": 20.0, "adjust": 10.0, "floor": 80.0}
+SWR_SEARCH = (0.0, 20.0)      # withdrawal rates (% of opening corpus) bracketing the search
+SWR_CANDIDATES = 9            # rates simulated together per bisection round
+SWR_TOL = 0.01
+
+def drawdown_returns(paths, years, ret, vol, seed=None):
+    # Gross yearly returns, lognormal with mean 1 + ret%; one row per path
+    rng = np.random.default_rng(seed)
+    sigma = vol/100
+    mu = np.log1p(ret/100) - sigma**2/2
+    return np.exp(mu + sigma*rng.standard_normal((paths, years)))
+
+def simulate_drawdown(corpus, rates, growth, inflation, guardrails=None, asset=None,
+                      cost_share=1.0, other_income=0.0, regime=None):
+    # Spend rates% of the corpus in year one, indexed to inflation, withdrawn at the start of each
+    # year; growth is (paths, years) from drawdown_returns. All rates run against the same paths
+    # as one (rates, paths) batch. With a tax treatment the withdrawal is grossed up for the gains
+    # it realises at average cost. A path fails the first year it cannot fund the spending.
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    paths, years = growth.shape
+    shape = (len(rates), paths)
+    balance = np.full(shape, float(corpus))
+    cost = balance*cost_share
+    spend = np.broadcast_to((corpus*rates/100)[:, None], shape).copy()
+    initial = rates[:, None]/100
+    alive = np.ones(shape, dtype=bool)
+    balances = np.empty(shape + (years+1,)); balances[..., 0] = balance
+    spending = np.empty(shape + (years,))
+    last = np.ones(paths)
+    for y in range(years):
+        if y:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                current = np.where(balance > 0, spend/balance, np.inf)
+            raise_ = np.ones(shape, dtype=bool)
+            if guardrails:
+                raise_ = ~((last < 1)[None, :] & (current > initial))
+            spend = np.where(raise_, spend*(1 + inflation/100), spend)
+            if guardrails:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    current = np.where(balance > 0, spend/balance, np.inf)
+                spend = np.where(current > initial*(1 + guardrails["upper"]/100),
+                                 spend*(1 - guardrails["adjust"]/100), spend)
+                spend = np.where(current < initial*(1 - guardrails["lower"]/100),
+                                 spend*(1 + guardrails["adjust"]/100), spend)
+                planned = corpus*initial*(1 + inflation/100)**y
+                spend = np.maximum(spend, planned*guardrails["floor"]/100)
+        gross = spend
+        if asset not in (None, "None"):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                gain_share = np.where(balance > 0, np.clip(1 - cost/balance, 0, 1), 0.0)
+            gross = withdrawal_gross_up(spend, gain_share, asset, other_income, regime)
+        alive &= gross <= balance
+        taken = np.minimum(gross, balance)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost = np.where(balance > 0, cost*(1 - taken/balance), 0.0)
+        spending[..., y] = np.where(alive, spend, 0.0)
+        balance = np.where(alive, (balance - taken)*growth[None, :, y], 0.0)
+        cost = np.where(alive, cost, 0.0)
+        balances[..., y+1] = balance
+        last = growth[:, y]
+    return {"rates": rates, "balance": balances, "spending": spending, "success": alive.mean(1)}
+
+def safe_withdrawal_rate(corpus, growth, inflation, target=0.9, guardrails=None, asset=None,
+                         cost_share=1.0, other_income=0.0, regime=None,
+                         bounds=SWR_SEARCH, candidates=SWR_CANDIDATES, tol=SWR_TOL):
+    # Highest initial withdrawal rate (%) whose success probability is at least target. Each round
+    # simulates `candidates` evenly spaced rates in one batch over the same paths, so success falls
+    # monotonically across them, and narrows the bracket to the last passing one.
+    lo, hi = bounds
+    while hi - lo > tol:
+        rates = np.linspace(lo, hi, candidates)
+        ok = simulate_drawdown(corpus, rates, growth, inflation, guardrails, asset,
+                               cost_share, other_income, regime)["success"] >= target
+        if not ok[0]:
+            return lo if lo > bounds[0] else 0.0
+        k = int(np.flatnonzero(ok)[-1])
+        if k == candidates - 1:
+            return hi
+        lo, hi = rates[k], rates[k+1]
+    return lo
+
+# ---------- Household planner ----------
+# Goals: {"name", "target" (today's ₹), "years", "rate", "inflation", "priority", "start"}
+# Loans: {"name", "principal", "rate", "years", "priority", "prepay"}
+# Every month EMIs are paid first, then goals (and prepaying loans) draw from what is left
+# in priority order; a lower priority number is served first.
+def _goal_state(g):
+    i = g.get("rate", 0.0)/12/100
+    return {"name": g["name"], "kind": "goal", "priority": g.get("priority", 99),
+            "i": i, "due": int(g["years"]*12), "bal": float(g.get("start", 0.0)),
+            "target": g["target"]*(1+g.get("inflation", 0.0)/100)**g["years"]}
+
+def _loan_state(ln):
+    return {"name": ln["name"], "kind": "loan", "priority": ln.get("priority", 99),
+            "r": ln["rate"]/12/100, "bal": float(ln["principal"]), "months": int(ln["years"]*12),
+            "emi": loan_emi(ln["principal"], ln["rate"], ln["years"]), "prepay": ln.get("prepay", False)}
+
+def _required_contribution(bal, i, n, target):
+    if n <= 0: return 0.0
+    if i == 0:
+        return max((target - bal)/n, 0.0)
+    growth = (1+i)**n
+    return max((target - bal*growth)*i/(growth - 1), 0.0)
+
+def household_plan(surplus, goals, loans=(), years=None, surplus_growth=0.0):
+    # Generator: one dict per month, so a long plan streams without storing the timeline
+    goals = [_goal_state(g) for g in goals]
+    loans = [_loan_state(ln) for ln in loans]
+    horizon = int(years*12) if years else max([g["due"] for g in goals] + [ln["months"] for ln in loans] + [12])
+    claimants = sorted(goals + [ln for ln in loans if ln["prepay"]], key=lambda x: x["priority"])
+    for m in range(horizon):
+        avail = surplus*(1+surplus_growth/100)**(m//12)
+        paid, shortfall, matured, closed = {}, 0.0, [], []
+        for ln in loans:
+            if ln["bal"] <= 0: continue
+            interest = ln["bal"]*ln["r"]
+            due = min(ln["emi"], ln["bal"] + interest)
+            take = min(due, max(avail, 0.0))
+            ln["bal"] += interest - take
+            avail -= take; shortfall += due - take
+            paid[ln["name"]] = take
+        for c in claimants:
+            if c["kind"] == "goal":
+                if m >= c["due"]: continue
+                need = _required_contribution(c["bal"], c["i"], c["due"] - m, c["target"])
+                take = min(need, max(avail, 0.0))
+                c["bal"] = c["bal"]*(1+c["i"]) + take
+                shortfall += need - take
+                if m + 1 == c["due"]: matured.append((c["name"], c["bal"], c["target"]))
+            else:
+                if c["bal"] <= 1e-9: continue
+                take = min(c["bal"], max(avail, 0.0))
+                c["bal"] -= take
+            avail -= take
+            paid[c["name"]] = paid.get(c["name"], 0.0) + take
+        for ln in loans:
+            if 0 < ln["bal"] <= 1e-6: ln["bal"] = 0.0
+            if ln["bal"] == 0 and ln.get("closed") is None:
+                ln["closed"] = m + 1; closed.append(ln["name"])
+        for g in goals:
+            if m >= g["due"]: g["bal"] *= 1+g["i"]
+        yield {"month": m + 1, "available": surplus*(1+surplus_growth/100)**(m//12), "paid": paid,
+               "unallocated": max(avail, 0.0), "shortfall": shortfall,
+               "matured": matured, "closed": closed}
+
+def household_summary(steps):
+    # Fold the monthly stream into yearly rows and per-goal / per-loan outcomes in one pass
+    yearly, outcomes, row = [], {}, None
+    for s in steps:
+        if row is None or (s["month"] - 1) % 12 == 0:
+            row = {"year": (s["month"] - 1)//12 + 1, "available": 0.0, "allocated": 0.0,
+                   "unallocated": 0.0, "shortfall": 0.0}
+            yearly.append(row)
+        row["available"] += s["available"]
+        row["allocated"] += sum(s["paid"].values())
+        row["unallocated"] += s["unallocated"]
+        row["shortfall"] += s["shortfall"]
+        for name, bal, target in s["matured"]:
+            outcomes[name] = {"month": s["month"], "value": bal, "target": target,
+                              "funded": bal/target if target else 1.0}
+        for name in s["closed"]:
+            outcomes[name] = {"month": s["month"], "value": 0.0, "target": 0.0, "funded": 1.0}
+    return yearly, outcomes
+
+# ---------- Shared ledger store ----------
+LEDGER_DIR = os.path.join(REPORTS_DIR, "ledger")
+LEDGER_COMPACT_BYTES = 4 << 20   # checkpoint the journal into a fresh snapshot past this size
+LEDGER_FSYNC_EVERY = 64          # group commit: fsync after this many transactions...
+LEDGER_FSYNC_INTERVAL = 0.5      # ...or this many seconds after the oldest unsynced one
+
+@contextmanager
+def file_lock(path):
+    # Exclusive advisory lock shared by every process (and thread) that opens the same file
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _fsync_dir(path):
+    if os.name != "nt":
+        fd = os.open(path, os.O_RDONLY)
+        try: os.fsync(fd)
+        finally: os.close(fd)
+
+def _json_bytes(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _frame(txn):
+    # Journal record: 8 hex digits of CRC32, a space, the JSON payload, newline
+    payload = _json_bytes(txn)
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+def _unframe(line):
+    if line[:1] == b"{":
+        return json.loads(line)   # record written before checksums were added
+    crc, _, payload = line.partition(b" ")
+    if len(crc) != 8 or int(crc, 16) != zlib.crc32(payload):
+        raise ValueError("journal checksum mismatch")
+    return json.loads(payload)
+
+def _replay(data, entries):
+    # Apply every intact record; stop at the first torn or corrupt one. Returns bytes consumed.
+    offset = 0
+    while True:
+        end = data.find(b"\n", offset)
+        if end < 0: return offset
+        try:
+            txn = _unframe(data[offset:end])
+        except ValueError:
+            return offset
+        for e in txn.get("add", ()):
+            entries[e["id"]] = e
+        for i in txn.get("del", ()):
+            entries.pop(i, None)
+        offset = end + 1
+
+# Open stores are synced and closed at exit by one hook; the set holds them weakly, so a store
+# nobody uses any more can still be collected
+_OPEN_STORES = weakref.WeakSet()
+
+def _close_stores():
+    for store in list(_OPEN_STORES):
+        store.close()
+
+atexit.register(_close_stores)
+
+class LedgerStore:
+    # Journaled ledger shared by every app instance on the same FinanceReports folder.
+    # Each mutation is one checksummed journal record. A checkpoint folds the journal into a
+    # compact snapshot for generation N+1 and flips HEAD atomically, so opening the store reads
+    # one snapshot and replays only the records after it; later reads replay only new bytes.
+    # Writers serialize on ledger.lock and fsync in groups. Readers take no lock and see every
+    # complete record present when they read, so large reports never block new entries.
+    def __init__(self, directory=LEDGER_DIR, fsync_every=LEDGER_FSYNC_EVERY,
+                 fsync_interval=LEDGER_FSYNC_INTERVAL):
+        self.dir = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock_path = os.path.join(directory, "ledger.lock")
+        self.head_path = os.path.join(directory, "HEAD")
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._mutex = threading.RLock()
+        self._entries, self._gen, self._offset = {}, None, 0      # reader cache
+        self._log, self._log_gen, self._log_end = None, None, 0    # writer handle
+        self._unsynced, self._timer = 0, None
+        _OPEN_STORES.add(self)
+
+    def _paths(self, gen):
+        return (os.path.join(self.dir, f"snapshot.{gen}.jsonl"),
+                os.path.join(self.dir, f"log.{gen}.jsonl"))
+
+    def generation(self):
+        try:
+            with open(self.head_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _read_log(self, gen, offset):
+        try:
+            with open(self._paths(gen)[1], "rb") as f:
+                f.seek(offset)
+                return f.read()
+        except FileNotFoundError:
+            # Still HEAD: the log was never created (or lost in a crash) and reads as empty.
+            # Otherwise a checkpoint retired it and the caller starts over.
+            if gen and self.generation() != gen: raise
+            return b""
+
+    def _refresh(self):
+        gen = self.generation()
+        if gen == self._gen:
+            self._offset += _replay(self._read_log(gen, self._offset), self._entries)
+            return
+        entries = {}
+        if gen:
+            with open(self._paths(gen)[0], "rb") as f:
+                for line in f:
+                    e = json.loads(line); entries[e["id"]] = e
+        offset = _replay(self._read_log(gen, 0), entries)
+        self._entries, self._gen, self._offset = entries, gen, offset
+
+    def snapshot(self):
+        with self._mutex:
+            for _ in range(10):
+                try:
+                    self._refresh()
+                    return [ledger_entry(e) for e in self._entries.values()]
+                except FileNotFoundError:
+                    self._gen = None   # a checkpoint retired this generation mid-read
+        raise RuntimeError("Ledger is being checkpointed; try again.")
+
+    def _writer(self, gen):
+        if self._log_gen != gen:
+            self._close_log()
+            self._log, self._log_gen, self._log_end = open(self._paths(gen)[1], "ab"), gen, 0
+        self._trim_tail()
+        return self._log
+
+    def _trim_tail(self):
+        # Crash recovery, run under the lock before every write: another process may have died
+        # mid-record, so drop a torn or corrupt tail so new records are not hidden behind it.
+        # Only bytes appended since our own last write need checking.
+        f = self._log
+        size = os.fstat(f.fileno()).st_size
+        if size == self._log_end:
+            return
+        start = self._log_end if size > self._log_end else 0
+        with open(f.name, "rb") as r:
+            r.seek(start)
+            valid = start + _replay(r.read(), {})
+        if valid < size:
+            f.truncate(valid); os.fsync(f.fileno())
+        self._log_end = valid
+
+    def _sync(self):
+        if self._log and self._unsynced:
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+        if self._timer:
+            self._timer.cancel(); self._timer = None
+
+    def flush(self):
+        with self._mutex:
+            self._sync()
+
+    def _close_log(self):
+        if self._log:
+            self._sync()
+            self._log.close()
+        self._log, self._log_gen, self._log_end = None, None, 0
+
+    def close(self):
+        with self._mutex:
+            self._close_log()
+
+    def commit(self, add=(), delete=()):
+        # One transaction = one record, so readers see all of it or none of it
+        txn = {}
+        # Amounts are saved with their unit, so switching MONEY_MODE never misreads old rows
+        if add: txn["add"] = [dict(e, id=e.get("id") or uuid.uuid4().hex, unit=e.get("unit") or ledger_unit())
+                              for e in add]
+        if delete: txn["del"] = list(delete)
+        if not txn: return []
+        record = _frame(txn)
+        with self._mutex, file_lock(self.lock_path):
+            gen = self.generation()
+            f = self._writer(gen)
+            f.write(record); f.flush()   # visible to readers now; durable at the next fsync
+            self._log_end = f.tell()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.fsync_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            if f.tell() >= LEDGER_COMPACT_BYTES:
+                self._checkpoint(gen)
+        return [e["id"] for e in txn.get("add", ())]
+
+    def add(self, entry):
+        return self.commit(add=[entry])[0]
+
+    def delete(self, ids):
+        self.commit(delete=ids)
+
+    def checkpoint(self):
+        with self._mutex, file_lock(self.lock_path):
+            self._checkpoint(self.generation())
+
+    def _checkpoint(self, gen):
+        self._close_log()
+        self._refresh()
+        snap, log = self._paths(gen + 1)
+        with atomic_path(snap) as tmp:
+            with open(tmp, "wb") as f:
+                for e in self._entries.values(): f.write(_json_bytes(e) + b"\n")
+                f.flush(); os.fsync(f.fileno())
+        open(log, "ab").close()
+        # The new snapshot and log must be durable before HEAD names them, and HEAD itself after
+        _fsync_dir(self.dir)
+        with atomic_path(self.head_path) as tmp:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(str(gen + 1)); f.flush(); os.fsync(f.fileno())
+        _fsync_dir(self.dir)
+        self._gen, self._offset = gen + 1, 0
+        # Keep generation N for readers still on it; N-1 can go
+        if gen:
+            for p in self._paths(gen - 1):
+                try: os.remove(p)
+                except OSError: pass
+
+# ---------- Recurring rules and budgets ----------
+# Rules stand in for rows that repeat (rent, salary, utilities). They are stored once and expanded
+# on demand into virtual entries that look like ledger rows, so totals, rollups and XIRR see them
+# without a single synthetic row being written or kept.
+BUDGET_PATH = os.path.join(LEDGER_DIR, "budget.json")
+RECURRENCE_MONTHS = {"Monthly": 1, "Quarterly": 3, "Yearly": 12}
+BUDGET_HEADERS = ["Month","Category","Budget","Actual","Recurring","Total","Remaining"]
+
+def budget_headers():
+    # The amount columns carry their unit in paise mode, as ledger_amount_header() does
+    if MONEY_MODE != "paise": return BUDGET_HEADERS
+    return BUDGET_HEADERS[:2] + [f"{h} (paise)" for h in BUDGET_HEADERS[2:]]
+
+def load_budget(path=BUDGET_PATH):
+    # Rule and budget amounts in the current MONEY_MODE; a file without a unit holds rupees
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    unit = data.get("unit", "rupees")
+    return {"rules": [dict(r, amount=in_money_mode(r["amount"], unit)) for r in data.get("rules", [])],
+            "budgets": {c: in_money_mode(v, unit) for c, v in data.get("budgets", {}).items()},
+            "unit": ledger_unit()}
+
+def update_budget(change, path=BUDGET_PATH):
+    # Read-modify-write under a lock so two windows editing rules never drop each other's changes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(path + ".lock"):
+        data = load_budget(path)
+        change(data)
+        with atomic_path(path) as tmp:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+    return data
+
+def rule_dates(rule, start, end):
+    # Dates of one rule within [start, end], jumping straight to the first one on or after start
+    first = _as_date(rule["start"])
+    last = min(end, _as_date(rule["end"])) if rule.get("end") else end
+    every = RECURRENCE_MONTHS[rule["every"]]
+    k = 0
+    if start > first:
+        k = ((start.year - first.year)*12 + start.month - first.month)//every
+        if _add_months(first, k*every) < start: k += 1
+    d = _add_months(first, k*every)
+    while d <= last:
+        yield d
+        k += 1
+        d = _add_months(first, k*every)
+
+def _rule_entries(rule, start, end):
+    for d in rule_dates(rule, start, end):
+        yield {"id": f"{rule['id']}@{d.isoformat()}", "date": d.isoformat(), "type": rule["type"],
+               "category": rule["category"], "amount": rule["amount"], "note": rule.get("note", ""),
+               "rule": rule["id"]}
+
+def recurring_entries(rules, end, start=None):
+    # Virtual ledger rows for every rule occurrence in [start, end], merged in date order
+    end = _as_date(end)
+    start = _as_date(start) if start else min((_as_date(r["start"]) for r in rules), default=end)
+    return heapq.merge(*[_rule_entries(r, start, end) for r in rules], key=lambda e: e["date"])
+
+def ledger_rollup(entries, into=None):
+    # {(YYYY-MM, type, category): amount}; memory grows with months × categories, not rows
+    out = {} if into is None else into
+    zero = 0 if MONEY_MODE == "paise" else 0.0
+    for e in entries:
+        key = (e["date"][:7], e["type"], e["category"])
+        out[key] = out.get(key, zero) + e["amount"]
+    return out
+
+def month_range(first, months):
+    d = _as_date(first).replace(day=1)
+    return [_add_months(d, k).strftime("%Y-%m") for k in range(months)]
+
+def budget_report(entries, rules, budgets, first, months=12):
+    # One row per month and expense category that has a budget, actual spend or a recurring rule:
+    # budget, actual (ledger), recurring (virtual rows), total and remaining. Only the months asked
+    # for are expanded, and both sides meet only as rollups.
+    span = month_range(first, months)
+    start = _as_date(span[0] + "-01")
+    end = _add_months(start, months) - datetime.timedelta(days=1)
+    lo, hi = start.isoformat(), end.isoformat()
+    actual = ledger_rollup(e for e in entries if lo <= e["date"] <= hi)
+    recurring = ledger_rollup(recurring_entries(rules, end, start))
+    categories = set(budgets) | {k[2] for k in chain(actual, recurring) if k[1] == "Expense"}
+    zero = 0 if MONEY_MODE == "paise" else 0.0
+    for month in span:
+        for cat in sorted(categories):
+            budget = budgets.get(cat, zero)
+            a = actual.get((month, "Expense", cat), zero)
+            r = recurring.get((month, "Expense", cat), zero)
+            if budget or a or r:
+                yield [month, cat, budget, a, r, a + r, budget - a - r]
+
+# ---------- Live recompute ----------
+# A calculator's outputs as a small dependency graph: node -> (names it reads, function of their
+# values), where names are inputs or earlier nodes. After an edit only the nodes downstream of the
+# inputs that changed are recomputed, and screens repaint only the columns and series those feed.
+LIVE_DELAY_MS = 400           # debounce: recompute once typing has paused this long
+
+class CalcGraph:
+    def __init__(self, nodes):
+        self.nodes = nodes        # definition order is evaluation order
+        self.inputs = {}
+        self.values = {}
+
+    def downstream(self, changed):
+        dirty = set()
+        for name, (deps, _func) in self.nodes.items():
+            if any(d in changed or d in dirty for d in deps):
+                dirty.add(name)
+        return dirty
+
+    def update(self, inputs):
+        # Returns the changed inputs plus the nodes recomputed from them (all of them the first time)
+        changed = {k for k, v in inputs.items() if k not in self.inputs or self.inputs[k] != v}
+        dirty = self.downstream(changed) if self.values else set(self.nodes)
+        self.inputs = dict(inputs)
+        try:
+            for name, (deps, func) in self.nodes.items():
+                if name in dirty:
+                    self.values[name] = func(*(self.inputs[d] if d in self.inputs else self.values[d]
+                                               for d in deps))
+        except Exception:
+            # A failed pass leaves nothing half-updated: the next update starts from scratch
+            self.inputs, self.values = {}, {}
+            raise
+        return changed | dirty
+
+    def __getitem__(self, name):
+        return self.values[name] if name in self.values else self.inputs[name]
+
+def bind_live(frame, widgets, callback, delay=LIVE_DELAY_MS):
+    # Run callback once edits in any of widgets pause for delay ms; a new keystroke restarts the wait
+    pending = {"id": None}
+    def fire():
+        pending["id"] = None
+        if widgets[0].winfo_exists():
+            callback()
+    def schedule(_event=None):
+        if pending["id"]:
+            frame.after_cancel(pending["id"])
+        pending["id"] = frame.after(delay, fire)
+    for w in widgets:
+        w.bind("<KeyRelease>", schedule, add="+")
+        if isinstance(w, ttk.Combobox):
+            w.bind("<<ComboboxSelected>>", schedule, add="+")
+    return schedule
+
+def patch_tree(tree, cols, rows, sources, changed):
+    # Rewrite only the cells of columns whose sources (graph inputs/nodes) changed; a different
+    # row count refills the table
+    iids = tree.get_children()
+    if len(iids) != len(rows):
+        for r in iids: tree.delete(r)
+        for row in rows: tree.insert("", "end", values=row)
+        return
+    stale = [i for i, c in enumerate(cols) if changed.intersection(sources.get(c, ()))]
+    for iid, row in zip(iids, rows):
+        for i in stale:
+            tree.set(iid, cols[i], row[i])
+
+def rounding_combobox(master):
+    # Projection rounding picker for a screen, preset to the configured default
+    combo = ttk.Combobox(master, values=list(ROUNDING_LABELS), state="readonly", width=16)
+    combo.set(next(k for k, v in ROUNDING_LABELS.items() if v == ROUNDING_POLICY))
+    return combo
+
+def _tax_by_year(sip, years, rate, step_up, asset, inflation, other_income):
+    if asset in (None, "None"):
+        return [0.0]*years
+    return post_tax_values(sip, years, rate, asset, step_up, inflation=inflation, other_income=other_income)[0]
+
+def _level_tax_by_year(sip, years, rate, asset, inflation, other_income):
+    return _tax_by_year(sip, years, rate, 0.0, asset, inflation, other_income)
+
+def _sip_projection(sip, years, rate, compounding, start_date, debit_day, rounding):
+    # Calendar compounding accrues by the day in floats; rounding applies to the monthly steps
+    if compounding:
+        return project_sip_calendar(sip, years, rate, start_date, debit_day, compounding=compounding)
+    return project_sip(sip, years, rate, rounding=rounding)
+
+def _step_projection(sip, years, rate, step_up, rounding):
+    return project_sip(sip, years, rate, step_up, rounding=rounding)
+
+def _level_projection(sip, years, rate, rounding):
+    return project_sip(sip, years, rate, rounding=rounding)
+
+def sip_graph():
+    # Inputs: sip, years, rate, inflation, tax, other_income, compounding, start_date, debit_day,
+    # rounding
+    return CalcGraph({
+        "projection": (("sip","years","rate","compounding","start_date","debit_day","rounding"),
+                       _sip_projection),
+        "inflation_adj": (("projection","inflation"), lambda p, inflation: inflation_adjust(p[1], inflation)),
+        # Tax if redeemed at each year end, from the monthly-step lots (calendar values differ by days)
+        "tax_by_year": (("sip","years","rate","tax","inflation","other_income"), _level_tax_by_year),
+        "post_tax_by_year": (("projection","tax_by_year"),
+                             lambda p, tax_by_year: [v - t for v, t in zip(p[1], tax_by_year)]),
+    })
+
+def step_up_graph():
+    # Inputs: sip, years, rate, step_up, inflation, tax, other_income, rounding
+    return CalcGraph({
+        "step": (("sip","years","rate","step_up","rounding"), _step_projection),
+        "norm": (("sip","years","rate","rounding"), _level_projection),
+        "inflation_adj_step": (("step","inflation"), lambda p, inflation: inflation_adjust(p[1], inflation)),
+        "inflation_adj_norm": (("norm","inflation"), lambda p, inflation: inflation_adjust(p[1], inflation)),
+        "tax_step": (("sip","years","rate","step_up","tax","inflation","other_income"), _tax_by_year),
+        "tax_norm": (("sip","years","rate","tax","inflation","other_income"), _level_tax_by_year),
+    })
+
+def inflation_graph():
+    # Inputs: amount, rate, years
+    return CalcGraph({
+        "factors": (("rate","years"), lambda rate, years: [(1+rate/100)**y for y in range(1, years+1)]),
+        "future_costs": (("amount","factors"), lambda amount, factors: [amount * f for f in factors]),
+        "purch_power": (("amount","factors"), lambda amount, factors: [amount / f for f in factors]),
+    })
+
+# ---------- Calculator summaries ----------
+# Headless versions of each screen's calculation. They return the dict the screen keeps for its
+# table, chart and export, and the *_report functions turn that dict into the exported table.
+def sip_data(g):
+    invested_by_year, fv_by_year = g["projection"]
+    inflation_adj_by_year, inflation_adj_total = g["inflation_adj"]
+    return {
+        "years": g["years"],
+        "sip": g["sip"],
+        "invested_by_year": invested_by_year,
+        "fv_by_year": fv_by_year,
+        "invested_total": sum(invested_by_year),
+        "fv_total": fv_by_year[-1],
+        "inflation_adj_total": inflation_adj_total,
+        "inflation_adj_by_year": inflation_adj_by_year,
+        "tax_by_year": g["tax_by_year"],
+        "post_tax_by_year": g["post_tax_by_year"]
+    }
+
+def sip_summary(sip, years, rate, inflation=0.0, tax="None", other_income=0.0,
+                compounding=None, start_date=None, debit_day=None, rounding=None):
+    g = sip_graph()
+    g.update({"sip": sip, "years": years, "rate": rate, "inflation": inflation, "tax": tax,
+              "other_income": other_income, "compounding": compounding, "start_date": start_date,
+              "debit_day": debit_day, "rounding": rounding})
+    return sip_data(g)
+
+def sip_report(data):
+    headers = ["Year","Monthly SIP","Invested","FV","InflationAdj FV","Post-tax FV"]
+    rows = []
+    for i in range(data["years"]):
+        rows.append([
+            i+1,
+            round(data["sip"],2),
+            round(data["invested_by_year"][i],2),
+            round(data["fv_by_year"][i],2),
+            round(data["inflation_adj_by_year"][i],2),
+            round(data["post_tax_by_year"][i],2)
+        ])
+    rows.append([])
+    rows.append(["Total Invested", data["invested_total"]])
+    rows.append(["Final FV", data["fv_total"]])
+    rows.append(["Inflation-adjusted FV", data["inflation_adj_total"]])
+    rows.append(["Post-tax FV", data["post_tax_by_year"][-1]])
+    return headers, rows
+
+def step_up_data(g):
+    (invested_step_by_year, fv_step_by_year), (invested_norm_by_year, fv_norm_by_year) = g["step"], g["norm"]
+    inflation_adj_step_by_year, inflation_adj_step_total = g["inflation_adj_step"]
+    inflation_adj_norm_by_year, inflation_adj_norm_total = g["inflation_adj_norm"]
+    return {
+        "years": g["years"], "sip": g["sip"], "step_up": g["step_up"], "tax": g["tax"],
+        "invested_step_by_year": invested_step_by_year,
+        "fv_step_by_year": fv_step_by_year,
+        "invested_norm_by_year": invested_norm_by_year,
+        "fv_norm_by_year": fv_norm_by_year,
+        "invested_step_total": sum(invested_step_by_year),
+        "invested_norm_total": sum(invested_norm_by_year),
+        "fv_step_total": fv_step_by_year[-1],
+        "fv_norm_total": fv_norm_by_year[-1],
+        "inflation_adj_step_total": inflation_adj_step_total,
+        "inflation_adj_norm_total": inflation_adj_norm_total,
+        "inflation_adj_step_by_year": inflation_adj_step_by_year,
+        "inflation_adj_norm_by_year": inflation_adj_norm_by_year,
+        "post_tax_step_total": fv_step_by_year[-1] - g["tax_step"][-1],
+        "post_tax_norm_total": fv_norm_by_year[-1] - g["tax_norm"][-1]
+    }
+
+def step_up_summary(sip, years, rate, step_up, inflation=0.0, tax="None", other_income=0.0,
+                    rounding=None):
+    g = step_up_graph()
+    g.update({"sip": sip, "years": years, "rate": rate, "step_up": step_up, "inflation": inflation,
+              "tax": tax, "other_income": other_income, "rounding": rounding})
+    return step_up_data(g)
+
+def step_up_report(data):
+    headers = [
+        "Year","Step-up Monthly","Invested Step-up","FV Step-up",
+        "Normal Monthly","Invested Normal","FV Normal","InflAdj Step","InflAdj Normal"
+    ]
+    rows = []
+    for i in range(data["years"]):
+        rows.append([
+            i+1,
+            round(data["sip"]*((1+data["step_up"]/100)**i),2),
+            round(data["invested_step_by_year"][i],2),
+            round(data["fv_step_by_year"][i],2),
+            round(data["sip"],2),
+            round(data["invested_norm_by_year"][i],2),
+            round(data["fv_norm_by_year"][i],2),
+            round(data["inflation_adj_step_by_year"][i],2),
+            round(data["inflation_adj_norm_by_year"][i],2)
+        ])
+    rows.append([])
+    rows.append(["Total Invested (Step-up)", data["invested_step_total"]])
+    rows.append(["Total Invested (Normal)", data["invested_norm_total"]])
+    rows.append(["Final FV (Step-up)", data["fv_step_total"]])
+    rows.append(["Final FV (Normal)", data["fv_norm_total"]])
+    rows.append(["Inflation-adjusted (Step-up)", data["inflation_adj_step_total"]])
+    rows.append(["Inflation-adjusted (Normal)", data["inflation_adj_norm_total"]])
+    rows.append(["Post-tax FV (Step-up)", data["post_tax_step_total"]])
+    rows.append(["Post-tax FV (Normal)", data["post_tax_norm_total"]])
+    return headers, rows
+
+def fire_summary(monthly_exp, current, years, rate, withdrawal_rate=4.0, tax="None", other_income=0.0):
+    # FIRE target from the withdrawal rate (4% rule → 25× yearly expenses)
+    fire_target = monthly_exp * 12 * 100 / withdrawal_rate
+
+    # Required monthly SIP to reach FIRE in 'years'
+    n_months = years * 12
+    if is_schedule(rate):
+        # Glide path: growth and annuity factors come from cumulative products
+        r_monthly = None
+    else:
+        r_annual = rate / 100
+        r_monthly = r_annual / 12 if r_annual != 0 else 0.0
+
+    tax_at_retirement = 0.0
+    if current >= fire_target:
+        required_monthly = 0.0
+        proj_savings = [current] * years
+    else:
+        if r_monthly == 0:
+            required_monthly = (fire_target - current) / n_months
+        else:
+            if r_monthly is None:
+                growth, denom = annuity_factor(rate, years)
+            else:
+                growth = (1 + r_monthly) ** n_months
+                denom = (growth - 1) / r_monthly
+            if denom == 0:
+                raise ValueError("Please adjust inputs.")
+            required_monthly = (fire_target - current * growth) / denom
+
+        if required_monthly < 0:
+            required_monthly = 0.0
+
+        # Taxed on redemption: the corpus must still cover the target after tax
+        if tax != "None":
+            required_monthly = fire_required_sip_after_tax(fire_target, current, years, rate, tax, other_income)
+            if required_monthly > 0:
+                tax_at_retirement = post_tax_values(required_monthly, years, rate, tax, start=current,
+                                                    other_income=other_income)[0][-1]
+
+        _invested, proj_savings = project_sip(required_monthly, years, rate, start=current)
+
+    return {
+        "proj": proj_savings,
+        "years": years,
+        "current": current,
+        "fire_target": fire_target,
+        "withdrawal_rate": withdrawal_rate,
+        "required_monthly": required_monthly,
+        "tax": tax,
+        "tax_at_retirement": tax_at_retirement,
+    }
+
+def fire_report(data):
+    headers = ["Year", "Projected Savings (₹)"]
+    rows = []
+    for i, val in enumerate(data["proj"]):
+        rows.append([i + 1, round(val, 2)])
+    rows.append([])
+    rows.append(["Required Monthly Investment (₹)", round(data["required_monthly"], 2)])
+    rows.append(["FIRE Target (₹)", round(data["fire_target"], 2)])
+    return headers, rows
+
+def loan_summary(principal, rate, years):
+    n = years*12
+    emi = loan_emi(principal, rate, years)
+    return {"emi": emi, "n": n, "P": principal, "rate": rate, "years": years,
+            "interest": emi*n - principal}
+
+def loan_report(data):
+    headers = ["Loan Amount","Annual Rate (%)","Tenure (years)","EMI (₹)","Total Interest (₹)","Total Payable (₹)"]
+    rows = [[
+        data["P"], data["rate"], data["years"],
+        round(data["emi"],2), round(data["interest"],2),
+        round(data["emi"]*data["n"],2)
+    ]]
+    return headers, rows
+
+def inflation_data(g):
+    return {
+        "amount":g["amount"],"rate":g["rate"],"years":g["years"],
+        "future_costs":g["future_costs"],
+        "purch_power":g["purch_power"],
+        "cum_infl":[f - 1 for f in g["factors"]]
+    }
+
+def inflation_summary(amount, rate, years):
+    g = inflation_graph()
+    g.update({"amount": amount, "rate": rate, "years": years})
+    return inflation_data(g)
+
+def inflation_report(data):
+    headers = ["Year","Cumulative Inflation (%)","Future Cost (₹)","Purchasing Power (₹)"]
+    rows = []
+    for i in range(data["years"]):
+        rows.append([
+            i+1,
+            round(data["cum_infl"][i]*100,2),
+            round(data["future_costs"][i],2),
+            round(data["purch_power"][i],2)
+        ])
+    rows.append([]); rows.append(["Original Amount", data["amount"]])
+    rows.append(["Inflation Rate (%)", data["rate"]])
+    return headers, rows
+
+def expense_summary(entries, rules=(), budgets=None, end=None):
+    # Monthly rollup of the ledger plus recurring rules up to end (default today). Amounts are
+    # rupees unless a row or rule carries a unit; budgets are rupees.
+    entries = [ledger_entry(e) for e in entries]
+    rules = [ledger_entry(r) for r in rules]
+    budgets = {c: in_money_mode(v) for c, v in (budgets or {}).items()}
+    everything = chain(entries, recurring_entries(rules, end or today_str())) if rules else entries
+    rollup = ledger_rollup(everything)
+    income = sum(v for k, v in rollup.items() if k[1] == "Income")
+    expense = sum(v for k, v in rollup.items() if k[1] == "Expense")
+    by_category = {}
+    for (_month, kind, cat), v in rollup.items():
+        if kind == "Expense": by_category[cat] = by_category.get(cat, 0) + v
+    return {"rollup": rollup, "income": income, "expense": expense, "by_category": by_category,
+            "budgets": budgets}
+
+def expense_report(data):
+    headers = ["Month","Type","Category",ledger_amount_header(),"Budget"]
+    rows = [[month, kind, cat, amount, data["budgets"].get(cat, "") if kind == "Expense" else ""]
+            for (month, kind, cat), amount in sorted(data["rollup"].items())]
+    rows.append([])
+    rows.append(["Total Income", data["income"]])
+    rows.append(["Total Expenses", data["expense"]])
+    rows.append(["Balance", data["income"] - data["expense"]])
+    return headers, rows
+
+# ---------- Chart rendering ----------
+# One builder per calculator draws its chart from the same data the screen keeps for export, so
+# the screens (FigureCanvasTkAgg) and headless batch renders (Agg, PNG/PDF/SVG) share the code.
+CHART_SIZES = {"sip": (9,3.2), "step_up": (9,3.2), "fire": (9,3.6), "loan": (6,3.8), "inflation": (9,3.2),
+               "expenses": (9,3.6), "drawdown": (9,3.0), "household": (9,3.0), "portfolio": (9,3.0),
+               "heatmap": (9,3.6)}
+CHART_DPI = 95
+CHART_FORMATS = (".png", ".pdf", ".svg")
+CHART_CHUNK = 16              # render jobs handed to a worker process at a time
+
+def _style_axes(fig, ax, title, xlabel="Year", ylabel="Amount (₹)", bg=PRIMARY_BG, legend=True, grid="y"):
+    ax.set_facecolor(bg); fig.patch.set_facecolor(bg)
+    ax.set_xlabel(xlabel); ax.set_ylabel(ylabel)
+    ax.set_title(title, color=HEADING_FG)
+    ax.tick_params(colors=TEXT_FG)
+    for spine in ax.spines.values(): spine.set_color(TEXT_FG)
+    ax.xaxis.label.set_color(TEXT_FG); ax.yaxis.label.set_color(TEXT_FG)
+    if legend: ax.legend(facecolor=SIDEBAR_BG, edgecolor=TEXT_FG)
+    if grid: ax.grid(axis=grid, linestyle="--", alpha=0.3, color=ACCENT_LINE)
+
+def _draw_sip(ax, data, bg):
+    fv = data["fv_by_year"]
+    ax.bar(list(range(1, len(fv)+1)), fv, color=ACCENT_LINE)
+    _style_axes(ax.figure, ax, "Year-by-Year FV (SIP)", ylabel="Future Value (₹)", bg=bg, legend=False)
+
+def _draw_step_up(ax, data, bg):
+    years_list = list(range(1, len(data["fv_step_by_year"])+1))
+    width = 0.35
+    ax.bar([y-width/2 for y in years_list], data["fv_norm_by_year"], width=width, label="Normal SIP", color=ACCENT_LINE)
+    ax.bar([y+width/2 for y in years_list], data["fv_step_by_year"], width=width, label="Step-up SIP", color=ACCENT_BTN)
+    _style_axes(ax.figure, ax, "Year-by-Year FV: Normal vs Step-up", ylabel="Future Value (₹)", bg=bg)
+
+def _draw_fire(ax, data, bg):
+    years_list = list(range(1, len(data["proj"])+1))
+    ax.plot(years_list, data["proj"], marker="o", label="Projected Savings", color=ACCENT_BTN)
+    ax.hlines(data["fire_target"], years_list[0], years_list[-1], colors="#FF7F50",
+              linestyles="--", label="FIRE Target")
+    _style_axes(ax.figure, ax, "Your FIRE Journey", bg=bg)
+
+def _draw_loan(ax, data, bg):
+    sizes = [data["P"], data["interest"]]
+    ax.set_facecolor(bg); ax.figure.patch.set_facecolor(bg)
+    wedges, texts, autotexts = ax.pie(
+        sizes, labels=["Principal (₹)","Interest (₹)"],
+        autopct=lambda p: format_currency(p/100*sum(sizes)),
+        startangle=90
+    )
+    for t in texts+autotexts: t.set_color(TEXT_FG)
+    ax.axis("equal")
+    ax.set_title("Principal vs Interest (Total over loan)", color=HEADING_FG)
+
+def _draw_inflation(ax, data, bg):
+    years_list = list(range(1, len(data["future_costs"])+1))
+    ax.plot(years_list, data["purch_power"], marker="o", label="Purchasing Power", color=ACCENT_BTN)
+    ax.plot(years_list, data["future_costs"], marker="x", linestyle="--", label="Future Cost", color=ACCENT_LINE)
+    _style_axes(ax.figure, ax, "Inflation Impact Over Time", bg=bg)
+
+def _draw_expenses(ax, data, bg):
+    # Ascending, so the largest category is drawn at the top
+    cats = sorted(data["by_category"], key=data["by_category"].get)
+    amounts = [data["by_category"][c] for c in cats]
+    if MONEY_MODE == "paise": amounts = [a/100 for a in amounts]
+    ax.barh(cats, amounts, color=ACCENT_LINE)
+    _style_axes(ax.figure, ax, "Spending by Category", xlabel="Amount (₹)", ylabel="", bg=bg,
+                legend=False, grid="x")
+
+def _draw_drawdown(ax, data, bg):
+    low, median, high = data["balance"]
+    years_list = list(range(len(median)))
+    ax.fill_between(years_list, low, high, color=ACCENT_LINE, alpha=0.25, label="P10–P90")
+    ax.plot(years_list, median, color=ACCENT_LINE, linewidth=2.2, label="Median Balance")
+    ax.plot(years_list[1:], data["spending"], color="#FF7F50", linestyle="--", label="Median Spending")
+    _style_axes(ax.figure, ax, f"Drawdown at {data['rate']:.2f}% Initial Withdrawal",
+                xlabel="Year of Retirement", bg=bg, grid="both")
+
+def _draw_household(ax, data, bg):
+    yearly = data["yearly"]
+    years_list = [r["year"] for r in yearly]
+    allocated = [r["allocated"] for r in yearly]
+    ax.bar(years_list, allocated, label="Allocated", color=ACCENT_BTN)
+    ax.bar(years_list, [r["unallocated"] for r in yearly], bottom=allocated, label="Unallocated", color=ACCENT_LINE)
+    ax.plot(years_list, [r["shortfall"] for r in yearly], color="#FF7F50", marker="o", label="Shortfall")
+    _style_axes(ax.figure, ax, "Surplus Allocation by Year", bg=bg)
+
+def _draw_portfolio(ax, data, bg):
+    low, median, high = data["percentiles"]
+    years_list = list(range(1, len(median)+1))
+    ax.fill_between(years_list, low, high, color=ACCENT_LINE, alpha=0.25, label="P10–P90")
+    ax.plot(years_list, median, color=ACCENT_LINE, linewidth=2.2, label="Median")
+    ax.plot(years_list, data["equity_median"], color="#FF7F50", linestyle="--", label="100% Equity Median")
+    ax.plot(years_list, data["invested"], color=ACCENT_BTN, linewidth=1.6, label="Invested")
+    _style_axes(ax.figure, ax, "Portfolio Value Range", bg=bg, grid="both")
+
+def _draw_heatmap(ax, data, bg):
+    # grid[y, x] over the two swept inputs; the colorbar is made once per figure and rescaled on reuse
+    grid = data["grid"]
+    im = ax.imshow(grid, aspect="auto", origin="lower", cmap="viridis")
+    ax.set_xticks(range(len(data["x_vals"]))); ax.set_xticklabels([f"{v:g}" for v in data["x_vals"]])
+    ax.set_yticks(range(len(data["y_vals"]))); ax.set_yticklabels([f"{v:g}" for v in data["y_vals"]])
+    if grid.size <= 120:
+        for (r, c), v in np.ndenumerate(grid):
+            ax.text(c, r, format_compact(v), ha="center", va="center", fontsize=7, color="white")
+    cbar = getattr(ax, "_colorbar", None)
+    if cbar is None:
+        cbar = ax._colorbar = ax.figure.colorbar(im, ax=ax)
+        cbar.ax.tick_params(colors=TEXT_FG)
+    else:
+        cbar.update_normal(im)
+    ax.set_xlim(-0.5, grid.shape[1] - 0.5); ax.set_ylim(-0.5, grid.shape[0] - 0.5)
+    _style_axes(ax.figure, ax, data["title"], xlabel=data["x_label"], ylabel=data["y_label"], bg=bg,
+                legend=False, grid=None)
+
+CHART_BUILDERS = {"sip": _draw_sip, "step_up": _draw_step_up, "fire": _draw_fire,
+                  "loan": _draw_loan, "inflation": _draw_inflation, "expenses": _draw_expenses,
+                  "drawdown": _draw_drawdown, "household": _draw_household, "portfolio": _draw_portfolio,
+                  "heatmap": _draw_heatmap}
+
+def build_chart(kind, data, fig=None, bg=PRIMARY_BG):
+    # Draw kind's chart into a new Figure, or into a template figure of the same kind: its axes,
+    # ticks and styling are kept and only the data artists are swapped out
+    if fig is None:
+        fig = Figure(figsize=CHART_SIZES[kind], dpi=CHART_DPI)
+    if fig.axes:
+        ax = fig.axes[0]
+        for artist in list(ax.lines) + list(ax.patches) + list(ax.collections) + list(ax.texts) + list(ax.images):
+            artist.remove()
+        ax.containers.clear()
+        ax.set_prop_cycle(None)
+        ax.relim()
+    else:
+        ax = fig.add_subplot(111)
+    CHART_BUILDERS[kind](ax, data, bg)
+    ax.autoscale_view()
+    return fig
+
+def show_chart(container, master, kind, data, bg=PRIMARY_BG):
+    # Show kind's chart in master; a canvas already showing that kind is redrawn in place
+    c = container.get("canvas")
+    if c is not None and getattr(c, "_chart_kind", None) == kind:
+        build_chart(kind, data, c.figure, bg)
+        c.draw_idle()
+        return c
+    if c is not None:
+        c.get_tk_widget().destroy()
+    canvas = FigureCanvasTkAgg(build_chart(kind, data, bg=bg), master=master); canvas.draw()
+    canvas.get_tk_widget().pack(fill="both", expand=True)
+    canvas._chart_kind = kind
+    container["canvas"] = canvas
+    return canvas
+
+_chart_templates = {}
+
+def _chart_template(kind):
+    fig = _chart_templates.get(kind)
+    if fig is None:
+        fig = _chart_templates[kind] = Figure(figsize=CHART_SIZES[kind], dpi=CHART_DPI)
+        FigureCanvasAgg(fig)
+    return fig
+
+def render_chart(kind, data, filename, dpi=None):
+    # Save kind's chart to filename (format from the extension) through this process's reusable
+    # Agg figure for that kind, so a batch pays for figure and canvas setup once per worker
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in CHART_FORMATS:
+        raise ValueError(f"Chart format must be one of {', '.join(CHART_FORMATS)}")
+    fig = build_chart(kind, data, _chart_template(kind))
+    with atomic_path(filename) as tmp:
+        fig.savefig(tmp, format=ext[1:], dpi=dpi or CHART_DPI, facecolor=fig.get_facecolor())
+    return filename
+
+def _render_job(job):
+    return render_chart(*job)
+
+def _worker_pool(workers):
+    # Spawned workers re-import the module, so hand them this process's money settings
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=configure, initargs=(MONEY_MODE, ROUNDING_POLICY))
+
+def render_charts(jobs, workers=None, chunksize=CHART_CHUNK):
+    # Render (kind, data, filename[, dpi]) jobs across worker processes; yields paths in job order.
+    # Workers are spawned, not forked, so they never inherit the Tk interpreter of a running UI.
+    if not MATPLOTLIB_AVAILABLE:
+        raise RuntimeError("Install matplotlib to render charts.")
+    if workers == 1:
+        for job in jobs:
+            yield _render_job(job)
+        return
+    with _worker_pool(workers) as pool:
+        yield from pool.map(_render_job, jobs, chunksize=chunksize)
+
+# ---------- Client workbooks ----------
+# One .xlsx per client: a sheet per calculator summary present in the client's record, each with
+# its report table and chart. Clients are read lazily from a JSON-lines file whose sections hold the
+# matching *_summary arguments, e.g.
+#   {"name": "A. Rao", "sip": {"sip": 5000, "years": 15, "rate": 12, "inflation": 6},
+#    "loan": {"principal": 2500000, "rate": 8.5, "years": 20}}
+# Sheets are write-only, so rows go straight to the zip stream instead of being held as cells, and
+# workbooks are built in spawned worker processes with only a bounded window of clients in flight.
+CLIENT_SHEETS = (
+    ("sip", "SIP", sip_summary, sip_report),
+    ("step_up", "Step-up SIP", step_up_summary, step_up_report),
+    ("fire", "FIRE", fire_summary, fire_report),
+    ("loan", "Loan", loan_summary, loan_report),
+    ("inflation", "Inflation", inflation_summary, inflation_report),
+    ("expenses", "Expenses", expense_summary, expense_report),
+)
+CLIENT_WINDOW = 4             # workbooks queued per worker process
+
+def load_clients(filename):
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def client_filename(client, index=0, taken=None):
+    # Safe file name from the client's name; with a taken set (lower-cased, as Windows and macOS
+    # compare names) a repeated name gets _2, _3, ... instead of overwriting the earlier workbook
+    name = str(client.get("name") or f"Client_{index+1}")
+    safe = "".join(c if c.isalnum() or c in " -_." else "_" for c in name).strip(" .")
+    stem = safe or f"Client_{index+1}"
+    if taken is None:
+        return f"{stem}.xlsx"
+    candidate, k = stem, 1
+    while candidate.lower() in taken:
+        k += 1
+        candidate = f"{stem}_{k}"
+    taken.add(candidate.lower())
+    return f"{candidate}.xlsx"
+
+def chart_png(kind, data, dpi=None):
+    # PNG bytes of kind's chart, drawn on this process's template figure
+    buf = io.BytesIO()
+    fig = build_chart(kind, data, _chart_template(kind))
+    fig.savefig(buf, format="png", dpi=dpi or CHART_DPI, facecolor=fig.get_facecolor())
+    buf.seek(0)
+    return buf
+
+def write_client_workbook(client, filename, charts=True):
+    # Charts need matplotlib (drawing) and Pillow (openpyxl's image embedding); without them the
+    # sheets are written with their tables only
+    if not OPENPYXL_AVAILABLE:
+        raise RuntimeError("Install openpyxl to write client workbooks.")
+    if charts and MATPLOTLIB_AVAILABLE:
+        try:
+            from openpyxl.drawing.image import Image
+        except ImportError:
+            charts = False
+    else:
+        charts = False
+    wb = Workbook(write_only=True)
+    for key, title, summary, report in CLIENT_SHEETS:
+        if key not in client:
+            continue
+        data = summary(**client[key])
+        headers, rows = report(data)
+        ws = wb.create_sheet(title)
+        ws.append(_header_cells(ws, headers))
         for r in rows:
             ws.append(r)
-        bold = Font(bold=True)
-        fill = PatternFill(start_color=TABLE_HEADER_FILL, end_color=TABLE_HEADER_FILL, fill_type="solid")
-        for c in range(1, len(headers)+1):
-            cell = ws.cell(row=1, column=c)
-            cell.font = bold
-            cell.fill = fill
-            cell.alignment = Alignment(horizontal="center")
-        for i, col in enumerate(ws.columns, start=1):
-            max_len = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-            ws.column_dimensions[get_column_letter(i)].width = max_len + 4
-        wb.save(filename)
-    else:
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(headers)
-            for r in rows:
-                w.writerow(r)
+        if charts:
+            ws.add_image(Image(chart_png(key, data)), f"{get_column_letter(len(headers) + 2)}2")
+    if not wb.worksheets:
+        wb.create_sheet("Summary")
+    with atomic_path(filename) as tmp:
+        wb.save(tmp)
     return filename
 
+def _client_workbook_job(job):
+    # (path, None) or (path, error): one malformed client record must not abort the batch
+    try:
+        return write_client_workbook(*job), None
+    except Exception as e:
+        return job[1], f"{type(e).__name__}: {e}"
+
+def write_client_workbooks(clients, directory=REPORTS_DIR, workers=None, charts=True):
+    # Yields (path, error) per client in client order; error is None when the workbook was written.
+    # At most workers × CLIENT_WINDOW clients are submitted ahead of the one being collected, so a
+    # large client file is never loaded whole.
+    os.makedirs(directory, exist_ok=True)
+    taken = set()
+    jobs = ((c, os.path.join(directory, client_filename(c, i, taken)), charts) for i, c in enumerate(clients))
+    if workers == 1:
+        for job in jobs:
+            yield _client_workbook_job(job)
+        return
+    with _worker_pool(workers) as pool:
+        window = (workers or os.cpu_count() or 1) * CLIENT_WINDOW
+        pending = deque(pool.submit(_client_workbook_job, job) for job in islice(jobs, window))
+        while pending:
+            result = pending.popleft().result()
+            for job in islice(jobs, 1):
+                pending.append(pool.submit(_client_workbook_job, job))
+            yield result
+
 # ---------- Expense Tracker ----------
+def _cell_date(v):
+    # Excel date cells load as datetime (midnight); text cells are used as typed
+    if isinstance(v, datetime.datetime):
+        return v.date().isoformat()
+    if isinstance(v, datetime.date):
+        return v.isoformat()
+    return str(v).strip()
+
+def ledger_rows(headers, rows):
+    # Ledger entries from an exported table (any load_report format) and the count of rows skipped
+    idx = {h: i for i, h in enumerate(headers)}
+    in_paise = "Amount (paise)" in idx
+    amount_col = idx["Amount (paise)"] if in_paise else idx.get("Amount")
+    if amount_col is None or not all(h in idx for h in ("Date","Type")):
+        raise ValueError("File needs Date, Type and Amount columns.")
+    new, skipped = [], 0
+    for r in rows:
+        try:
+            d = _cell_date(r[idx["Date"]])
+            datetime.datetime.strptime(d, "%Y-%m-%d")
+            t = str(r[idx["Type"]]).strip()
+            amt = in_money_mode(int(r[amount_col]), "paise") if in_paise else ledger_amount(r[amount_col])
+            if t not in ("Expense","Income") or amt <= 0: raise ValueError
+        except Exception:
+            skipped += 1; continue
+        cat = r[idx["Category"]] if "Category" in idx else None
+        note = r[idx["Note"]] if "Note" in idx else None
+        new.append({"date":d,"type":t,"category":cat or "Other","amount":amt,"note":note or ""})
+    return new, skipped
+
 def show_expense_tracker(frame):
     for w in frame.winfo_children(): w.destroy()
     bg = PRIMARY_BG
@@ -111,27 +2476,59 @@ def show_expense_tracker(frame):
     entry_note = tk.Entry(form, width=60)
     entry_note.grid(row=2, column=1, columnspan=3, padx=4, pady=4, sticky="w")
 
+    tk.Label(form, text="Repeat:", bg=bg, fg=TEXT_FG).grid(row=3, column=0, sticky="w", padx=4, pady=4)
+    combo_repeat = ttk.Combobox(form, values=list(RECURRENCE_MONTHS), state="readonly", width=12)
+    combo_repeat.grid(row=3, column=1, padx=4, pady=4, sticky="w"); combo_repeat.set("Monthly")
+    tk.Label(form, text="Until (optional):", bg=bg, fg=TEXT_FG).grid(row=3, column=2, sticky="w", padx=4, pady=4)
+    entry_until = tk.Entry(form)
+    entry_until.grid(row=3, column=3, padx=4, pady=4)
+
     btn_frame = tk.Frame(frame, bg=bg); btn_frame.pack(fill="x", padx=16, pady=(6,8))
 
-    if not hasattr(show_expense_tracker, "entries"):
+    if not hasattr(show_expense_tracker, "store"):
+        show_expense_tracker.store = LedgerStore()
         show_expense_tracker.entries = []
+        show_expense_tracker.budget = load_budget()
+    store = show_expense_tracker.store
+
+    def with_recurring(entries):
+        # Stored rows plus the recurring rules' occurrences up to today, expanded on the fly
+        return chain(entries, recurring_entries(show_expense_tracker.budget["rules"], today_str()))
 
     def update_summary():
-        income = sum(e["amount"] for e in show_expense_tracker.entries if e["type"]=="Income")
-        expense = sum(e["amount"] for e in show_expense_tracker.entries if e["type"]=="Expense")
+        income, expense = ledger_totals(with_recurring(show_expense_tracker.entries))
         balance = income - expense
         summary_var.set(
-            f"Income: {format_currency(income)}   |   "
-            f"Expenses: {format_currency(expense)}   |   "
-            f"Balance: {format_currency(balance)}"
+            f"Income: {format_amount(income)}   |   "
+            f"Expenses: {format_amount(expense)}   |   "
+            f"Balance: {format_amount(balance)}   |   "
+            f"Recurring rules: {len(show_expense_tracker.budget['rules'])}"
         )
 
+    def refresh_budget():
+        show_expense_tracker.budget = load_budget()
+        for r in rules_tree.get_children(): rules_tree.delete(r)
+        for rule in show_expense_tracker.budget["rules"]:
+            rules_tree.insert("", "end", iid=rule["id"], values=(
+                rule["every"], rule["start"], rule.get("end") or "-", rule["type"], rule["category"],
+                format_amount(rule["amount"]), rule.get("note", "")))
+        for r in budget_tree.get_children(): budget_tree.delete(r)
+        budget = show_expense_tracker.budget
+        for row in budget_report(show_expense_tracker.entries, budget["rules"], budget["budgets"],
+                                 today_str(), months=1):
+            budget_tree.insert("", "end", values=(row[1],) + tuple(format_amount(v) for v in row[2:]))
+
     def refresh_table():
+        try:
+            show_expense_tracker.entries = store.snapshot()
+        except Exception as ex:
+            messagebox.showerror("Ledger unavailable", str(ex))
         for r in tree.get_children(): tree.delete(r)
-        for idx,e in enumerate(show_expense_tracker.entries):
-            tree.insert("", "end", iid=str(idx),
+        for e in show_expense_tracker.entries:
+            tree.insert("", "end", iid=e["id"],
                         values=(e["date"],e["type"],e["category"],
-                                format_currency(e["amount"]),e["note"]))
+                                format_amount(e["amount"]),e["note"]))
+        refresh_budget()
         update_summary()
 
     def add_entry():
@@ -146,42 +2543,154 @@ def show_expense_tracker(frame):
         except Exception:
             messagebox.showerror("Invalid date", "Use YYYY-MM-DD."); return
         try:
-            amt = float(entry_amount.get().strip())
+            amt = ledger_amount(entry_amount.get().strip())
             if amt <= 0: raise ValueError
         except Exception:
             messagebox.showerror("Invalid amount", "Enter positive numeric amount."); return
-        show_expense_tracker.entries.append(
-            {"date":d,"type":t,"category":cat,"amount":amt,"note":note}
-        )
+        store.add({"date":d,"type":t,"category":cat,"amount":amt,"note":note})
         entry_amount.delete(0,tk.END); entry_note.delete(0,tk.END)
         refresh_table()
 
+    def read_form():
+        d = entry_date.get().strip()
+        t = combo_type.get().strip()
+        cat = combo_category.get().strip() or "Other"
+        try:
+            datetime.datetime.strptime(d, "%Y-%m-%d")
+            amt = ledger_amount(entry_amount.get().strip())
+            if not t or amt <= 0: raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid", "Enter type, a YYYY-MM-DD date and a positive amount."); return None
+        return d, t, cat, amt
+
+    def add_recurring():
+        form_values = read_form()
+        if not form_values: return
+        d, t, cat, amt = form_values
+        until = entry_until.get().strip()
+        try:
+            if until and _as_date(until) < _as_date(d): raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid date", "Until must be a YYYY-MM-DD date after the start."); return
+        rule = {"id": uuid.uuid4().hex, "type": t, "category": cat, "amount": amt,
+                "note": entry_note.get().strip(), "every": combo_repeat.get(), "start": d, "end": until or None}
+        update_budget(lambda data: data["rules"].append(rule))
+        entry_amount.delete(0,tk.END); entry_note.delete(0,tk.END); entry_until.delete(0,tk.END)
+        refresh_table()
+
+    def delete_rules():
+        sel = set(rules_tree.selection())
+        if not sel: return
+        def drop(data):
+            data["rules"] = [r for r in data["rules"] if r["id"] not in sel]
+        update_budget(drop)
+        refresh_table()
+
+    def set_budget():
+        cat = combo_category.get().strip()
+        try:
+            amt = ledger_amount(entry_amount.get().strip())
+            if not cat or amt < 0: raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid", "Pick a category and enter its monthly budget as the amount."); return
+        def put(data):
+            if amt: data["budgets"][cat] = amt
+            else: data["budgets"].pop(cat, None)
+        update_budget(put)
+        entry_amount.delete(0,tk.END)
+        refresh_table()
+
+    def export_budget():
+        budget = show_expense_tracker.budget
+        months = simpledialog.askinteger("Budget vs Actual", "Months to report from this month:",
+                                         initialvalue=12, minvalue=1, maxvalue=600, parent=frame)
+        if not months: return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xlsx" if OPENPYXL_AVAILABLE else ".csv",
+            initialfile=os.path.join(REPORTS_DIR,f"Budget_{today_str()}"),
+            filetypes=report_filetypes()
+        )
+        if not filename: return
+        headers = budget_headers()
+        path = stream_report(filename, headers, budget_report(
+            show_expense_tracker.entries, budget["rules"], budget["budgets"], today_str(), months),
+            int_columns=headers[2:] if MONEY_MODE == "paise" else ())
+        messagebox.showinfo("Exported", f"Saved to {path}")
+
     def delete_selected():
         sel = tree.selection()
         if not sel: return
-        for item in sorted(sel, reverse=True):
-            idx = int(item); show_expense_tracker.entries.pop(idx)
+        store.delete(sel)
         refresh_table()
 
     def export_entries():
-        if not show_expense_tracker.entries:
+        entries = store.snapshot()
+        if not entries:
             messagebox.showinfo("No data","Nothing to export."); return
-        headers = ["Date","Type","Category","Amount","Note"]
+        headers = ["Date","Type","Category",ledger_amount_header(),"Note"]
         rows = [[e["date"],e["type"],e["category"],e["amount"],e["note"]]
-                for e in show_expense_tracker.entries]
+                for e in entries]
         path = save_to_excel_or_csv(
             os.path.join(REPORTS_DIR,f"Expenses_{today_str()}"),
             headers, rows
         )
         if path: messagebox.showinfo("Exported", f"Saved to {path}")
 
+    def import_entries():
+        filename = filedialog.askopenfilename(
+            initialdir=REPORTS_DIR,
+            filetypes=[("Ledger files", " ".join(p for _, p in report_filetypes()))] + report_filetypes()
+        )
+        if not filename: return
+        try:
+            headers, rows, _summary = load_report(filename)
+        except Exception as ex:
+            messagebox.showerror("Import failed", str(ex)); return
+        try:
+            new, skipped = ledger_rows(headers, rows)
+        except ValueError as ex:
+            messagebox.showerror("Import failed", str(ex)); return
+        store.commit(add=new)
+        refresh_table()
+        messagebox.showinfo("Imported", f"Added {len(new)} entries" + (
+            f", skipped {skipped} row(s) without a YYYY-MM-DD date, an Expense/Income type "
+            f"and a positive amount." if skipped else "."))
+
     ttk.Button(btn_frame, text="Add Entry", command=add_entry).pack(side="left", padx=6)
     ttk.Button(btn_frame, text="Delete Selected", command=delete_selected).pack(side="left", padx=6)
+    ttk.Button(btn_frame, text="Refresh", command=refresh_table).pack(side="left", padx=6)
     ttk.Button(btn_frame, text="Export", command=export_entries).pack(side="left", padx=6)
+    def show_investment_xirr():
+        flows = ledger_cashflows(with_recurring(show_expense_tracker.entries))
+        if not flows:
+            messagebox.showinfo("No data","Add dated entries in the Investment category first."); return
+        value = simpledialog.askfloat("Investment XIRR", "Current portfolio value (₹):",
+                                      minvalue=0.0, parent=frame)
+        if value is None: return
+        series = CashflowSeries(flows)
+        series.append(today_str(), value)
+        rate = series.xirr()
+        if rate is None:
+            messagebox.showinfo("Investment XIRR","Need at least one contribution and a positive value."); return
+        invested = -sum(a for _, a in flows if a < 0)
+        messagebox.showinfo("Investment XIRR", (
+            f"Invested: {format_currency(invested)}\n"
+            f"Current value: {format_currency(value)}\n"
+            f"XIRR: {rate*100:.2f}% per year"
+        ))
+
+    ttk.Button(btn_frame, text="Import", command=import_entries).pack(side="left", padx=6)
+    ttk.Button(btn_frame, text="Investment XIRR", command=show_investment_xirr).pack(side="left", padx=6)
+
+    rule_btns = tk.Frame(frame, bg=bg); rule_btns.pack(fill="x", padx=16, pady=(0,6))
+    ttk.Button(rule_btns, text="Add Recurring", command=add_recurring).pack(side="left", padx=6)
+    ttk.Button(rule_btns, text="Delete Rule", command=delete_rules).pack(side="left", padx=6)
+    ttk.Button(rule_btns, text="Set Budget", command=set_budget).pack(side="left", padx=6)
+    ttk.Button(rule_btns, text="Export Budget vs Actual", command=export_budget).pack(side="left", padx=6)
 
     tree_frame = tk.Frame(frame, bg=bg); tree_frame.pack(fill="both", expand=True, padx=16, pady=(6,12))
     cols = ("date","type","category","amount","note")
-    tree = ttk.Treeview(tree_frame, columns=cols, show="headings", height=12)
+    tree = ttk.Treeview(tree_frame, columns=cols, show="headings", height=8)
     for c in cols: tree.heading(c, text=c.capitalize())
     tree.column("date", width=100, anchor="center")
     tree.column("type", width=80, anchor="center")
@@ -191,6 +2700,20 @@ def show_expense_tracker(frame):
     vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
     tree.configure(yscroll=vsb.set); vsb.pack(side="right", fill="y"); tree.pack(side="left", fill="both", expand=True)
 
+    plan_frame = tk.Frame(frame, bg=bg); plan_frame.pack(fill="x", padx=16, pady=(0,6))
+    rule_cols = ("every","start","end","type","category","amount","note")
+    rules_tree = ttk.Treeview(plan_frame, columns=rule_cols, show="headings", height=4)
+    for c in rule_cols: rules_tree.heading(c, text=c.capitalize())
+    for c in rule_cols: rules_tree.column(c, width=80, anchor="center")
+    rules_tree.column("amount", width=100, anchor="e"); rules_tree.column("note", width=140, anchor="w")
+    rules_tree.pack(side="left", fill="x", expand=True)
+    budget_cols = ("category","budget","actual","recurring","total","remaining")
+    budget_tree = ttk.Treeview(plan_frame, columns=budget_cols, show="headings", height=4)
+    for c in budget_cols: budget_tree.heading(c, text=c.capitalize())
+    budget_tree.column("category", width=100, anchor="center")
+    for c in budget_cols[1:]: budget_tree.column(c, width=90, anchor="e")
+    budget_tree.pack(side="left", fill="x", expand=True, padx=(8,0))
+
     summary_var = tk.StringVar()
     summary_var.set("Income: ₹0.00   |   Expenses: ₹0.00   |   Balance: ₹0.00")
     tk.Label(frame, textvariable=summary_var, bg=SIDEBAR_BG, fg="#A5D8FF",
@@ -215,13 +2738,25 @@ def show_step_up_vs_sip(frame):
         tk.Label(grid, text=lbl, bg=bg, fg=TEXT_FG).grid(row=i, column=0, sticky="w", padx=6, pady=6)
         e = tk.Entry(grid, width=14); e.grid(row=i, column=1, sticky="w", padx=6, pady=6)
         entries[lbl] = e
+    tk.Label(grid, text=SCHEDULE_HINT, bg=bg, fg="#94A3B8").grid(row=len(labels), column=0, columnspan=2, sticky="w", padx=6)
+    tk.Label(grid, text="Tax Treatment:", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=6, pady=6)
+    combo_tax = ttk.Combobox(grid, values=list(TAX_TREATMENTS), state="readonly", width=12)
+    combo_tax.grid(row=0, column=3, sticky="w", padx=6, pady=6); combo_tax.set("None")
+    tk.Label(grid, text="Other Income (₹/yr):", bg=bg, fg=TEXT_FG).grid(row=1, column=2, sticky="w", padx=6, pady=6)
+    e_income = tk.Entry(grid, width=14); e_income.grid(row=1, column=3, sticky="w", padx=6, pady=6)
+    e_income.insert(0, "0")
+    tk.Label(grid, text="Rounding:", bg=bg, fg=TEXT_FG).grid(row=2, column=2, sticky="w", padx=6, pady=6)
+    combo_round = rounding_combobox(grid); combo_round.grid(row=2, column=3, sticky="w", padx=6, pady=6)
 
     btn_row = tk.Frame(frame, bg=bg); btn_row.pack(fill="x", padx=16, pady=(0,8))
     compare_btn = tk.Button(btn_row, text="Compare SIPs", bg=ACCENT_BTN, fg="black",
                             font=("Segoe UI",10,"bold"))
     export_btn = tk.Button(btn_row, text="Export Results", bg=ACCENT_BTN_2, fg="black",
                            state="disabled", font=("Segoe UI",10,"bold"))
+    sweep_btn = tk.Button(btn_row, text="Sensitivity Heatmap", bg=ACCENT_BTN_2, fg="black",
+                          font=("Segoe UI",10,"bold"))
     compare_btn.pack(side="left", padx=(0,8)); export_btn.pack(side="left", padx=8)
+    sweep_btn.pack(side="left", padx=8)
 
     table_frame = tk.Frame(frame, bg=bg); table_frame.pack(fill="both", expand=False, padx=16, pady=(6,8))
     cols = ("year","step_monthly","step_invested","step_fv","norm_monthly",
@@ -245,72 +2780,56 @@ def show_step_up_vs_sip(frame):
 
     chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6,12))
     chart_canvas_container = {"canvas": None}
+    graph = step_up_graph()
+    # Graph inputs / nodes each table column is computed from: an inflation edit, say, only
+    # touches the two inflation-adjusted columns and leaves the FV loops and the chart alone
+    col_sources = {
+        "step_monthly": ("sip","step_up"), "step_invested": ("step",), "step_fv": ("step",),
+        "norm_monthly": ("sip",), "norm_invested": ("norm",), "norm_fv": ("norm",),
+        "inflation_adj_step": ("inflation_adj_step",), "inflation_adj_norm": ("inflation_adj_norm",)
+    }
 
-    def clear_chart():
-        c = chart_canvas_container.get("canvas")
-        if c:
-            c.get_tk_widget().destroy()
-            chart_canvas_container["canvas"] = None
-
-    def calculate_and_display():
+    def calculate_and_display(live=False):
         try:
             sip = float(entries["Monthly SIP (₹)"].get())
             years = int(entries["Duration (years)"].get())
-            rate = float(entries["Expected Annual Return (%)"].get())
+            rate = parse_schedule(entries["Expected Annual Return (%)"].get())
             step_up = float(entries["Step-Up % per year"].get())
-            inflation = float(entries["Expected Inflation (%)"].get())
+            inflation = parse_schedule(entries["Expected Inflation (%)"].get())
+            other_income = float(e_income.get() or 0)
             if years <= 0 or sip <= 0: raise ValueError
+            rate_schedule(rate, years); rate_schedule(inflation, years)
         except Exception:
-            messagebox.showerror("Invalid input","Enter positive numbers in all fields."); return
-
-        monthly_rate = rate/12/100
-        total_months = years*12
-
-        invested_step_by_year = [0.0]*years
-        fv_step_by_year = [0.0]*years
-        invested_norm_by_year = [0.0]*years
-        fv_norm_by_year = [0.0]*years
-
-        fv_step = fv_norm = 0.0
-        invested_step_total = invested_norm_total = 0.0
-
-        for m in range(total_months):
-            y = m//12
-            monthly_step = sip * ((1+step_up/100)**y)
-            fv_step = fv_step*(1+monthly_rate) + monthly_step
-            invested_step_total += monthly_step
-            invested_step_by_year[y] += monthly_step
-
-            fv_norm = fv_norm*(1+monthly_rate) + sip
-            invested_norm_total += sip
-            invested_norm_by_year[y] += sip
-
-            if (m+1)%12 == 0:
-                fv_step_by_year[y] = fv_step
-                fv_norm_by_year[y] = fv_norm
-
-        inflation_adj_step_total = fv_step / ((1+inflation/100)**years)
-        inflation_adj_norm_total = fv_norm / ((1+inflation/100)**years)
-        inflation_adj_step_by_year = [
-            fv_step_by_year[i]/((1+inflation/100)**(years-i-1)) for i in range(years)
-        ]
-        inflation_adj_norm_by_year = [
-            fv_norm_by_year[i]/((1+inflation/100)**(years-i-1)) for i in range(years)
-        ]
+            if not live:
+                messagebox.showerror("Invalid input","Enter positive numbers in all fields.")
+            return
 
-        for r in tree.get_children(): tree.delete(r)
-        for i in range(years):
-            tree.insert("", "end", values=(
-                i+1,
-                format_currency(round(sip*((1+step_up/100)**i),2)),
-                format_currency(round(invested_step_by_year[i],2)),
-                format_currency(round(fv_step_by_year[i],2)),
-                format_currency(round(sip,2)),
-                format_currency(round(invested_norm_by_year[i],2)),
-                format_currency(round(fv_norm_by_year[i],2)),
-                format_currency(round(inflation_adj_step_by_year[i],2)),
-                format_currency(round(inflation_adj_norm_by_year[i],2)),
-            ))
+        asset = combo_tax.get()
+        changed = graph.update({"sip": sip, "years": years, "rate": rate, "step_up": step_up,
+                                "inflation": inflation, "tax": asset, "other_income": other_income,
+                                "rounding": ROUNDING_LABELS[combo_round.get()]})
+        data = step_up_data(graph)
+        invested_step_by_year, fv_step_by_year = data["invested_step_by_year"], data["fv_step_by_year"]
+        invested_norm_by_year, fv_norm_by_year = data["invested_norm_by_year"], data["fv_norm_by_year"]
+        fv_step, fv_norm = data["fv_step_total"], data["fv_norm_total"]
+        invested_step_total, invested_norm_total = data["invested_step_total"], data["invested_norm_total"]
+        inflation_adj_step_by_year = data["inflation_adj_step_by_year"]
+        inflation_adj_norm_by_year = data["inflation_adj_norm_by_year"]
+        inflation_adj_step_total = data["inflation_adj_step_total"]
+        inflation_adj_norm_total = data["inflation_adj_norm_total"]
+        post_tax_step, post_tax_norm = data["post_tax_step_total"], data["post_tax_norm_total"]
+
+        patch_tree(tree, cols, [(
+            i+1,
+            format_currency(round(sip*((1+step_up/100)**i),2)),
+            format_currency(round(invested_step_by_year[i],2)),
+            format_currency(round(fv_step_by_year[i],2)),
+            format_currency(round(sip,2)),
+            format_currency(round(invested_norm_by_year[i],2)),
+            format_currency(round(fv_norm_by_year[i],2)),
+            format_currency(round(inflation_adj_step_by_year[i],2)),
+            format_currency(round(inflation_adj_norm_by_year[i],2)),
+        ) for i in range(years)], col_sources, changed)
 
         diff = fv_step - fv_norm
         result_label.config(text=(
@@ -321,85 +2840,64 @@ def show_step_up_vs_sip(frame):
             f"Difference: {format_currency(diff)}    "
             f"Inflation-adjusted → Step-up: {format_currency(inflation_adj_step_total)} | "
             f"Normal: {format_currency(inflation_adj_norm_total)}"
+            + (f"    Post-tax ({asset}) → Step-up: {format_currency(post_tax_step)} | "
+               f"Normal: {format_currency(post_tax_norm)}" if asset != "None" else "")
         ))
 
         export_btn.config(state="normal")
+        tree._calc = data
 
-        clear_chart()
+        # Both series are FV by year; a heatmap in the chart area is replaced
         if not MATPLOTLIB_AVAILABLE:
-            tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
-            return
-
-        years_list = list(range(1, years+1))
-        fig = Figure(figsize=(9,3.2), dpi=95)
-        ax = fig.add_subplot(111)
-        width = 0.35
-        ax.bar([y-width/2 for y in years_list], fv_norm_by_year, width=width, label="Normal SIP", color=ACCENT_LINE)
-        ax.bar([y+width/2 for y in years_list], fv_step_by_year, width=width, label="Step-up SIP", color=ACCENT_BTN)
-        ax.set_facecolor(bg); fig.patch.set_facecolor(bg)
-        ax.set_xlabel("Year"); ax.set_ylabel("Future Value (₹)")
-        ax.set_title("Year-by-Year FV: Normal vs Step-up", color=HEADING_FG)
-        ax.tick_params(colors=TEXT_FG)
-        for spine in ax.spines.values(): spine.set_color(TEXT_FG)
-        ax.xaxis.label.set_color(TEXT_FG); ax.yaxis.label.set_color(TEXT_FG)
-        ax.legend(facecolor=SIDEBAR_BG, edgecolor=TEXT_FG)
-        ax.grid(axis="y", linestyle="--", alpha=0.3, color=ACCENT_LINE)
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame); canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        chart_canvas_container["canvas"] = canvas
-
-        tree._calc = {
-            "years": years, "sip": sip, "step_up": step_up,
-            "invested_step_by_year": invested_step_by_year,
-            "fv_step_by_year": fv_step_by_year,
-            "invested_norm_by_year": invested_norm_by_year,
-            "fv_norm_by_year": fv_norm_by_year,
-            "invested_step_total": invested_step_total,
-            "invested_norm_total": invested_norm_total,
-            "fv_step_total": fv_step,
-            "fv_norm_total": fv_norm,
-            "inflation_adj_step_total": inflation_adj_step_total,
-            "inflation_adj_norm_total": inflation_adj_norm_total,
-            "inflation_adj_step_by_year": inflation_adj_step_by_year,
-            "inflation_adj_norm_by_year": inflation_adj_norm_by_year
-        }
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
+        elif changed & {"step", "norm"} or getattr(chart_canvas_container["canvas"], "_chart_kind", None) != "step_up":
+            show_chart(chart_canvas_container, chart_frame, "step_up", data, bg)
 
     def export_comparison():
         data = getattr(tree, "_calc", None)
         if not data:
             messagebox.showinfo("No data","Run comparison first."); return
-        headers = [
-            "Year","Step-up Monthly","Invested Step-up","FV Step-up",
-            "Normal Monthly","Invested Normal","FV Normal","InflAdj Step","InflAdj Normal"
-        ]
-        rows = []
-        for i in range(data["years"]):
-            rows.append([
-                i+1,
-                round(data["sip"]*((1+data["step_up"]/100)**i),2),
-                round(data["invested_step_by_year"][i],2),
-                round(data["fv_step_by_year"][i],2),
-                round(data["sip"],2),
-                round(data["invested_norm_by_year"][i],2),
-                round(data["fv_norm_by_year"][i],2),
-                round(data["inflation_adj_step_by_year"][i],2),
-                round(data["inflation_adj_norm_by_year"][i],2)
-            ])
-        rows.append([])
-        rows.append(["Total Invested (Step-up)", data["invested_step_total"]])
-        rows.append(["Total Invested (Normal)", data["invested_norm_total"]])
-        rows.append(["Final FV (Step-up)", data["fv_step_total"]])
-        rows.append(["Final FV (Normal)", data["fv_norm_total"]])
-        rows.append(["Inflation-adjusted (Step-up)", data["inflation_adj_step_total"]])
-        rows.append(["Inflation-adjusted (Normal)", data["inflation_adj_norm_total"]])
+        headers, rows = step_up_report(data)
         path = save_to_excel_or_csv(
             os.path.join(REPORTS_DIR,f"StepUp_vs_SIP_{today_str()}"),
             headers, rows
         )
         if path: messagebox.showinfo("Exported", f"Saved to {path}")
 
+    def show_sensitivity():
+        try:
+            sip = float(entries["Monthly SIP (₹)"].get())
+            years = int(entries["Duration (years)"].get())
+            rate = float(entries["Expected Annual Return (%)"].get())
+            step_up = float(entries["Step-Up % per year"].get())
+            inflation = float(entries["Expected Inflation (%)"].get() or 0)
+            other_income = float(e_income.get() or 0)
+            if years <= 0 or sip <= 0: raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input","Enter SIP, duration, a single return, step-up and inflation %."); return
+        if not (NUMPY_AVAILABLE and MATPLOTLIB_AVAILABLE):
+            messagebox.showinfo("Unavailable","Install numpy and matplotlib for the heatmap."); return
+        rates = sweep_axis(rate, 1.0)
+        step_ups = sweep_axis(step_up, 2.5)
+        asset = combo_tax.get()
+        if asset == "None":
+            fv = lambda step_up, rate, years: step_up_fv_vec(sip, rate, step_up, years)
+        else:
+            fv = lambda step_up, rate, years: post_tax_fv_vec(sip, rate, step_up, years, asset,
+                                                              inflation=inflation, other_income=other_income)
+        grid = sweep(fv, {"step_up": step_ups, "rate": rates, "years": [years]})[:, :, 0]
+        show_chart(chart_canvas_container, chart_frame, "heatmap", {
+            "grid": grid, "x_vals": rates, "y_vals": step_ups,
+            "x_label": "Expected Annual Return (%)", "y_label": "Step-Up % per year",
+            "title": f"Final FV (Step-up SIP) after {years} years" + (f", post-tax ({asset})" if asset != "None" else "")
+        }, bg)
+
     compare_btn.config(command=calculate_and_display)
     export_btn.config(command=export_comparison)
+    sweep_btn.config(command=show_sensitivity)
+    bind_live(frame, list(entries.values()) + [combo_tax, e_income, combo_round],
+              lambda: calculate_and_display(live=True))
 
 # ---------- SIP Calculator ----------
 def show_sip_calculator(frame):
@@ -417,6 +2915,24 @@ def show_sip_calculator(frame):
         tk.Label(grid, text=lbl, bg=bg, fg=TEXT_FG).grid(row=i, column=0, sticky="w", padx=6, pady=6)
         e = tk.Entry(grid, width=16); e.grid(row=i, column=1, sticky="w", padx=6, pady=6)
         entries[lbl] = e
+    tk.Label(grid, text=SCHEDULE_HINT, bg=bg, fg="#94A3B8").grid(row=len(labels), column=0, columnspan=2, sticky="w", padx=6)
+
+    tk.Label(grid, text="Compounding:", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=6, pady=6)
+    combo_comp = ttk.Combobox(grid, values=list(COMPOUNDING_LABELS), state="readonly", width=20)
+    combo_comp.grid(row=0, column=3, sticky="w", padx=6, pady=6); combo_comp.set("Monthly steps")
+    tk.Label(grid, text="Start Date (YYYY-MM-DD):", bg=bg, fg=TEXT_FG).grid(row=1, column=2, sticky="w", padx=6, pady=6)
+    e_start = tk.Entry(grid, width=16); e_start.grid(row=1, column=3, sticky="w", padx=6, pady=6)
+    e_start.insert(0, today_str())
+    tk.Label(grid, text="SIP Debit Day (1-31):", bg=bg, fg=TEXT_FG).grid(row=2, column=2, sticky="w", padx=6, pady=6)
+    e_day = tk.Entry(grid, width=16); e_day.grid(row=2, column=3, sticky="w", padx=6, pady=6)
+    tk.Label(grid, text="Tax Treatment:", bg=bg, fg=TEXT_FG).grid(row=0, column=4, sticky="w", padx=6, pady=6)
+    combo_tax = ttk.Combobox(grid, values=list(TAX_TREATMENTS), state="readonly", width=12)
+    combo_tax.grid(row=0, column=5, sticky="w", padx=6, pady=6); combo_tax.set("None")
+    tk.Label(grid, text="Other Income (₹/yr):", bg=bg, fg=TEXT_FG).grid(row=1, column=4, sticky="w", padx=6, pady=6)
+    e_income = tk.Entry(grid, width=14); e_income.grid(row=1, column=5, sticky="w", padx=6, pady=6)
+    e_income.insert(0, "0")
+    tk.Label(grid, text="Rounding:", bg=bg, fg=TEXT_FG).grid(row=2, column=4, sticky="w", padx=6, pady=6)
+    combo_round = rounding_combobox(grid); combo_round.grid(row=2, column=5, sticky="w", padx=6, pady=6)
 
     btn_row = tk.Frame(frame, bg=bg); btn_row.pack(fill="x", padx=16, pady=(0,8))
     calc_btn = tk.Button(btn_row, text="Calculate SIP", bg=ACCENT_BTN, fg="black",
@@ -426,9 +2942,10 @@ def show_sip_calculator(frame):
     calc_btn.pack(side="left", padx=(0,8)); export_btn.pack(side="left", padx=8)
 
     table_frame = tk.Frame(frame, bg=bg); table_frame.pack(fill="both", expand=False, padx=16, pady=(6,8))
-    cols = ("year","monthly","invested","fv","inflation_adj")
+    cols = ("year","monthly","invested","fv","inflation_adj","post_tax")
     tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=8)
-    heads = {"year":"Year","monthly":"Monthly ₹/mo","invested":"Invested ₹","fv":"FV ₹","inflation_adj":"InflAdj FV ₹"}
+    heads = {"year":"Year","monthly":"Monthly ₹/mo","invested":"Invested ₹","fv":"FV ₹","inflation_adj":"InflAdj FV ₹",
+             "post_tax":"Post-tax FV ₹"}
     for c in cols: tree.heading(c, text=heads[c])
     tree.column("year", width=60, anchor="center")
     for c in cols[1:]: tree.column(c, width=130, anchor="e")
@@ -442,120 +2959,76 @@ def show_sip_calculator(frame):
 
     chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6,12))
     chart_canvas_container = {"canvas": None}
+    graph = sip_graph()
+    # Graph inputs / nodes each table column is computed from
+    col_sources = {"monthly": ("sip",), "invested": ("projection",), "fv": ("projection",),
+                   "inflation_adj": ("inflation_adj",), "post_tax": ("post_tax_by_year",)}
 
-    def clear_chart():
-        c = chart_canvas_container.get("canvas")
-        if c:
-            c.get_tk_widget().destroy()
-            chart_canvas_container["canvas"] = None
-
-    def calculate_sip():
+    def calculate_sip(live=False):
         try:
             sip = float(entries["Monthly SIP (₹)"].get())
             years = int(entries["Duration (years)"].get())
-            rate = float(entries["Expected Annual Return (%)"].get())
-            inflation = float(entries["Expected Inflation (%)"].get())
+            rate = parse_schedule(entries["Expected Annual Return (%)"].get())
+            inflation = parse_schedule(entries["Expected Inflation (%)"].get())
             if years <= 0 or sip <= 0: raise ValueError
+            rate_schedule(rate, years); rate_schedule(inflation, years)
+            compounding = COMPOUNDING_LABELS[combo_comp.get()]
+            other_income = float(e_income.get() or 0)
+            if compounding:
+                start = _as_date(e_start.get().strip())
+                debit_day = int(e_day.get()) if e_day.get().strip() else None
+                if is_schedule(rate) or (debit_day is not None and not 1 <= debit_day <= 31): raise ValueError
         except Exception:
-            messagebox.showerror("Invalid input","Enter positive numbers in all fields."); return
-
-        monthly_rate = rate/12/100
-        total_months = years*12
-        fv = 0.0
-        invested_by_year = [0.0]*years
-        fv_by_year = [0.0]*years
-        invested_total = 0.0
-
-        for m in range(total_months):
-            y = m//12
-            fv = fv*(1+monthly_rate) + sip
-            invested_by_year[y] += sip
-            invested_total += sip
-            if (m+1)%12 == 0: fv_by_year[y] = fv
+            if not live:
+                messagebox.showerror("Invalid input","Enter positive numbers in all fields "
+                                     "(calendar compounding needs a single return, a start date and a debit day of 1-31).")
+            return
 
-        inflation_adj_total = fv / ((1+inflation/100)**years)
-        inflation_adj_by_year = [
-            fv_by_year[i]/((1+inflation/100)**(years-i-1)) for i in range(years)
-        ]
-
-        for r in tree.get_children(): tree.delete(r)
-        for i in range(years):
-            tree.insert("", "end", values=(
-                i+1,
-                format_currency(sip),
-                format_currency(round(invested_by_year[i],2)),
-                format_currency(round(fv_by_year[i],2)),
-                format_currency(round(inflation_adj_by_year[i],2))
-            ))
+        changed = graph.update({
+            "sip": sip, "years": years, "rate": rate, "inflation": inflation, "tax": combo_tax.get(),
+            "other_income": other_income, "compounding": compounding,
+            "start_date": start if compounding else None, "debit_day": debit_day if compounding else None,
+            "rounding": ROUNDING_LABELS[combo_round.get()]
+        })
+        data = sip_data(graph)
+        invested_by_year, fv_by_year = data["invested_by_year"], data["fv_by_year"]
+        fv, invested_total = data["fv_total"], data["invested_total"]
+        inflation_adj_by_year, inflation_adj_total = data["inflation_adj_by_year"], data["inflation_adj_total"]
+        tax_by_year, post_tax_by_year = data["tax_by_year"], data["post_tax_by_year"]
+
+        patch_tree(tree, cols, [(
+            i+1,
+            format_currency(sip),
+            format_currency(round(invested_by_year[i],2)),
+            format_currency(round(fv_by_year[i],2)),
+            format_currency(round(inflation_adj_by_year[i],2)),
+            format_currency(round(post_tax_by_year[i],2))
+        ) for i in range(years)], col_sources, changed)
 
         result_label.config(text=(
             f"Total Invested: {format_currency(invested_total)}    "
             f"Final FV: {format_currency(fv)}    "
             f"Inflation-adjusted FV: {format_currency(inflation_adj_total)}    "
             f"Profit: {format_currency(fv - invested_total)}"
+            + (f"    Tax on redemption: {format_currency(tax_by_year[-1])}    "
+               f"Post-tax FV: {format_currency(post_tax_by_year[-1])}" if combo_tax.get() != "None" else "")
         ))
 
         export_btn.config(state="normal")
+        tree._calc = data
 
-        clear_chart()
+        # The chart only plots FV, so edits that leave the projection alone don't redraw it
         if not MATPLOTLIB_AVAILABLE:
-            tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
-            tree._calc = {
-                "years": years,
-                "sip": sip,
-                "invested_by_year": invested_by_year,
-                "fv_by_year": fv_by_year,
-                "invested_total": invested_total,
-                "fv_total": fv,
-                "inflation_adj_total": inflation_adj_total,
-                "inflation_adj_by_year": inflation_adj_by_year
-            }
-            return
-
-        years_list = list(range(1, years+1))
-        fig = Figure(figsize=(9,3.2), dpi=95)
-        ax = fig.add_subplot(111)
-        ax.bar(years_list, fv_by_year, color=ACCENT_LINE)
-        ax.set_facecolor(bg); fig.patch.set_facecolor(bg)
-        ax.set_xlabel("Year"); ax.set_ylabel("Future Value (₹)")
-        ax.set_title("Year-by-Year FV (SIP)", color=HEADING_FG)
-        ax.tick_params(colors=TEXT_FG)
-        for spine in ax.spines.values(): spine.set_color(TEXT_FG)
-        ax.xaxis.label.set_color(TEXT_FG); ax.yaxis.label.set_color(TEXT_FG)
-        ax.grid(axis="y", linestyle="--", alpha=0.3, color=ACCENT_LINE)
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame); canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        chart_canvas_container["canvas"] = canvas
-
-        tree._calc = {
-            "years": years,
-            "sip": sip,
-            "invested_by_year": invested_by_year,
-            "fv_by_year": fv_by_year,
-            "invested_total": invested_total,
-            "fv_total": fv,
-            "inflation_adj_total": inflation_adj_total,
-            "inflation_adj_by_year": inflation_adj_by_year
-        }
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
+        elif "projection" in changed or chart_canvas_container.get("canvas") is None:
+            show_chart(chart_canvas_container, chart_frame, "sip", data, bg)
 
     def export_sip():
         data = getattr(tree, "_calc", None)
         if not data:
             messagebox.showinfo("No data","Calculate first."); return
-        headers = ["Year","Monthly SIP","Invested","FV","InflationAdj FV"]
-        rows = []
-        for i in range(data["years"]):
-            rows.append([
-                i+1,
-                round(data["sip"],2),
-                round(data["invested_by_year"][i],2),
-                round(data["fv_by_year"][i],2),
-                round(data["inflation_adj_by_year"][i],2)
-            ])
-        rows.append([])
-        rows.append(["Total Invested", data["invested_total"]])
-        rows.append(["Final FV", data["fv_total"]])
-        rows.append(["Inflation-adjusted FV", data["inflation_adj_total"]])
+        headers, rows = sip_report(data)
         path = save_to_excel_or_csv(
             os.path.join(REPORTS_DIR,f"SIP_Report_{today_str()}"),
             headers, rows
@@ -564,6 +3037,8 @@ def show_sip_calculator(frame):
 
     calc_btn.config(command=calculate_sip)
     export_btn.config(command=export_sip)
+    bind_live(frame, list(entries.values()) + [combo_comp, e_start, e_day, combo_tax, e_income, combo_round],
+              lambda: calculate_sip(live=True))
 
 # ---------- Loan Calculator ----------
 def show_loan_calculator(frame):
@@ -584,44 +3059,60 @@ def show_loan_calculator(frame):
     tk.Label(grid, text="Tenure (years):", bg=bg, fg=TEXT_FG).grid(row=2, column=0, sticky="w", padx=6, pady=6)
     e_tenure = tk.Entry(grid, width=18); e_tenure.grid(row=2, column=1, padx=6, pady=6)
 
+    tk.Label(grid, text="Switching Penalty on Current Loan (%):", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=6, pady=6)
+    e_switch = tk.Entry(grid, width=12); e_switch.grid(row=0, column=3, padx=6, pady=6)
+    tk.Label(grid, text="Plan to Close After (months):", bg=bg, fg=TEXT_FG).grid(row=1, column=2, sticky="w", padx=6, pady=6)
+    e_horizon = tk.Entry(grid, width=12); e_horizon.grid(row=1, column=3, padx=6, pady=6)
+    tk.Label(grid, text="Rank Offers By:", bg=bg, fg=TEXT_FG).grid(row=2, column=2, sticky="w", padx=6, pady=6)
+    combo_rank = ttk.Combobox(grid, values=["Total Cost","Effective APR","EMI","Cost if Closed at Horizon"],
+                              state="readonly", width=24)
+    combo_rank.grid(row=2, column=3, padx=6, pady=6); combo_rank.set("Total Cost")
+
     btn_row = tk.Frame(frame, bg=bg); btn_row.pack(fill="x", padx=16, pady=(0,8))
     calc_btn = tk.Button(btn_row, text="Calculate EMI", bg=ACCENT_BTN, fg="black",
                          font=("Segoe UI",10,"bold"))
     export_btn = tk.Button(btn_row, text="Export Loan Report", bg=ACCENT_BTN_2, fg="black",
                            state="disabled", font=("Segoe UI",10,"bold"))
+    offers_btn = tk.Button(btn_row, text="Compare Offers…", bg=ACCENT_BTN, fg="black",
+                           font=("Segoe UI",10,"bold"))
+    export_offers_btn = tk.Button(btn_row, text="Export Ranked Offers", bg=ACCENT_BTN_2, fg="black",
+                                  state="disabled", font=("Segoe UI",10,"bold"))
     calc_btn.pack(side="left", padx=(0,8)); export_btn.pack(side="left", padx=8)
+    offers_btn.pack(side="left", padx=8); export_offers_btn.pack(side="left", padx=8)
 
     result_frame = tk.Frame(frame, bg=SIDEBAR_BG); result_frame.pack(fill="x", padx=16, pady=(6,8))
     result_label = tk.Label(result_frame, text="", bg=SIDEBAR_BG, fg="#FED7AA",
                             font=("Segoe UI",10), pady=6, justify="left", wraplength=1100)
     result_label.pack(fill="x")
 
+    offers_frame = tk.Frame(frame, bg=bg); offers_frame.pack(fill="x", padx=16, pady=(0,6))
+    offer_cols = ("rank","lender","rate","emi","fees","total","apr","break_even","horizon")
+    offers_tree = ttk.Treeview(offers_frame, columns=offer_cols, show="headings", height=6)
+    for c, h in zip(offer_cols, LOAN_RANK_HEADERS): offers_tree.heading(c, text=h)
+    offers_tree.column("rank", width=50, anchor="center"); offers_tree.column("lender", width=150, anchor="w")
+    for c in offer_cols[2:]: offers_tree.column(c, width=115, anchor="e")
+    offers_vsb = ttk.Scrollbar(offers_frame, orient="vertical", command=offers_tree.yview)
+    offers_tree.configure(yscroll=offers_vsb.set); offers_vsb.pack(side="right", fill="y")
+    offers_tree.pack(side="left", fill="x", expand=True)
+    offers_state = {"rows": None, "job": None}
+
     chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6,12))
     chart_canvas_container = {"canvas": None}
 
-    def clear_chart():
-        c = chart_canvas_container.get("canvas")
-        if c:
-            c.get_tk_widget().destroy()
-            chart_canvas_container["canvas"] = None
-
-    def calculate_loan():
+    def calculate_loan(live=False):
         try:
             P = float(e_amount.get())
             annual_r = float(e_rate.get())
             years = int(e_tenure.get())
-            if P <= 0 or annual_r <= 0 or years <= 0: raise ValueError
+            if P <= 0 or annual_r < 0 or years <= 0: raise ValueError
         except Exception:
-            messagebox.showerror("Invalid input","Enter positive numbers in all fields."); return
+            if not live:
+                messagebox.showerror("Invalid input","Enter a positive amount and tenure, and a rate of 0 or more.")
+            return
 
-        n = years*12
-        r = annual_r/12/100
-        if r == 0:
-            emi = P/n
-        else:
-            emi = P * r * (1+r)**n / ((1+r)**n - 1)
-        total_payable = emi*n
-        total_interest = total_payable - P
+        data = loan_summary(P, annual_r, years)
+        emi, total_interest = data["emi"], data["interest"]
+        total_payable = emi*data["n"]
 
         result_label.config(text=(
             f"EMI: {format_currency(emi)}    Tenure: {years} years    "
@@ -630,49 +3121,96 @@ def show_loan_calculator(frame):
         ))
 
         export_btn.config(state="normal")
+        chart_canvas_container["data"] = data
 
-        clear_chart()
         if not MATPLOTLIB_AVAILABLE:
-            tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
-            chart_canvas_container["data"] = {"emi":emi,"n":n,"P":P,"interest":total_interest}
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
             return
-
-        fig = Figure(figsize=(6,3.8), dpi=95)
-        ax = fig.add_subplot(111)
-        labels = ["Principal (₹)","Interest (₹)"]
-        sizes = [P, total_interest]
-        ax.set_facecolor(bg); fig.patch.set_facecolor(bg)
-        wedges, texts, autotexts = ax.pie(
-            sizes, labels=labels,
-            autopct=lambda p: format_currency(p/100*sum(sizes)),
-            startangle=90
-        )
-        for t in texts+autotexts: t.set_color(TEXT_FG)
-        ax.axis("equal")
-        ax.set_title("Principal vs Interest (Total over loan)", color=HEADING_FG)
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame); canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        chart_canvas_container["canvas"] = canvas
-        chart_canvas_container["data"] = {"emi":emi,"n":n,"P":P,"interest":total_interest}
+        show_chart(chart_canvas_container, chart_frame, "loan", data, bg)
 
     def export_loan():
         data = chart_canvas_container.get("data")
         if not data:
             messagebox.showinfo("No data","Calculate EMI first."); return
-        headers = ["Loan Amount","Annual Rate (%)","Tenure (years)","EMI (₹)","Total Interest (₹)","Total Payable (₹)"]
-        rows = [[
-            e_amount.get(), e_rate.get(), e_tenure.get(),
-            round(data["emi"],2), round(data["interest"],2),
-            round(data["emi"]*data["n"],2)
-        ]]
+        headers, rows = loan_report(data)
         path = save_to_excel_or_csv(
             os.path.join(REPORTS_DIR,f"Loan_Report_{today_str()}"),
             headers, rows
         )
         if path: messagebox.showinfo("Exported", f"Saved to {path}")
 
+    def compare_offers():
+        if not NUMPY_AVAILABLE:
+            messagebox.showinfo("Unavailable","Install numpy to compare loan offers."); return
+        filename = filedialog.askopenfilename(
+            initialdir=REPORTS_DIR,
+            filetypes=[("Offer files", " ".join(p for _, p in report_filetypes()))] + report_filetypes()
+        )
+        if not filename: return
+        try:
+            names, offers, skipped = load_loan_offers(filename)
+            horizon = int(e_horizon.get()) if e_horizon.get().strip() else None
+            switch_pct = float(e_switch.get() or 0)
+        except Exception as ex:
+            messagebox.showerror("Invalid offers", str(ex)); return
+        if skipped:
+            messagebox.showinfo("Skipped offers", f"Skipped {len(skipped)} offer(s) whose fees are not "
+                                f"less than the principal: {', '.join(skipped[:20])}"
+                                + (", …" if len(skipped) > 20 else ""))
+        if not names:
+            messagebox.showinfo("No data","The offer file has no usable rows."); return
+        current_emi = switch_cost = None
+        try:
+            P, annual_r, years = float(e_amount.get()), float(e_rate.get()), int(e_tenure.get())
+            current_emi, switch_cost = loan_emi(P, annual_r, years), P*switch_pct/100
+        except Exception:
+            pass   # no current loan entered: skip break-even
+        result = loan_offers_batch(horizon_months=horizon, current_emi=current_emi,
+                                   switch_cost=switch_cost or 0.0, **offers)
+        key = {"Effective APR": "apr", "EMI": "emi",
+               "Cost if Closed at Horizon": "cost_at_horizon"}.get(combo_rank.get(), "total_cost")
+        if key not in result: key = "total_cost"
+        rows = list(iter_ranked_offer_rows(names, result, key))
+        offers_state["rows"] = rows
+        export_offers_btn.config(state="normal")
+        best = rows[0]
+        result_label.config(text=(
+            f"Compared {len(rows):,} offers. Best by {combo_rank.get()}: {best[1]} at {best[2]:.2f}%  "
+            f"EMI {format_currency(best[3])}  Total cost {format_currency(best[5])}  APR {best[6]:.2f}%"
+            + (f"  Break-even in {best[7]} months" if best[7] is not None else "")
+        ))
+
+        # Stream rows into the table a slice at a time so hundreds of offers never freeze the UI
+        if offers_state["job"]:
+            frame.after_cancel(offers_state["job"])
+        for r in offers_tree.get_children(): offers_tree.delete(r)
+        def insert_from(start, step=200):
+            for r in rows[start:start+step]:
+                offers_tree.insert("", "end", values=(
+                    r[0], r[1], f"{r[2]:.2f}%", format_currency(r[3]), format_currency(r[4]),
+                    format_currency(r[5]), f"{r[6]:.2f}%", "-" if r[7] is None else r[7],
+                    "-" if r[8] is None else format_currency(r[8])))
+            offers_state["job"] = frame.after(1, insert_from, start+step) if start+step < len(rows) else None
+        insert_from(0)
+
+    def export_offers():
+        if not offers_state["rows"]:
+            messagebox.showinfo("No data","Compare offers first."); return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xlsx" if OPENPYXL_AVAILABLE else ".csv",
+            initialfile=os.path.join(REPORTS_DIR,f"Loan_Offers_{today_str()}"),
+            filetypes=report_filetypes()
+        )
+        if not filename: return
+        path = stream_report(filename, LOAN_RANK_HEADERS, offers_state["rows"], int_columns=("Rank",))
+        messagebox.showinfo("Exported", f"Saved to {path}")
+
     calc_btn.config(command=calculate_loan)
     export_btn.config(command=export_loan)
+    bind_live(frame, [e_amount, e_rate, e_tenure], lambda: calculate_loan(live=True))
+    offers_btn.config(command=compare_offers)
+    export_offers_btn.config(command=export_offers)
 
 # ---------- FIRE Number Calculator ----------
 # ---------- FIRE Number Calculator ----------
@@ -714,6 +3252,26 @@ def show_fire_calculator(frame):
         .grid(row=3, column=0, sticky="w", padx=6, pady=6)
     e_return = tk.Entry(grid, width=18)
     e_return.grid(row=3, column=1, padx=6, pady=6)
+    tk.Label(grid, text=SCHEDULE_HINT, bg=bg, fg="#94A3B8")\
+        .grid(row=4, column=0, columnspan=2, sticky="w", padx=6)
+
+    tk.Label(grid, text="Tax Treatment:", bg=bg, fg=TEXT_FG)\
+        .grid(row=0, column=2, sticky="w", padx=6, pady=6)
+    combo_tax = ttk.Combobox(grid, values=list(TAX_TREATMENTS), state="readonly", width=12)
+    combo_tax.grid(row=0, column=3, padx=6, pady=6)
+    combo_tax.set("None")
+
+    tk.Label(grid, text="Other Income (₹/yr):", bg=bg, fg=TEXT_FG)\
+        .grid(row=1, column=2, sticky="w", padx=6, pady=6)
+    e_income = tk.Entry(grid, width=18)
+    e_income.grid(row=1, column=3, padx=6, pady=6)
+    e_income.insert(0, "0")
+
+    tk.Label(grid, text="Withdrawal Rate (%):", bg=bg, fg=TEXT_FG)\
+        .grid(row=2, column=2, sticky="w", padx=6, pady=6)
+    e_swr = tk.Entry(grid, width=18)
+    e_swr.grid(row=2, column=3, padx=6, pady=6)
+    e_swr.insert(0, "4")
 
     # ---- Buttons ----
     btn_row = tk.Frame(frame, bg=bg)
@@ -734,8 +3292,16 @@ def show_fire_calculator(frame):
         state="disabled",
         font=("Segoe UI", 10, "bold")
     )
+    sweep_btn = tk.Button(
+        btn_row,
+        text="Sensitivity Heatmap",
+        bg=ACCENT_BTN,
+        fg="black",
+        font=("Segoe UI", 10, "bold")
+    )
     calc_btn.pack(side="left", padx=(0, 8))
     export_btn.pack(side="left", padx=8)
+    sweep_btn.pack(side="left", padx=8)
 
     # ---- Result area ----
     result_frame = tk.Frame(frame, bg=SIDEBAR_BG)
@@ -758,61 +3324,36 @@ def show_fire_calculator(frame):
     chart_frame.pack(fill="both", expand=True, padx=16, pady=(6, 12))
     chart_canvas_container = {"canvas": None, "data": None}
 
-    def clear_chart():
-        c = chart_canvas_container.get("canvas")
-        if c:
-            c.get_tk_widget().destroy()
-            chart_canvas_container["canvas"] = None
-
-    def calculate_fire():
+    def calculate_fire(live=False):
         # Read + validate
         try:
             monthly_exp = float(e_monthly.get())
             current = float(e_current.get())
             years = int(e_years.get())
-            exp_return = float(e_return.get())
-            if monthly_exp < 0 or current < 0 or years <= 0:
+            exp_return = parse_schedule(e_return.get())
+            other_income = float(e_income.get() or 0)
+            withdrawal_rate = float(e_swr.get() or 4)
+            if monthly_exp < 0 or current < 0 or years <= 0 or withdrawal_rate <= 0:
                 raise ValueError
+            rate_schedule(exp_return, years)
         except Exception:
-            messagebox.showerror("Invalid input", "Please enter valid positive numbers.")
+            if not live:
+                messagebox.showerror("Invalid input", "Please enter valid positive numbers.")
             return
 
-        # 1) FIRE target using 4% rule → 25× yearly expenses
-        fire_target = monthly_exp * 12 * 25
-
-        # 2) Required monthly SIP to reach FIRE in 'years'
-        n_months = years * 12
-        r_annual = exp_return / 100
-        r_monthly = r_annual / 12 if r_annual != 0 else 0.0
+        # 1) Target and required SIP (after tax when a treatment is picked)
+        try:
+            data = fire_summary(monthly_exp, current, years, exp_return, withdrawal_rate,
+                                combo_tax.get(), other_income)
+        except ValueError:
+            if not live:
+                messagebox.showerror("Error", "Please adjust inputs.")
+            return
+        fire_target, required_monthly, proj_savings = data["fire_target"], data["required_monthly"], data["proj"]
 
-        if current >= fire_target:
-            required_monthly = 0.0
-            proj_savings = [current] * years
-        else:
-            if r_monthly == 0:
-                required_monthly = (fire_target - current) / n_months
-            else:
-                growth = (1 + r_monthly) ** n_months
-                numerator = fire_target - current * growth
-                denom = (growth - 1) / r_monthly
-                if denom == 0:
-                    messagebox.showerror("Error", "Please adjust inputs.")
-                    return
-                required_monthly = numerator / denom
-
-            if required_monthly < 0:
-                required_monthly = 0.0
-
-            proj_savings = []
-            bal = current
-            for _y in range(years):
-                for _ in range(12):
-                    bal = bal * (1 + r_monthly) + required_monthly
-                proj_savings.append(bal)
-
-        # 3) Result text
+        # 2) Result text
         lines = [
-            f"FIRE Target (25× yearly expenses): {format_currency(fire_target)}",
+            f"FIRE Target ({100/withdrawal_rate:g}× yearly expenses): {format_currency(fire_target)}",
             f"Current Savings: {format_currency(current)}",
             f"Years till Retirement: {years}",
         ]
@@ -826,68 +3367,29 @@ def show_fire_calculator(frame):
         lines.append(
             f"Projected corpus at retirement: {format_currency(proj_savings[-1])}"
         )
+        if combo_tax.get() != "None" and required_monthly > 0:
+            lines.append(f"Tax if redeemed at retirement ({combo_tax.get()}): "
+                         f"{format_currency(data['tax_at_retirement'])}")
         result_label.config(text="\n".join(lines))
 
-        # 4) Enable export
+        # 3) Enable export
         export_btn.config(state="normal")
 
-        # 5) Store for export / chart
-        chart_canvas_container["data"] = {
-            "proj": proj_savings,
-            "years": years,
-            "fire_target": fire_target,
-            "required_monthly": required_monthly,
-        }
+        # 4) Store for export / chart
+        chart_canvas_container["data"] = data
 
-        # 6) Chart
-        clear_chart()
+        # 5) Chart (redrawn in place when it is already showing)
         if not MATPLOTLIB_AVAILABLE:
-            tk.Label(
-                chart_frame,
-                text="Install matplotlib to view chart.",
-                fg="white",
-                bg=bg
-            ).pack()
+            if not chart_frame.winfo_children():
+                tk.Label(
+                    chart_frame,
+                    text="Install matplotlib to view chart.",
+                    fg="white",
+                    bg=bg
+                ).pack()
             return
 
-        years_list = list(range(1, years + 1))
-        fig = Figure(figsize=(9, 3.6), dpi=95)
-        ax = fig.add_subplot(111)
-
-        ax.plot(
-            years_list,
-            proj_savings,
-            marker="o",
-            label="Projected Savings",
-            color=ACCENT_BTN
-        )
-        ax.hlines(
-            fire_target,
-            years_list[0],
-            years_list[-1],
-            colors="#FF7F50",
-            linestyles="--",
-            label="FIRE Target"
-        )
-
-        ax.set_xlabel("Year")
-        ax.set_ylabel("Amount (₹)")
-        ax.set_title("Your FIRE Journey", color=HEADING_FG)
-        ax.grid(axis="y", linestyle="--", alpha=0.3, color=ACCENT_LINE)
-
-        ax.set_facecolor(bg)
-        fig.patch.set_facecolor(bg)
-        ax.tick_params(colors=TEXT_FG)
-        for spine in ax.spines.values():
-            spine.set_color(TEXT_FG)
-        ax.xaxis.label.set_color(TEXT_FG)
-        ax.yaxis.label.set_color(TEXT_FG)
-        ax.legend(facecolor=SIDEBAR_BG, edgecolor=TEXT_FG)
-
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        chart_canvas_container["canvas"] = canvas
+        show_chart(chart_canvas_container, chart_frame, "fire", data, bg)
 
     def export_fire():
         data = chart_canvas_container.get("data")
@@ -895,13 +3397,7 @@ def show_fire_calculator(frame):
             messagebox.showinfo("No data", "Please run the FIRE calculation first.")
             return
 
-        headers = ["Year", "Projected Savings (₹)"]
-        rows = []
-        for i, val in enumerate(data["proj"]):
-            rows.append([i + 1, round(val, 2)])
-        rows.append([])
-        rows.append(["Required Monthly Investment (₹)", round(data["required_monthly"], 2)])
-        rows.append(["FIRE Target (₹)", round(data["fire_target"], 2)])
+        headers, rows = fire_report(data)
 
         path = save_to_excel_or_csv(
             os.path.join(REPORTS_DIR, f"FIRE_Plan_{today_str()}"),
@@ -911,8 +3407,42 @@ def show_fire_calculator(frame):
         if path:
             messagebox.showinfo("Exported", f"Saved to {path}")
 
+    def show_sensitivity():
+        try:
+            monthly_exp = float(e_monthly.get())
+            current = float(e_current.get())
+            years = int(e_years.get())
+            exp_return = float(e_return.get())
+            other_income = float(e_income.get() or 0)
+            withdrawal_rate = float(e_swr.get() or 4)
+            if monthly_exp < 0 or current < 0 or years <= 0 or withdrawal_rate <= 0:
+                raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input", "Enter valid numbers and a single return rate.")
+            return
+        if not (NUMPY_AVAILABLE and MATPLOTLIB_AVAILABLE):
+            messagebox.showinfo("Unavailable", "Install numpy and matplotlib for the heatmap.")
+            return
+
+        rates = sweep_axis(exp_return, 1.0)
+        years_axis = [int(y) for y in sweep_axis(years, 2, low=1)]
+        grid = sweep(
+            lambda years, rate: fire_required_sip_vec(monthly_exp, current, rate, years,
+                                                      combo_tax.get(), other_income,
+                                                      withdrawal_rate=withdrawal_rate),
+            {"years": years_axis, "rate": rates}
+        )
+        show_chart(chart_canvas_container, chart_frame, "heatmap", {
+            "grid": grid, "x_vals": rates, "y_vals": years_axis,
+            "x_label": "Expected Annual Return (%)", "y_label": "Years till Retirement",
+            "title": "Required Monthly Investment for FIRE"
+        }, bg)
+
     calc_btn.config(command=calculate_fire)
     export_btn.config(command=export_fire)
+    bind_live(frame, [e_monthly, e_current, e_years, e_return, combo_tax, e_income, e_swr],
+              lambda: calculate_fire(live=True))
+    sweep_btn.config(command=show_sensitivity)
 
 # ---------- Inflation Impact Calculator ----------
 def show_inflation_calculator(frame):
@@ -933,12 +3463,21 @@ def show_inflation_calculator(frame):
     tk.Label(grid, text="Duration (years):", bg=bg, fg=TEXT_FG).grid(row=2, column=0, sticky="w", padx=6, pady=6)
     e_years = tk.Entry(grid, width=18); e_years.grid(row=2, column=1, padx=6, pady=6)
 
+    tk.Label(grid, text="Grid Amounts (₹, comma-separated):", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=6, pady=6)
+    e_grid_amounts = tk.Entry(grid, width=36); e_grid_amounts.grid(row=0, column=3, padx=6, pady=6)
+
+    tk.Label(grid, text="Grid Rates (%, comma-separated):", bg=bg, fg=TEXT_FG).grid(row=1, column=2, sticky="w", padx=6, pady=6)
+    e_grid_rates = tk.Entry(grid, width=36); e_grid_rates.grid(row=1, column=3, padx=6, pady=6)
+
     btn_row = tk.Frame(frame, bg=bg); btn_row.pack(fill="x", padx=16, pady=(0,8))
     calc_btn = tk.Button(btn_row, text="Calculate Impact", bg=ACCENT_BTN, fg="black",
                          font=("Segoe UI",10,"bold"))
     export_btn = tk.Button(btn_row, text="Export Results", bg=ACCENT_BTN_2, fg="black",
                            state="disabled", font=("Segoe UI",10,"bold"))
+    grid_btn = tk.Button(btn_row, text="Export Inflation Grid", bg=ACCENT_BTN_2, fg="black",
+                         font=("Segoe UI",10,"bold"))
     calc_btn.pack(side="left", padx=(0,8)); export_btn.pack(side="left", padx=8)
+    grid_btn.pack(side="left", padx=8)
 
     table_frame = tk.Frame(frame, bg=bg); table_frame.pack(fill="both", expand=False, padx=16, pady=(6,8))
     cols = ("year","cum_infl","future_cost","purch_power")
@@ -962,41 +3501,30 @@ def show_inflation_calculator(frame):
 
     chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6,12))
     chart_canvas_container = {"canvas": None}
+    graph = inflation_graph()
+    col_sources = {"cum_infl": ("factors",), "future_cost": ("future_costs",), "purch_power": ("purch_power",)}
 
-    def clear_chart():
-        c = chart_canvas_container.get("canvas")
-        if c:
-            c.get_tk_widget().destroy()
-            chart_canvas_container["canvas"] = None
-
-    def calculate():
+    def calculate(live=False):
         try:
             amount = float(e_amount.get())
             rate = float(e_rate.get())
             years = int(e_years.get())
             if amount <= 0 or rate < 0 or years <= 0: raise ValueError
         except Exception:
-            messagebox.showerror("Invalid input","Enter valid positive numbers in all fields."); return
-
-        r = rate/100
-        future_costs = []; purch_power_list = []; cum_infl_list = []
-        for y in range(1, years+1):
-            factor = (1+r)**y
-            cum_infl = factor - 1
-            future_cost = amount * factor
-            purch_power = amount / factor
-            future_costs.append(future_cost)
-            purch_power_list.append(purch_power)
-            cum_infl_list.append(cum_infl)
-
-        for rid in tree.get_children(): tree.delete(rid)
-        for i in range(years):
-            tree.insert("", "end", values=(
-                i+1,
-                f"{cum_infl_list[i]*100:.2f}%",
-                format_currency(round(future_costs[i],2)),
-                format_currency(round(purch_power_list[i],2))
-            ))
+            if not live:
+                messagebox.showerror("Invalid input","Enter valid positive numbers in all fields.")
+            return
+
+        changed = graph.update({"amount": amount, "rate": rate, "years": years})
+        data = inflation_data(graph)
+        future_costs, purch_power_list, cum_infl_list = data["future_costs"], data["purch_power"], data["cum_infl"]
+
+        patch_tree(tree, cols, [(
+            i+1,
+            f"{cum_infl_list[i]*100:.2f}%",
+            format_currency(round(future_costs[i],2)),
+            format_currency(round(purch_power_list[i],2))
+        ) for i in range(years)], col_sources, changed)
 
         final_pp = purch_power_list[-1]; final_fc = future_costs[-1]
         result_label.config(text=(
@@ -1006,109 +3534,562 @@ def show_inflation_calculator(frame):
         ))
 
         export_btn.config(state="normal")
+        tree._calc = data
 
-        clear_chart()
         if not MATPLOTLIB_AVAILABLE:
-            tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
-            tree._calc = {
-                "amount":amount,"rate":rate,"years":years,
-                "future_costs":future_costs,
-                "purch_power":purch_power_list,
-                "cum_infl":cum_infl_list
-            }
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
             return
-
-        years_list = list(range(1, years+1))
-        fig = Figure(figsize=(9,3.2), dpi=95)
-        ax = fig.add_subplot(111)
-        ax.plot(years_list, purch_power_list, marker="o", label="Purchasing Power", color=ACCENT_BTN)
-        ax.plot(years_list, future_costs, marker="x", linestyle="--", label="Future Cost", color=ACCENT_LINE)
-        ax.set_facecolor(bg); fig.patch.set_facecolor(bg)
-        ax.set_xlabel("Year"); ax.set_ylabel("Amount (₹)")
-        ax.set_title("Inflation Impact Over Time", color=HEADING_FG)
-        ax.tick_params(colors=TEXT_FG)
-        for spine in ax.spines.values(): spine.set_color(TEXT_FG)
-        ax.xaxis.label.set_color(TEXT_FG); ax.yaxis.label.set_color(TEXT_FG)
-        ax.grid(axis="y", linestyle="--", alpha=0.3, color=ACCENT_LINE)
-        ax.legend(facecolor=SIDEBAR_BG, edgecolor=TEXT_FG)
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame); canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        chart_canvas_container["canvas"] = canvas
-
-        tree._calc = {
-            "amount":amount,"rate":rate,"years":years,
-            "future_costs":future_costs,
-            "purch_power":purch_power_list,
-            "cum_infl":cum_infl_list
-        }
+        show_chart(chart_canvas_container, chart_frame, "inflation", data, bg)
 
     def export_results():
         data = getattr(tree, "_calc", None)
         if not data:
             messagebox.showinfo("No data","Calculate first."); return
-        headers = ["Year","Cumulative Inflation (%)","Future Cost (₹)","Purchasing Power (₹)"]
-        rows = []
-        for i in range(data["years"]):
-            rows.append([
-                i+1,
-                round(data["cum_infl"][i]*100,2),
-                round(data["future_costs"][i],2),
-                round(data["purch_power"][i],2)
-            ])
-        rows.append([]); rows.append(["Original Amount", data["amount"]])
-        rows.append(["Inflation Rate (%)", data["rate"]])
+        headers, rows = inflation_report(data)
         path = save_to_excel_or_csv(
             os.path.join(REPORTS_DIR,f"Inflation_Impact_{today_str()}"),
             headers, rows
         )
         if path: messagebox.showinfo("Exported", f"Saved to {path}")
 
+    def export_grid():
+        try:
+            amounts = [float(x) for x in e_grid_amounts.get().split(",") if x.strip()]
+            rates = [float(x) for x in e_grid_rates.get().split(",") if x.strip()]
+            years = int(e_years.get())
+            if not amounts or not rates or years <= 0: raise ValueError
+            if min(amounts) <= 0 or min(rates) < 0: raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input","Enter grid amounts, grid rates and duration."); return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".parquet" if PYARROW_AVAILABLE else ".csv",
+            initialfile=os.path.join(REPORTS_DIR,f"Inflation_Grid_{today_str()}"),
+            filetypes=report_filetypes()
+        )
+        if not filename: return
+        path = export_inflation_grid(filename, amounts, rates, years)
+        messagebox.showinfo("Exported", f"Saved {len(amounts)*len(rates)*years:,} rows to {path}")
+
     calc_btn.config(command=calculate)
     export_btn.config(command=export_results)
+    bind_live(frame, [e_amount, e_rate, e_years], lambda: calculate(live=True))
+    grid_btn.config(command=export_grid)
+
+# ---------- Retirement Drawdown ----------
+def show_drawdown_simulator(frame):
+    for w in frame.winfo_children(): w.destroy()
+    bg = PRIMARY_BG
+    frame.configure(bg=bg)
+
+    tk.Label(frame, text="Retirement Drawdown Simulator", font=("Segoe UI", 18, "bold"),
+             fg=HEADING_FG, bg=bg).pack(pady=(10, 8))
+
+    grid = tk.Frame(frame, bg=bg); grid.pack(fill="x", padx=16)
+    fields = [("Retirement Corpus (₹):", ""), ("Yearly Spending (₹):", ""), ("Years in Retirement:", "30"),
+              ("Expected Return (%):", "10"), ("Volatility (%):", "15"), ("Inflation (%):", "6"),
+              ("Paths:", "2000"), ("Target Success (%):", "90"), ("Cost Basis (% of corpus):", "50"),
+              ("Other Income (₹/yr):", "0")]
+    entries = {}
+    for i, (lbl, default) in enumerate(fields):
+        tk.Label(grid, text=lbl, bg=bg, fg=TEXT_FG).grid(row=i//3, column=(i%3)*2, sticky="w", padx=4, pady=4)
+        e = tk.Entry(grid, width=14); e.grid(row=i//3, column=(i%3)*2+1, padx=4, pady=4)
+        e.insert(0, default); entries[lbl] = e
+    tk.Label(grid, text="Tax Treatment:", bg=bg, fg=TEXT_FG).grid(row=3, column=2, sticky="w", padx=4, pady=4)
+    combo_tax = ttk.Combobox(grid, values=list(TAX_TREATMENTS), state="readonly", width=12)
+    combo_tax.grid(row=3, column=3, padx=4, pady=4); combo_tax.set("None")
+    guard_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(grid, text="Spending guardrails", variable=guard_var,
+                   bg=bg, fg=TEXT_FG, selectcolor=SIDEBAR_BG, activebackground=bg)\
+        .grid(row=3, column=4, columnspan=2, sticky="w", padx=4, pady=4)
+
+    btn_frame = tk.Frame(frame, bg=bg); btn_frame.pack(fill="x", padx=16, pady=(6, 8))
+
+    table_frame = tk.Frame(frame, bg=bg); table_frame.pack(fill="both", expand=False, padx=16, pady=(0, 6))
+    cols = ("year","p10","p50","p90","spending","solvent")
+    tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=8)
+    heads = {"year":"Year","p10":"Balance P10 (₹)","p50":"Median Balance (₹)","p90":"Balance P90 (₹)",
+             "spending":"Median Spending (₹)","solvent":"Paths Funded"}
+    for c in cols: tree.heading(c, text=heads[c])
+    tree.column("year", width=60, anchor="center")
+    for c in cols[1:]: tree.column(c, width=150, anchor="e")
+    vsb = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
+    tree.configure(yscroll=vsb.set); vsb.pack(side="right", fill="y"); tree.pack(side="left", fill="both", expand=True)
+
+    summary_var = tk.StringVar()
+    tk.Label(frame, textvariable=summary_var, bg=SIDEBAR_BG, fg="#A5D8FF",
+             pady=6, font=("Segoe UI",10)).pack(fill="x", padx=16)
+
+    chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6, 12))
+    chart_canvas_container = {"canvas": None, "data": None}
+
+    def read_inputs(need_spending):
+        if not NUMPY_AVAILABLE:
+            messagebox.showerror("Missing library","Install numpy for drawdown simulation."); return None
+        try:
+            v = {lbl: e.get().strip() for lbl, e in entries.items()}
+            p = {
+                "corpus": float(v["Retirement Corpus (₹):"]),
+                "spending": float(v["Yearly Spending (₹):"]) if need_spending else 0.0,
+                "years": int(v["Years in Retirement:"]),
+                "ret": float(v["Expected Return (%):"]),
+                "vol": float(v["Volatility (%):"]),
+                "inflation": float(v["Inflation (%):"] or 0),
+                "paths": int(v["Paths:"]),
+                "target": float(v["Target Success (%):"])/100,
+                "cost_share": float(v["Cost Basis (% of corpus):"] or 100)/100,
+                "other_income": float(v["Other Income (₹/yr):"] or 0),
+            }
+            if p["corpus"] <= 0 or p["years"] <= 0 or p["paths"] <= 0 or p["vol"] < 0 \
+                    or p["spending"] < 0 or not 0 < p["target"] <= 1:
+                raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input","Enter corpus, spending, years and market assumptions as numbers.")
+            return None
+        p["growth"] = drawdown_returns(p["paths"], p["years"], p["ret"], p["vol"])
+        p["guardrails"] = GUARDRAILS if guard_var.get() else None
+        return p
+
+    def show_result(p, rate, headline):
+        res = simulate_drawdown(p["corpus"], [rate], p["growth"], p["inflation"], p["guardrails"],
+                                combo_tax.get(), p["cost_share"], p["other_income"])
+        bal = np.percentile(res["balance"][0], (10, 50, 90), axis=0)
+        spend = np.median(res["spending"][0], axis=0)
+        funded = (res["spending"][0] > 0).mean(0)
+        rows = []
+        for r in tree.get_children(): tree.delete(r)
+        for y in range(p["years"]):
+            row = [y+1, bal[0,y+1], bal[1,y+1], bal[2,y+1], spend[y], funded[y]*100]
+            rows.append(row)
+            tree.insert("", "end", values=(row[0],) + tuple(format_currency(v) for v in row[1:5])
+                        + (f"{row[5]:.1f}%",))
+        summary_var.set(headline + f"   |   Success: {res['success'][0]*100:.1f}%   |   "
+                        f"Median end balance: {format_currency(bal[1,-1])}")
+        chart_canvas_container["data"] = {"rows": rows, "rate": rate, "success": float(res["success"][0])}
+        export_btn.config(state="normal")
+
+        if not MATPLOTLIB_AVAILABLE:
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
+            return
+        show_chart(chart_canvas_container, chart_frame, "drawdown",
+                   {"balance": bal, "spending": spend, "rate": rate}, bg)
+
+    def simulate():
+        p = read_inputs(need_spending=True)
+        if not p: return
+        rate = p["spending"]/p["corpus"]*100
+        show_result(p, rate, f"Initial withdrawal rate: {rate:.2f}%")
+
+    def find_safe_rate():
+        p = read_inputs(need_spending=False)
+        if not p: return
+        rate = safe_withdrawal_rate(p["corpus"], p["growth"], p["inflation"], p["target"], p["guardrails"],
+                                    combo_tax.get(), p["cost_share"], p["other_income"])
+        entries["Yearly Spending (₹):"].delete(0, tk.END)
+        entries["Yearly Spending (₹):"].insert(0, f"{p['corpus']*rate/100:.0f}")
+        show_result(p, rate, f"Safe withdrawal rate at {p['target']*100:g}% success: {rate:.2f}% "
+                             f"({format_currency(p['corpus']*rate/100)} per year)")
+
+    def export_drawdown():
+        data = chart_canvas_container.get("data")
+        if not data:
+            messagebox.showinfo("No data","Run the simulation first."); return
+        headers = ["Year","Balance P10 (₹)","Median Balance (₹)","Balance P90 (₹)",
+                   "Median Spending (₹)","Paths Funded (%)"]
+        rows = [[r[0]] + [round(float(v),2) for v in r[1:]] for r in data["rows"]]
+        rows.append([])
+        rows.append(["Initial Withdrawal Rate (%)", round(data["rate"],4)])
+        rows.append(["Success Probability (%)", round(data["success"]*100,2)])
+        path = save_to_excel_or_csv(
+            os.path.join(REPORTS_DIR,f"Drawdown_{today_str()}"),
+            headers, rows
+        )
+        if path: messagebox.showinfo("Exported", f"Saved to {path}")
+
+    ttk.Button(btn_frame, text="Simulate Drawdown", command=simulate).pack(side="left", padx=6)
+    ttk.Button(btn_frame, text="Find Safe Withdrawal Rate", command=find_safe_rate).pack(side="left", padx=6)
+    export_btn = ttk.Button(btn_frame, text="Export Drawdown", command=export_drawdown, state="disabled")
+    export_btn.pack(side="left", padx=6)
+
+# ---------- Household Planner ----------
+def show_household_planner(frame):
+    for w in frame.winfo_children(): w.destroy()
+    bg = PRIMARY_BG
+    frame.configure(bg=bg)
+
+    tk.Label(frame, text="Household Planner", font=("Segoe UI", 18, "bold"),
+             fg=HEADING_FG, bg=bg).pack(pady=(10, 8))
+
+    top = tk.Frame(frame, bg=bg); top.pack(fill="x", padx=16)
+    tk.Label(top, text="Monthly Surplus (₹):", bg=bg, fg=TEXT_FG).grid(row=0, column=0, sticky="w", padx=4, pady=4)
+    e_surplus = tk.Entry(top, width=14); e_surplus.grid(row=0, column=1, padx=4, pady=4)
+    tk.Label(top, text="Surplus Growth (% per year):", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=4, pady=4)
+    e_growth = tk.Entry(top, width=10); e_growth.grid(row=0, column=3, padx=4, pady=4)
+    e_growth.insert(0, "0")
+
+    form = tk.Frame(frame, bg=bg); form.pack(fill="x", padx=16, pady=(4, 0))
+    tk.Label(form, text="Kind:", bg=bg, fg=TEXT_FG).grid(row=0, column=0, sticky="w", padx=4, pady=4)
+    combo_kind = ttk.Combobox(form, values=["Goal","Loan"], state="readonly", width=8)
+    combo_kind.grid(row=0, column=1, padx=4, pady=4); combo_kind.set("Goal")
+    tk.Label(form, text="Name:", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=4, pady=4)
+    e_name = tk.Entry(form, width=18); e_name.grid(row=0, column=3, padx=4, pady=4)
+    tk.Label(form, text="Target / Principal (₹):", bg=bg, fg=TEXT_FG).grid(row=0, column=4, sticky="w", padx=4, pady=4)
+    e_amount = tk.Entry(form, width=14); e_amount.grid(row=0, column=5, padx=4, pady=4)
+    tk.Label(form, text="Years:", bg=bg, fg=TEXT_FG).grid(row=1, column=0, sticky="w", padx=4, pady=4)
+    e_years = tk.Entry(form, width=8); e_years.grid(row=1, column=1, padx=4, pady=4)
+    tk.Label(form, text="Return / Interest (%):", bg=bg, fg=TEXT_FG).grid(row=1, column=2, sticky="w", padx=4, pady=4)
+    e_rate = tk.Entry(form, width=10); e_rate.grid(row=1, column=3, padx=4, pady=4)
+    tk.Label(form, text="Inflation (%):", bg=bg, fg=TEXT_FG).grid(row=1, column=4, sticky="w", padx=4, pady=4)
+    e_infl = tk.Entry(form, width=10); e_infl.grid(row=1, column=5, padx=4, pady=4)
+    tk.Label(form, text="Priority:", bg=bg, fg=TEXT_FG).grid(row=2, column=0, sticky="w", padx=4, pady=4)
+    e_priority = tk.Entry(form, width=8); e_priority.grid(row=2, column=1, padx=4, pady=4)
+    prepay_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(form, text="Prepay loan from leftover surplus", variable=prepay_var,
+                   bg=bg, fg=TEXT_FG, selectcolor=SIDEBAR_BG, activebackground=bg)\
+        .grid(row=2, column=2, columnspan=3, sticky="w", padx=4, pady=4)
+
+    btn_frame = tk.Frame(frame, bg=bg); btn_frame.pack(fill="x", padx=16, pady=(6, 8))
+
+    if not hasattr(show_household_planner, "items"):
+        show_household_planner.items = []
+
+    items_frame = tk.Frame(frame, bg=bg); items_frame.pack(fill="x", padx=16, pady=(0, 6))
+    item_cols = ("kind","name","amount","years","rate","inflation","priority")
+    items_tree = ttk.Treeview(items_frame, columns=item_cols, show="headings", height=5)
+    for c in item_cols: items_tree.heading(c, text=c.capitalize())
+    items_tree.column("kind", width=60, anchor="center")
+    items_tree.column("name", width=160, anchor="w")
+    for c in item_cols[2:]: items_tree.column(c, width=100, anchor="e")
+    items_tree.pack(fill="x")
+
+    res_frame = tk.Frame(frame, bg=bg); res_frame.pack(fill="both", expand=False, padx=16, pady=(0, 6))
+    res_cols = ("name","kind","target","value","funded","month")
+    res_tree = ttk.Treeview(res_frame, columns=res_cols, show="headings", height=6)
+    res_heads = {"name":"Name","kind":"Kind","target":"Target at Due (₹)","value":"Value at Due (₹)",
+                 "funded":"Funded","month":"Due / Closed (month)"}
+    for c in res_cols: res_tree.heading(c, text=res_heads[c])
+    res_tree.column("name", width=160, anchor="w"); res_tree.column("kind", width=60, anchor="center")
+    for c in res_cols[2:]: res_tree.column(c, width=140, anchor="e")
+    vsb = ttk.Scrollbar(res_frame, orient="vertical", command=res_tree.yview)
+    res_tree.configure(yscroll=vsb.set); vsb.pack(side="right", fill="y"); res_tree.pack(side="left", fill="both", expand=True)
+
+    summary_var = tk.StringVar()
+    tk.Label(frame, textvariable=summary_var, bg=SIDEBAR_BG, fg="#A5D8FF",
+             pady=6, font=("Segoe UI",10)).pack(fill="x", padx=16)
+
+    chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6, 12))
+    chart_canvas_container = {"canvas": None, "data": None}
+
+    def refresh_items():
+        for r in items_tree.get_children(): items_tree.delete(r)
+        for idx, it in enumerate(show_household_planner.items):
+            items_tree.insert("", "end", iid=str(idx), values=(
+                it["kind"], it["name"], format_currency(it["amount"]), it["years"],
+                f"{it['rate']:.2f}%", f"{it['inflation']:.2f}%" if it["kind"] == "Goal" else "-",
+                it["priority"]))
+
+    def add_item():
+        try:
+            kind = combo_kind.get()
+            name = e_name.get().strip() or f"{kind} {len(show_household_planner.items)+1}"
+            amount = float(e_amount.get())
+            years = int(e_years.get())
+            rate = float(e_rate.get() or 0)
+            inflation = float(e_infl.get() or 0)
+            priority = int(e_priority.get() or 99)
+            if amount <= 0 or years <= 0 or rate < 0: raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input","Enter amount, years and rates as numbers."); return
+        if any(it["name"] == name for it in show_household_planner.items):
+            messagebox.showerror("Invalid input","Names must be unique."); return
+        show_household_planner.items.append({
+            "kind": kind, "name": name, "amount": amount, "years": years, "rate": rate,
+            "inflation": inflation, "priority": priority, "prepay": prepay_var.get()
+        })
+        for e in (e_name, e_amount): e.delete(0, tk.END)
+        refresh_items()
+
+    def remove_selected():
+        for item in sorted(items_tree.selection(), key=int, reverse=True):
+            show_household_planner.items.pop(int(item))
+        refresh_items()
+
+    def run_plan():
+        try:
+            surplus = float(e_surplus.get())
+            growth = float(e_growth.get() or 0)
+            if surplus < 0: raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input","Enter the monthly surplus."); return
+        items = show_household_planner.items
+        if not items:
+            messagebox.showinfo("No data","Add at least one goal or loan."); return
+        goals = [{"name": it["name"], "target": it["amount"], "years": it["years"], "rate": it["rate"],
+                  "inflation": it["inflation"], "priority": it["priority"]}
+                 for it in items if it["kind"] == "Goal"]
+        loans = [{"name": it["name"], "principal": it["amount"], "years": it["years"], "rate": it["rate"],
+                  "priority": it["priority"], "prepay": it["prepay"]}
+                 for it in items if it["kind"] == "Loan"]
+        yearly, outcomes = household_summary(household_plan(surplus, goals, loans, surplus_growth=growth))
+
+        for r in res_tree.get_children(): res_tree.delete(r)
+        kinds = {it["name"]: it["kind"] for it in items}
+        for name, o in sorted(outcomes.items(), key=lambda kv: kv[1]["month"]):
+            res_tree.insert("", "end", values=(
+                name, kinds[name],
+                format_currency(o["target"]) if kinds[name] == "Goal" else "-",
+                format_currency(o["value"]) if kinds[name] == "Goal" else "-",
+                f"{o['funded']*100:.1f}%", o["month"]))
+        open_loans = [it["name"] for it in items if it["kind"] == "Loan" and it["name"] not in outcomes]
+        shortfall = sum(r["shortfall"] for r in yearly)
+        summary_var.set(
+            f"Horizon: {len(yearly)} years   |   "
+            f"Allocated: {format_currency(sum(r['allocated'] for r in yearly))}   |   "
+            f"Shortfall: {format_currency(shortfall)}"
+            + (f"   |   Loans still open: {', '.join(open_loans)}" if open_loans else "")
+        )
+        chart_canvas_container["data"] = {"yearly": yearly, "outcomes": outcomes, "kinds": kinds}
+        export_btn.config(state="normal")
+
+        if not MATPLOTLIB_AVAILABLE:
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
+            return
+        show_chart(chart_canvas_container, chart_frame, "household", {"yearly": yearly}, bg)
+
+    def export_plan():
+        data = chart_canvas_container.get("data")
+        if not data:
+            messagebox.showinfo("No data","Run the plan first."); return
+        headers = ["Year","Available (₹)","Allocated (₹)","Unallocated (₹)","Shortfall (₹)"]
+        rows = [[r["year"], round(r["available"],2), round(r["allocated"],2),
+                 round(r["unallocated"],2), round(r["shortfall"],2)] for r in data["yearly"]]
+        rows.append([])
+        for name, o in data["outcomes"].items():
+            rows.append([f"{data['kinds'][name]}: {name}", round(o["value"],2), round(o["target"],2),
+                         round(o["funded"]*100,2), o["month"]])
+        path = save_to_excel_or_csv(
+            os.path.join(REPORTS_DIR,f"Household_Plan_{today_str()}"),
+            headers, rows
+        )
+        if path: messagebox.showinfo("Exported", f"Saved to {path}")
+
+    ttk.Button(btn_frame, text="Add Item", command=add_item).pack(side="left", padx=6)
+    ttk.Button(btn_frame, text="Remove Selected", command=remove_selected).pack(side="left", padx=6)
+    ttk.Button(btn_frame, text="Run Plan", command=run_plan).pack(side="left", padx=6)
+    export_btn = ttk.Button(btn_frame, text="Export Plan", command=export_plan, state="disabled")
+    export_btn.pack(side="left", padx=6)
+
+    refresh_items()
+
+# ---------- Portfolio Simulator ----------
+def show_portfolio_simulator(frame):
+    for w in frame.winfo_children(): w.destroy()
+    bg = PRIMARY_BG
+    frame.configure(bg=bg)
+
+    tk.Label(frame, text="Asset Allocation Simulator", font=("Segoe UI", 18, "bold"),
+             fg=HEADING_FG, bg=bg).pack(pady=(10, 8))
+
+    top = tk.Frame(frame, bg=bg); top.pack(fill="x", padx=16)
+    tk.Label(top, text="Monthly SIP (₹):", bg=bg, fg=TEXT_FG).grid(row=0, column=0, sticky="w", padx=4, pady=4)
+    e_sip = tk.Entry(top, width=14); e_sip.grid(row=0, column=1, padx=4, pady=4)
+    tk.Label(top, text="Current Corpus (₹):", bg=bg, fg=TEXT_FG).grid(row=0, column=2, sticky="w", padx=4, pady=4)
+    e_start = tk.Entry(top, width=14); e_start.grid(row=0, column=3, padx=4, pady=4)
+    e_start.insert(0, "0")
+    tk.Label(top, text="Years:", bg=bg, fg=TEXT_FG).grid(row=0, column=4, sticky="w", padx=4, pady=4)
+    e_years = tk.Entry(top, width=8); e_years.grid(row=0, column=5, padx=4, pady=4)
+    tk.Label(top, text="Paths:", bg=bg, fg=TEXT_FG).grid(row=1, column=0, sticky="w", padx=4, pady=4)
+    e_paths = tk.Entry(top, width=14); e_paths.grid(row=1, column=1, padx=4, pady=4)
+    e_paths.insert(0, "2000")
+    tk.Label(top, text="Rebalancing:", bg=bg, fg=TEXT_FG).grid(row=1, column=2, sticky="w", padx=4, pady=4)
+    combo_reb = ttk.Combobox(top, values=["None","Monthly","Quarterly","Annual","Threshold"],
+                             state="readonly", width=12)
+    combo_reb.grid(row=1, column=3, padx=4, pady=4); combo_reb.set("Annual")
+    tk.Label(top, text="Drift Band (%):", bg=bg, fg=TEXT_FG).grid(row=1, column=4, sticky="w", padx=4, pady=4)
+    e_band = tk.Entry(top, width=8); e_band.grid(row=1, column=5, padx=4, pady=4)
+    e_band.insert(0, "5")
+
+    assets = tk.Frame(frame, bg=bg); assets.pack(fill="x", padx=16, pady=(4, 0))
+    for c, h in enumerate(["Asset","Weight (%)","Return (%)","Volatility (%)"]):
+        tk.Label(assets, text=h, bg=bg, fg=HEADING_FG).grid(row=0, column=c, sticky="w", padx=4, pady=2)
+    asset_entries = []
+    default_weights = {"Equity": 60, "Debt": 30, "Gold": 10}
+    for i, (name, (ret, vol)) in enumerate(ASSET_CLASSES.items(), start=1):
+        tk.Label(assets, text=name, bg=bg, fg=TEXT_FG).grid(row=i, column=0, sticky="w", padx=4, pady=2)
+        row = []
+        for c, val in enumerate((default_weights.get(name, 0), ret, vol), start=1):
+            e = tk.Entry(assets, width=10); e.grid(row=i, column=c, padx=4, pady=2)
+            e.insert(0, str(val)); row.append(e)
+        asset_entries.append(row)
+
+    btn_frame = tk.Frame(frame, bg=bg); btn_frame.pack(fill="x", padx=16, pady=(6, 8))
+
+    table_frame = tk.Frame(frame, bg=bg); table_frame.pack(fill="both", expand=False, padx=16, pady=(0, 6))
+    cols = ("year","invested","p10","p50","p90","equity")
+    tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=8)
+    heads = {"year":"Year","invested":"Invested (₹)","p10":"Pessimistic P10 (₹)","p50":"Median (₹)",
+             "p90":"Optimistic P90 (₹)","equity":"100% Equity Median (₹)"}
+    for c in cols: tree.heading(c, text=heads[c])
+    tree.column("year", width=60, anchor="center")
+    for c in cols[1:]: tree.column(c, width=150, anchor="e")
+    vsb = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
+    tree.configure(yscroll=vsb.set); vsb.pack(side="right", fill="y"); tree.pack(side="left", fill="both", expand=True)
+
+    summary_var = tk.StringVar()
+    tk.Label(frame, textvariable=summary_var, bg=SIDEBAR_BG, fg="#A5D8FF",
+             pady=6, font=("Segoe UI",10)).pack(fill="x", padx=16)
+
+    chart_frame = tk.Frame(frame, bg=bg); chart_frame.pack(fill="both", expand=True, padx=16, pady=(6, 12))
+    chart_canvas_container = {"canvas": None, "data": None}
+
+    def simulate():
+        if not NUMPY_AVAILABLE:
+            messagebox.showerror("Missing library","Install numpy for portfolio simulation."); return
+        try:
+            sip = float(e_sip.get())
+            start = float(e_start.get() or 0)
+            years = int(e_years.get())
+            paths = int(e_paths.get())
+            band = float(e_band.get() or 0)/100
+            weights, returns, vols = zip(*[[float(e.get() or 0) for e in row] for row in asset_entries])
+            if sip < 0 or start < 0 or years <= 0 or paths <= 0 or min(weights) < 0 or sum(weights) <= 0 \
+                    or min(vols) < 0:
+                raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid input","Enter SIP, years, paths and asset weights as numbers."); return
+        mode = combo_reb.get().lower()
+        equity = [1.0 if i == 0 else 0.0 for i in range(len(weights))]
+        values = simulate_portfolios(
+            [weights, equity], returns, vols, sip, years, paths=paths, start=start,
+            rebalance="none" if mode == "threshold" else mode,
+            band=band if mode == "threshold" and band > 0 else None,
+            correlation=ASSET_CORRELATION
+        )
+        pct = portfolio_percentiles(values)
+        invested = [start + sip*12*y for y in range(1, years+1)]
+
+        for r in tree.get_children(): tree.delete(r)
+        rows = []
+        for y in range(years):
+            row = [y+1, invested[y], pct[0,0,y], pct[1,0,y], pct[2,0,y], pct[1,1,y]]
+            rows.append(row)
+            tree.insert("", "end", values=(row[0],) + tuple(format_currency(v) for v in row[1:]))
+        final = values[0,:,-1]
+        summary_var.set(
+            f"Median corpus: {format_currency(pct[1,0,-1])}   |   "
+            f"P10–P90: {format_currency(pct[0,0,-1])} – {format_currency(pct[2,0,-1])}   |   "
+            f"Chance of beating invested: {(final > invested[-1]).mean()*100:.1f}%"
+        )
+        chart_canvas_container["data"] = rows
+        export_btn.config(state="normal")
+
+        if not MATPLOTLIB_AVAILABLE:
+            if not chart_frame.winfo_children():
+                tk.Label(chart_frame, text="Install matplotlib for chart.", fg=TEXT_FG, bg=bg).pack()
+            return
+        show_chart(chart_canvas_container, chart_frame, "portfolio",
+                   {"percentiles": pct[:, 0], "equity_median": pct[1, 1], "invested": invested}, bg)
+
+    def export_simulation():
+        rows = chart_canvas_container.get("data")
+        if not rows:
+            messagebox.showinfo("No data","Run the simulation first."); return
+        headers = ["Year","Invested (₹)","P10 (₹)","Median (₹)","P90 (₹)","100% Equity Median (₹)"]
+        path = save_to_excel_or_csv(
+            os.path.join(REPORTS_DIR,f"Portfolio_Simulation_{today_str()}"),
+            headers, [[r[0]] + [round(float(v),2) for v in r[1:]] for r in rows]
+        )
+        if path: messagebox.showinfo("Exported", f"Saved to {path}")
+
+    ttk.Button(btn_frame, text="Simulate", command=simulate).pack(side="left", padx=6)
+    export_btn = ttk.Button(btn_frame, text="Export Simulation", command=export_simulation, state="disabled")
+    export_btn.pack(side="left", padx=6)
 
 # ---------- Main UI ----------
-root = tk.Tk()
-root.title("💼 Personal Finance Toolkit")
-root.geometry("1200x720")
-root.configure(bg=SIDEBAR_BG)
-root.minsize(1000, 650)
-
-sidebar = tk.Frame(root, bg=SIDEBAR_BG, width=260)
-sidebar.pack(side="left", fill="y")
-main_frame = tk.Frame(root, bg=PRIMARY_BG)
-main_frame.pack(side="right", fill="both", expand=True)
-
-tk.Label(sidebar, text="💰 Finance Toolkit", fg=HEADING_FG, bg=SIDEBAR_BG,
-         font=("Segoe UI",18,"bold")).pack(pady=18)
-
-buttons = [
-    ("SIP Calculator", lambda: show_sip_calculator(main_frame)),
-    ("Step-up SIP vs SIP", lambda: show_step_up_vs_sip(main_frame)),
-    ("FIRE Calculator", lambda: show_fire_calculator(main_frame)),
-    ("Inflation Impact", lambda: show_inflation_calculator(main_frame)),
-    ("Loan Calculator", lambda: show_loan_calculator(main_frame)),
-    ("Expense Tracker", lambda: show_expense_tracker(main_frame)),
-]
-
-for text, cmd in buttons:
-    tk.Button(
-        sidebar,
-        text=text,
-        command=cmd,
-        bg=SIDEBAR_BG,
-        fg="white",
-        font=("Segoe UI",11,"bold"),
-        relief="flat",
-        width=22,
-        height=2,
-        activebackground="#243B63",
-        activeforeground="white",
-        bd=0,
-        highlightthickness=0
-    ).pack(pady=4, padx=10)
-
-tk.Label(sidebar, text="© Personal Finance Toolkit", fg="#94A3B8", bg=SIDEBAR_BG,
-         font=("Segoe UI",9)).pack(side="bottom", pady=10)
-
-show_sip_calculator(main_frame)
-root.mainloop()
\ No newline at end of file
+def main(argv=None):
+    # With --workbooks the toolkit runs headless as a batch job; otherwise it opens the window
+    import argparse
+    parser = argparse.ArgumentParser(description="Personal Finance Toolkit")
+    parser.add_argument("--workbooks", nargs=2, metavar=("CLIENTS", "OUTDIR"),
+                        help="write one workbook per client in the CLIENTS .jsonl file into OUTDIR")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-charts", action="store_true", help="leave charts out of the workbooks")
+    parser.add_argument("--money-mode", choices=MONEY_MODES, default=None,
+                        help="ledger amounts as rupee floats or exact paise (default: settings.json)")
+    parser.add_argument("--rounding", choices=ROUNDING_POLICIES, default=None,
+                        help="default projection rounding (default: settings.json)")
+    args = parser.parse_args(argv)
+    try:
+        settings = load_settings(SETTINGS_PATH)
+        configure(args.money_mode or settings["money_mode"], args.rounding or settings["rounding"])
+    except ValueError as ex:
+        parser.error(f"{SETTINGS_PATH}: {ex}")
+    if args.workbooks:
+        clients, outdir = args.workbooks
+        count, failed = 0, 0
+        for path, error in write_client_workbooks(load_clients(clients), outdir, args.workers,
+                                                  not args.no_charts):
+            if error:
+                failed += 1
+                print(f"Skipped {path}: {error}", file=sys.stderr)
+            else:
+                count += 1
+                print(path)
+        print(f"Wrote {count} workbook(s) to {outdir}" + (f"; {failed} client(s) failed" if failed else ""))
+        if failed:
+            raise SystemExit(1)
+        return
+
+    root = tk.Tk()
+    root.title("💼 Personal Finance Toolkit")
+    root.geometry("1200x720")
+    root.configure(bg=SIDEBAR_BG)
+    root.minsize(1000, 650)
+
+    sidebar = tk.Frame(root, bg=SIDEBAR_BG, width=260)
+    sidebar.pack(side="left", fill="y")
+    main_frame = tk.Frame(root, bg=PRIMARY_BG)
+    main_frame.pack(side="right", fill="both", expand=True)
+
+    tk.Label(sidebar, text="💰 Finance Toolkit", fg=HEADING_FG, bg=SIDEBAR_BG,
+             font=("Segoe UI",18,"bold")).pack(pady=18)
+
+    buttons = [
+        ("SIP Calculator", lambda: show_sip_calculator(main_frame)),
+        ("Step-up SIP vs SIP", lambda: show_step_up_vs_sip(main_frame)),
+        ("FIRE Calculator", lambda: show_fire_calculator(main_frame)),
+        ("Retirement Drawdown", lambda: show_drawdown_simulator(main_frame)),
+        ("Inflation Impact", lambda: show_inflation_calculator(main_frame)),
+        ("Loan Calculator", lambda: show_loan_calculator(main_frame)),
+        ("Expense Tracker", lambda: show_expense_tracker(main_frame)),
+        ("Household Planner", lambda: show_household_planner(main_frame)),
+        ("Asset Allocation", lambda: show_portfolio_simulator(main_frame)),
+    ]
+
+    for text, cmd in buttons:
+        tk.Button(
+            sidebar,
+            text=text,
+            command=cmd,
+            bg=SIDEBAR_BG,
+            fg="white",
+            font=("Segoe UI",11,"bold"),
+            relief="flat",
+            width=22,
+            height=2,
+            activebackground="#243B63",
+            activeforeground="white",
+            bd=0,
+            highlightthickness=0
+        ).pack(pady=4, padx=10)
+
+    tk.Label(sidebar, text="© Personal Finance Toolkit", fg="#94A3B8", bg=SIDEBAR_BG,
+             font=("Segoe UI",9)).pack(side="bottom", pady=10)
+
+    show_sip_calculator(main_frame)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_addoption(parser):
+    parser.addoption("--seed", type=int, default=None, help="seed for the randomized cross-checks")
+
+
+def pytest_configure(config):
+    seed = config.getoption("--seed")
+    config.cross_check_seed = random.randrange(1 << 30) if seed is None else seed
+
+
+def pytest_report_header(config):
+    return f"cross-check seed: {config.cross_check_seed} (reproduce with --seed {config.cross_check_seed})"
+
+
+@pytest.fixture
+def rng(request):
+    # One stream per test from the session seed, so a failing test reproduces on its own
+    return random.Random(f"{request.config.cross_check_seed}:{request.node.nodeid}")
@@ -0,0 +1,141 @@
+# Plain reference implementations the fast paths in finance_toolkit are checked against.
+# Each one takes the slow, obvious route: a lot, a day or a month at a time, with no prefix sums,
+# closed forms or vectorization.
+import datetime
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+import pytest
+
+import finance_toolkit as ft
+
+CASES = 200                   # random cases per property
+
+needs_numpy = pytest.mark.skipif(not ft.NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+def close(a, b, rtol=1e-9, atol=1e-6):
+    return abs(a - b) <= atol + rtol*max(abs(a), abs(b))
+
+
+def fv(sip, years, rate, step_up=0.0, start=0.0):
+    # Every contribution compounded on its own from the month-end it is paid, no running balance
+    n = years*12
+    i = rate/12/100
+    return start*(1+i)**n + sum(sip*(1+step_up/100)**(m//12)*(1+i)**(n-1-m) for m in range(n))
+
+
+def rounded_sip(sip, years, rate, step_up, start, policy):
+    # Paise ledger of project_sip's fixed-point mode: each month's interest rounded to the paisa
+    mode = {"half_up": ROUND_HALF_UP, "half_even": ROUND_HALF_EVEN}[policy]
+    rate = Decimal(str(rate))
+    bal = ft.to_paise(start)
+    invested, values = [], []
+    for y in range(years):
+        monthly = ft.to_paise(sip*((1+step_up/100)**y))
+        for _ in range(12):
+            # Multiply before dividing so an exact half-paisa stays exact (rate/1200 alone is rounded)
+            bal += int((bal*rate/1200).quantize(Decimal(1), rounding=mode)) + monthly
+        invested.append(monthly*12/100)
+        values.append(bal/100)
+    return invested, values
+
+
+def is_credit_day(d, compounding):
+    if compounding == "daily":
+        return True
+    months = {"monthly": 12, "quarterly": 4, "annual": 1}[compounding]
+    return d.day == 1 and (d.month - 1) % (12//months) == 0
+
+
+def calendar_values(flows, rate, query_dates, compounding, basis=365):
+    # Day by day: the credited balance and each debit accrue simple interest, and everything
+    # accrued is credited on the convention's credit days (and on the last query date)
+    flows = sorted((ft._as_date(d), a) for d, a in flows)
+    queries = sorted(ft._as_date(q) for q in query_dates)
+    day, end = flows[0][0], max(queries[-1], flows[-1][0])
+    credited, accrued, pending, k, out = 0.0, 0.0, [], 0, {}
+    r = rate/100
+    while day <= end:
+        if day > flows[0][0]:
+            accrued += credited*r/basis + sum(a for a in pending)*r/basis
+            if is_credit_day(day, compounding) or day == end:
+                credited += accrued + sum(pending)
+                accrued, pending = 0.0, []
+        while k < len(flows) and flows[k][0] == day:
+            pending.append(flows[k][1]); k += 1
+        out[day] = credited + accrued + sum(pending)
+        day += datetime.timedelta(days=1)
+    return [out[q] for q in (ft._as_date(q) for q in query_dates)]
+
+
+def lots(sip, years, rate, step_up, start, asset, inflation):
+    # Final-year value, cost, long-term value/cost/indexed cost, lot by lot
+    held = ft.CAPITAL_GAINS[asset]["long_after"]
+    n = years*12
+    idx = ft._monthly_index(inflation, years)
+    i = rate/12/100
+    out = dict(value=start*(1+i)**n, cost=start, lt_value=0.0, lt_cost=0.0, lt_indexed=0.0)
+    for m, c in [(-1, start)] + [(m, sip*(1+step_up/100)**(m//12)) for m in range(n)]:
+        age = n if m < 0 else n - 1 - m          # months held at the final month end
+        value = c*(1+i)**age
+        if m >= 0:
+            out["value"] += value; out["cost"] += c
+        if held is not None and age >= held:
+            out["lt_value"] += value; out["lt_cost"] += c
+            out["lt_indexed"] += c*idx[-1]/(idx[m] if m >= 0 else 1.0)
+    return out
+
+
+def drawdown_success(corpus, rate, growth, inflation, asset, other_income=0.0, regime=None):
+    # One path at a time with scalar arithmetic, no guardrails
+    success = []
+    for row in growth:
+        balance, cost, spend, alive = corpus, corpus, corpus*rate/100, True
+        for y, g in enumerate(row):
+            if y: spend *= 1 + inflation/100
+            gross = spend
+            if asset != "None":
+                share = min(max(1 - cost/balance, 0.0), 1.0) if balance > 0 else 0.0
+                gross = ft.withdrawal_gross_up(spend, share, asset, other_income, regime)
+            if gross > balance:
+                alive = False; break
+            cost = cost*(1 - gross/balance) if balance > 0 else 0.0
+            balance = (balance - gross)*g
+        success.append(alive)
+    return sum(success)/len(success)
+
+
+def rule_occurrences(rule, start, end):
+    # Every occurrence from the rule's first date, kept if it falls in [start, end]
+    first = ft._as_date(rule["start"])
+    last = min(end, ft._as_date(rule["end"])) if rule.get("end") else end
+    out, k = [], 0
+    while True:
+        d = ft._add_months(first, k*ft.RECURRENCE_MONTHS[rule["every"]])
+        if d > last:
+            return out
+        if d >= start:
+            out.append(d)
+        k += 1
+
+
+def budget_rows(entries, rules, budgets, first, months):
+    span = ft.month_range(first, months)
+    start = ft._as_date(span[0] + "-01")
+    end = ft._add_months(start, months) - datetime.timedelta(days=1)
+    virtual = [{"date": d.isoformat(), "type": r["type"], "category": r["category"], "amount": r["amount"]}
+               for r in rules for d in rule_occurrences(r, start, end)]
+
+    def spent(rows, month, cat):
+        return sum(e["amount"] for e in rows
+                   if e["date"][:7] == month and e["type"] == "Expense" and e["category"] == cat)
+    categories = set(budgets) | {e["category"] for e in entries + virtual
+                                 if e["type"] == "Expense" and e["date"][:7] in span}
+    rows = []
+    for month in span:
+        for cat in sorted(categories):
+            budget = budgets.get(cat, 0)
+            a, r = spent(entries, month, cat), spent(virtual, month, cat)
+            if budget or a or r:
+                rows.append([month, cat, budget, a, r, a + r, budget - a - r])
+    return rows
@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+
+import finance_toolkit as ft
+import reference as ref
+
+CATEGORIES = ["Food", "Rent", "Travel", "Utilities"]
+
+
+def random_rules(rng):
+    return [{"id": f"r{k}", "start": (datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 900))).isoformat(),
+             "end": rng.choice([None, "2026-12-31"]), "every": rng.choice(list(ft.RECURRENCE_MONTHS)),
+             "type": rng.choice(["Expense", "Expense", "Income"]), "category": rng.choice(CATEGORIES),
+             "amount": rng.choice([500, 1200, 20000])}
+            for k in range(rng.randint(0, 6))]
+
+
+def random_entries(rng):
+    return [{"id": str(k), "date": (datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 1100))).isoformat(),
+             "type": rng.choice(["Expense", "Income"]), "category": rng.choice(CATEGORIES),
+             "amount": rng.choice([100, 250, 999])}
+            for k in range(rng.randint(0, 200))]
+
+
+def test_recurring_entries_match_naive_expansion(rng):
+    for _ in range(30):
+        rules = random_rules(rng)
+        start = datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 900))
+        end = start + datetime.timedelta(days=rng.randint(0, 700))
+        got = list(ft.recurring_entries(rules, end, start))
+        assert [e["date"] for e in got] == sorted(e["date"] for e in got)
+        want = sorted((d.isoformat(), r["id"]) for r in rules for d in ref.rule_occurrences(r, start, end))
+        assert sorted((e["date"], e["rule"]) for e in got) == want
+
+
+@pytest.mark.parametrize("months", [1, 5, 12])
+def test_budget_report_matches_naive_sums(rng, months):
+    # Integer amounts keep both sides exact whatever order they are summed in
+    for _ in range(20):
+        rules, entries = random_rules(rng), random_entries(rng)
+        budgets = {c: rng.choice([0, 5000, 25000]) for c in rng.sample(CATEGORIES, rng.randint(0, 4))}
+        first = f"{rng.randint(2024, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        got = list(ft.budget_report(entries, rules, budgets, first, months))
+        assert got == ref.budget_rows(entries, rules, budgets, first, months)
@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+
+import finance_toolkit as ft
+from reference import CASES, needs_numpy
+
+
+def random_flows(rng, n=24):
+    return [-rng.uniform(100, 1e5) for _ in range(n - 1)] + [rng.choice([0.0, rng.uniform(0, 5e6)])]
+
+
+def assert_root(rate, amounts, t):
+    # NPV changes sign within a few tolerances of the rate (near -100% the NPV itself is huge for
+    # any rate error, so its size proves nothing)
+    lo, hi = (ft._npv_and_slope(rate + d*10*ft.XIRR_TOL, amounts, t)[0] for d in (-1, 1))
+    assert lo*hi <= 0, rate
+
+
+@needs_numpy
+@pytest.mark.parametrize("span", [10, 70])
+def test_xirr_batch_matches_scalar_solver(rng, span):
+    # Over 60+ years the discount factors near -100% pass the float range
+    t = sorted(rng.uniform(0, span) for _ in range(24))
+    t[0] = 0.0
+    flows = [random_flows(rng) for _ in range(CASES)]
+    batch = ft.xirr_batch(flows, t)
+    for k, a in enumerate(flows):
+        want = ft.xirr_from_fractions(a, t)
+        if want is None:
+            assert batch[k] != batch[k], k          # NaN: no solution
+        else:
+            assert abs(batch[k] - want) < 1e-7, k
+            assert_root(want, a, t)
+
+
+def test_cashflow_series_matches_cold_solve(rng):
+    for _ in range(CASES//20):
+        end = datetime.date(2026, 1, 1) + datetime.timedelta(days=rng.randint(0, 3650))
+        series = ft.CashflowSeries([(end, rng.uniform(1e5, 5e6))])
+        dates, amounts = [end], [series.amounts[0]]
+        # Investments appended out of date order, several before the series' first date
+        for _k in range(rng.randint(2, 20)):
+            d = end - datetime.timedelta(days=rng.randint(1, 3650))
+            a = -rng.uniform(100, 1e5)
+            series.append(d, a)
+            dates.append(d); amounts.append(a)
+            want = ft.xirr(amounts, dates)
+            got = series.xirr()
+            assert (got is None) == (want is None)
+            if want is not None:
+                assert abs(got - want) < 1e-7, (dates, amounts)
+
+
+def test_xirr_over_long_spans_does_not_overflow():
+    # At the -99.9999% bracket end the discount factor for 66 years is far past the float range
+    t = ft.year_fractions(["1960-01-01", "2026-01-01"])
+    assert abs(ft.xirr([-1000, 10], ["1960-01-01", "2026-01-01"]) - (0.01**(1/t[1]) - 1)) < 1e-8
+    assert ft.xirr([-1000, 0.0], ["1960-01-01", "2026-01-01"]) is None
+    assert ft.xnpv(ft.XIRR_LOW, [-1000, 10], ["1960-01-01", "2026-01-01"]) == float("inf")
+
+
+@needs_numpy
+def test_xirr_batch_over_long_spans_matches_scalar_solver():
+    dates = ["1960-01-01", "2020-01-01", "2026-01-01"]
+    want = ft.xirr([0, -1000, 10], dates)
+    assert abs(ft.xirr_batch([[0, -1000, 10]], ft.year_fractions(dates))[0] - want) < 1e-7
@@ -0,0 +1,41 @@
+import pytest
+
+import finance_toolkit as ft
+
+pytestmark = [pytest.mark.skipif(not ft.MATPLOTLIB_AVAILABLE, reason="matplotlib not installed"),
+              pytest.mark.skipif(not ft.NUMPY_AVAILABLE, reason="numpy not installed")]
+
+
+def sample_data(kind, n):
+    import numpy as np
+    line = np.linspace(1e5, 1e6, n)
+    return {
+        "drawdown": {"balance": [np.append(line, 0)*0.5, np.append(line, 0), np.append(line, 0)*2],
+                     "spending": line/20, "rate": 4.0},
+        "household": {"yearly": [{"year": y + 1, "allocated": 1e5, "unallocated": 2e4, "shortfall": 0.0}
+                                 for y in range(n)]},
+        "portfolio": {"percentiles": [line*0.8, line, line*1.2], "equity_median": line*1.1, "invested": line/2},
+        "heatmap": {"grid": np.outer(np.arange(1, n + 1), np.arange(1, 4)).astype(float),
+                    "x_vals": [8, 10, 12], "y_vals": list(range(n)), "x_label": "Return", "y_label": "Years",
+                    "title": "Heatmap"},
+    }[kind]
+
+
+@pytest.mark.parametrize("kind", ["drawdown", "household", "portfolio", "heatmap"])
+def test_screen_charts_share_the_template_styling(kind):
+    fig = ft.build_chart(kind, sample_data(kind, 5))
+    ax = fig.axes[0]
+    assert fig.patch.get_facecolor() == ax.get_facecolor()
+    assert ax.title.get_color() == ft.HEADING_FG
+    # Redrawn into the same figure with different data: one set of artists, one colorbar at most
+    ft.build_chart(kind, sample_data(kind, 9), fig)
+    assert len(fig.axes) == (2 if kind == "heatmap" else 1)
+    assert len(ax.images) == (1 if kind == "heatmap" else 0)
+    if kind == "heatmap":
+        assert ax.get_ylim() == (-0.5, 8.5)
+        assert fig.axes[1].get_ylim()[1] == pytest.approx(27)
+
+
+def test_chart_png_renders_every_kind():
+    for kind in ("drawdown", "household", "portfolio", "heatmap"):
+        assert ft.chart_png(kind, sample_data(kind, 4)).getvalue()[:8] == b"\x89PNG\r\n\x1a\n"
@@ -0,0 +1,50 @@
+import finance_toolkit as ft
+from reference import close
+
+
+def random_goals(rng):
+    return [{"name": f"goal{k}", "target": rng.uniform(1e5, 5e6), "years": rng.randint(1, 20),
+             "rate": rng.choice([0.0, rng.uniform(0.01, 12)]), "inflation": rng.uniform(0, 8),
+             "priority": rng.randint(1, 5), "start": rng.choice([0.0, rng.uniform(0, 1e5)])}
+            for k in range(rng.randint(1, 4))]
+
+
+def random_loans(rng):
+    return [{"name": f"loan{k}", "principal": rng.uniform(1e5, 5e6), "rate": rng.choice([0.0, rng.uniform(1, 14)]),
+             "years": rng.randint(1, 20), "priority": rng.randint(1, 5)}
+            for k in range(rng.randint(0, 3))]
+
+
+def test_ample_surplus_funds_goals_with_level_contributions(rng):
+    # With enough money every goal gets the level annuity payment that reaches its inflated
+    # target, and every loan is paid its EMI until the tenure ends
+    for _ in range(20):
+        goals, loans = random_goals(rng), random_loans(rng)
+        steps = list(ft.household_plan(1e9, goals, loans))
+        for g in goals:
+            i, n = g["rate"]/1200, g["years"]*12
+            target = g["target"]*(1 + g["inflation"]/100)**g["years"]
+            growth = (1 + i)**n
+            level = (target - g["start"]*growth)/n if i == 0 else (target - g["start"]*growth)*i/(growth - 1)
+            for s in steps[:n]:
+                assert close(s["paid"][g["name"]], max(level, 0.0), 1e-7, 1e-6), (g, s["month"])
+        _yearly, outcomes = ft.household_summary(iter(steps))
+        for g in goals:
+            assert close(outcomes[g["name"]]["value"], outcomes[g["name"]]["target"], 1e-9, 1e-4) \
+                or g["start"]*(1 + g["rate"]/1200)**(g["years"]*12) > outcomes[g["name"]]["target"], g
+        for ln in loans:
+            emi = ft.loan_emi(ln["principal"], ln["rate"], ln["years"])
+            paid = [s["paid"].get(ln["name"], 0.0) for s in steps]
+            assert all(close(p, emi, 1e-9, 1e-4) for p in paid[:ln["years"]*12 - 1]), ln
+            assert outcomes[ln["name"]]["month"] == ln["years"]*12, ln
+
+
+def test_tight_surplus_conserves_money(rng):
+    for _ in range(20):
+        goals, loans = random_goals(rng), random_loans(rng)
+        surplus = rng.uniform(1e3, 1e5)
+        for s in ft.household_plan(surplus, goals, loans, years=10, surplus_growth=rng.uniform(0, 10)):
+            assert close(sum(s["paid"].values()) + s["unallocated"], s["available"], 1e-9, 1e-6) \
+                or s["unallocated"] == 0.0, s["month"]
+            # Money is only left over when nobody went short
+            assert s["unallocated"] < 1e-6 or s["shortfall"] < 1e-6, s["month"]
@@ -0,0 +1,41 @@
+import pytest
+
+import finance_toolkit as ft
+from reference import close, needs_numpy
+
+
+def grid_inputs(rng):
+    amounts = [rng.choice([1.0, 1000.0, rng.uniform(1, 1e7)]) for _ in range(rng.randint(1, 6))]
+    rates = [rng.choice([0.0, rng.uniform(0.01, 15)]) for _ in range(rng.randint(1, 6))]
+    return amounts, rates, rng.randint(1, 60)
+
+
+@needs_numpy
+def test_inflation_grid_matches_loop(rng):
+    for _ in range(20):
+        amounts, rates, years = grid_inputs(rng)
+        grid = ft.inflation_grid(amounts, rates, years)
+        for a, amount in enumerate(amounts):
+            for r, rate in enumerate(rates):
+                for y in range(1, years + 1):
+                    f = (1 + rate/100)**y
+                    assert close(grid["cum_infl"][r, y-1], f - 1, 1e-12, 1e-12)
+                    assert close(grid["future_cost"][a, r, y-1], amount*f, 1e-12, 1e-9)
+                    assert close(grid["purch_power"][a, r, y-1], amount/f, 1e-12, 1e-9)
+
+
+@pytest.mark.parametrize("numpy_path", [False, True])
+def test_grid_rows_match_loop(rng, monkeypatch, numpy_path):
+    if numpy_path and not ft.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(ft, "NUMPY_AVAILABLE", numpy_path)
+    for _ in range(20):
+        amounts, rates, years = grid_inputs(rng)
+        rows = list(ft.iter_inflation_grid_rows(amounts, rates, years))
+        want = [(a, r, y) for a in amounts for r in rates for y in range(1, years + 1)]
+        assert [row[:3] for row in rows] == want
+        for (a, r, y), row in zip(want, rows):
+            f = (1 + r/100)**y
+            # Rounded to the paisa, so the two paths may differ by one in the last place
+            for got, exact in zip(row[3:], ((f - 1)*100, a*f, a/f)):
+                assert abs(got - exact) <= 0.005 + 1e-9*abs(exact), (a, r, y)
@@ -0,0 +1,108 @@
+import datetime
+import gc
+import os
+import weakref
+
+import pytest
+
+import finance_toolkit as ft
+
+
+def entry(k):
+    return {"date": "2026-01-01", "type": "Expense", "category": "Food", "amount": k, "note": ""}
+
+
+def test_torn_tail_from_another_writer_is_dropped(tmp_path):
+    a, b = ft.LedgerStore(str(tmp_path)), ft.LedgerStore(str(tmp_path))
+    a.add(entry(1))
+    b.add(entry(2))
+    # Another process dies part-way through a record while both stores hold the log open
+    with open(a._paths(a.generation())[1], "ab") as f:
+        f.write(ft._frame({"add": [dict(entry(3), id="torn")]})[:20])
+    a.add(entry(4))
+    b.add(entry(5))
+    reader = ft.LedgerStore(str(tmp_path))
+    assert sorted(e["amount"] for e in reader.snapshot()) == [1, 2, 4, 5]
+    for s in (a, b, reader): s.close()
+
+
+def test_exit_hook_closes_live_stores_without_keeping_them_alive(tmp_path):
+    store = ft.LedgerStore(str(tmp_path))
+    store.add(entry(1))
+    ft._close_stores()
+    assert store._log is None
+    ref = weakref.ref(store)
+    del store
+    gc.collect()
+    assert ref() is None
+
+
+def test_checkpoint_keeps_entries_and_restarts_the_log(tmp_path):
+    store = ft.LedgerStore(str(tmp_path))
+    ids = [store.add(entry(k)) for k in range(5)]
+    store.delete(ids[:2])
+    store.checkpoint()
+    assert store.generation() == 1
+    assert os.path.getsize(store._paths(1)[1]) == 0
+    store.add(entry(9))
+    assert sorted(e["amount"] for e in ft.LedgerStore(str(tmp_path)).snapshot()) == [2, 3, 4, 9]
+    store.close()
+
+
+def test_missing_log_for_head_generation_reads_as_empty(tmp_path):
+    store = ft.LedgerStore(str(tmp_path))
+    store.add(entry(1))
+    store.checkpoint()
+    store.close()
+    os.remove(store._paths(1)[1])
+    fresh = ft.LedgerStore(str(tmp_path))
+    assert [e["amount"] for e in fresh.snapshot()] == [1]
+    fresh.add(entry(2))
+    assert sorted(e["amount"] for e in fresh.snapshot()) == [1, 2]
+    fresh.close()
+
+
+def test_amounts_read_back_in_the_current_money_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(ft, "MONEY_MODE", "float")
+    store = ft.LedgerStore(str(tmp_path))
+    store.add(entry(1500.25))
+    # A row written before units were recorded holds rupees
+    with open(store._paths(0)[1], "ab") as f:
+        f.write(ft._frame({"add": [dict(entry(99.5), id="old")]}))
+    monkeypatch.setattr(ft, "MONEY_MODE", "paise")
+    store.add(entry(ft.ledger_amount("10.10")))
+    assert sorted(e["amount"] for e in store.snapshot()) == [1010, 9950, 150025]
+    assert ft.format_amount(max(e["amount"] for e in store.snapshot())) == "₹1,500.25"
+    monkeypatch.setattr(ft, "MONEY_MODE", "float")
+    assert sorted(e["amount"] for e in store.snapshot()) == [10.1, 99.5, 1500.25]
+    store.close()
+
+
+def test_budget_file_amounts_follow_the_money_mode(tmp_path, monkeypatch):
+    path = str(tmp_path / "budget.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"rules": [{"id": "r", "amount": 1500.0}], "budgets": {"Food": 8000}}')
+    monkeypatch.setattr(ft, "MONEY_MODE", "paise")
+    data = ft.update_budget(lambda d: d["budgets"].update(Rent=ft.ledger_amount("20000")), path)
+    assert data["rules"][0]["amount"] == 150000
+    assert data["budgets"] == {"Food": 800000, "Rent": 2000000}
+    monkeypatch.setattr(ft, "MONEY_MODE", "float")
+    data = ft.load_budget(path)
+    assert data["rules"][0]["amount"] == 1500.0
+    assert data["budgets"] == {"Food": 8000.0, "Rent": 20000.0}
+
+
+def test_excel_date_cells_are_imported(tmp_path):
+    pytest.importorskip("openpyxl")
+    path = str(tmp_path / "ledger.xlsx")
+    ft.write_report(path, ["Date", "Type", "Category", "Amount", "Note"], [
+        [datetime.datetime(2026, 3, 1), "Expense", "Food", 120.5, ""],
+        [datetime.date(2026, 3, 2), "Income", "Salary", 5000, "march"],
+        ["2026-03-03", "Expense", "Rent", 9000, ""],
+        ["03/04/2026", "Expense", "Rent", 9000, ""],
+        ["2026-03-05", "Transfer", "Rent", 9000, ""],
+    ])
+    headers, rows, _summary = ft.load_report(path)
+    new, skipped = ft.ledger_rows(headers, rows)
+    assert [e["date"] for e in new] == ["2026-03-01", "2026-03-02", "2026-03-03"]
+    assert skipped == 2
@@ -0,0 +1,48 @@
+import pytest
+
+import finance_toolkit as ft
+from reference import CASES
+
+
+def sip_inputs(rng):
+    return {"sip": rng.choice([5000.0, 7500.0]), "years": rng.randint(1, 20), "rate": rng.choice([0.0, 12.0]),
+            "inflation": rng.choice([0.0, 6.0]), "tax": rng.choice(ft.TAX_TREATMENTS),
+            "other_income": rng.choice([0.0, 8e5]), "compounding": None, "start_date": None, "debit_day": None,
+            "rounding": rng.choice(ft.ROUNDING_POLICIES)}
+
+
+def step_up_inputs(rng):
+    return {"sip": rng.choice([5000.0, 7500.0]), "years": rng.randint(1, 20), "rate": rng.choice([0.0, 12.0]),
+            "step_up": rng.choice([0.0, 10.0]), "inflation": rng.choice([0.0, 6.0]),
+            "tax": rng.choice(ft.TAX_TREATMENTS), "other_income": rng.choice([0.0, 8e5]),
+            "rounding": rng.choice(ft.ROUNDING_POLICIES)}
+
+
+def inflation_inputs(rng):
+    return {"amount": rng.choice([1e3, 1e5]), "rate": rng.choice([0.0, 6.0]), "years": rng.randint(1, 40)}
+
+
+@pytest.mark.parametrize("make, data, draw", [
+    (ft.sip_graph, ft.sip_data, sip_inputs),
+    (ft.step_up_graph, ft.step_up_data, step_up_inputs),
+    (ft.inflation_graph, ft.inflation_data, inflation_inputs),
+])
+def test_incremental_update_equals_fresh_evaluation(rng, make, data, draw):
+    g, inputs = make(), draw(rng)
+    g.update(inputs)
+    for _ in range(CASES//10):
+        key = rng.choice(list(inputs))
+        inputs[key] = draw(rng)[key]
+        g.update(inputs)
+        fresh = make()
+        fresh.update(inputs)
+        assert data(g) == data(fresh), key
+
+
+def test_inflation_edit_leaves_fv_nodes_alone():
+    g = ft.step_up_graph()
+    inputs = {"sip": 5000.0, "years": 15, "rate": 12.0, "step_up": 10.0, "inflation": 6.0,
+              "tax": "Equity", "other_income": 0.0, "rounding": "float"}
+    g.update(inputs)
+    inputs["inflation"] = 7.0
+    assert g.update(inputs) == {"inflation", "inflation_adj_step", "inflation_adj_norm", "tax_step", "tax_norm"}
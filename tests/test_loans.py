@@ -0,0 +1,70 @@
+import pytest
+
+import finance_toolkit as ft
+from reference import CASES, close, needs_numpy
+
+
+def random_loan(rng):
+    return rng.uniform(1e4, 1e8), rng.choice([0.0, rng.uniform(0.01, 30)]), rng.randint(1, 40)
+
+
+def test_emi_amortizes_to_zero(rng):
+    for _ in range(CASES):
+        p, rate, years = random_loan(rng)
+        emi = ft.loan_emi(p, rate, years)
+        balance = p
+        for _m in range(years*12):
+            balance = balance*(1 + rate/12/100) - emi
+        assert abs(balance) < 1e-6*p, (p, rate, years)
+
+
+def test_emi_on_a_very_long_tenure_tends_to_interest_only():
+    assert close(ft.loan_emi(1e6, 12.0, 100000), 1e4)
+
+
+@needs_numpy
+def test_offers_batch_matches_scalar_emi_and_apr(rng):
+    import numpy as np
+    p, rate, years = (np.array(c) for c in zip(*(random_loan(rng) for _ in range(CASES))))
+    batch = ft.loan_offers_batch(p, rate, years)
+    for k in range(CASES):
+        assert close(batch["emi"][k], ft.loan_emi(p[k], rate[k], years[k])), k
+        # No fees: the APR is the nominal rate compounded monthly
+        assert abs(batch["apr"][k] - ((1 + rate[k]/1200)**12 - 1)*100) < 1e-6, k
+
+
+def test_offer_file_error_lists_only_missing_columns(tmp_path):
+    path = str(tmp_path / "offers.csv")
+    ft.write_report(path, ["Lender", "Principal", "Rate"], [["A", 1e6, 9.0]])
+    with pytest.raises(ValueError) as err:
+        ft.load_loan_offers(path)
+    assert str(err.value).endswith("missing columns: Rate (%), Tenure (years)")
+
+
+def test_offer_file_skips_offers_whose_fees_use_up_the_principal(tmp_path):
+    path = str(tmp_path / "offers.csv")
+    ft.write_report(path, ["Lender", "Principal", "Rate (%)", "Tenure (years)", "Fee (%)", "Fee (₹)"],
+                    [["A", 1e6, 9.0, 20, 1.0, ""], ["B", 1e5, 9.0, 20, "", 1e5], ["C", 1e5, 9.0, 20, 50.0, 6e4]])
+    names, offers, skipped = ft.load_loan_offers(path)
+    assert names == ["A"] and offers["principal"] == [1e6]
+    assert skipped == ["B", "C"]
+
+
+@needs_numpy
+def test_offer_apr_when_fees_leave_little_or_nothing():
+    import numpy as np
+    result = ft.loan_offers_batch(np.full(3, 1e5), 9.0, 20, fee_flat=[1e5, 2e5, 99999.0])
+    assert np.isnan(result["apr"][:2]).all()
+    # Net of ₹1 against a ₹900 EMI: the monthly rate is far past the 100% starting bracket
+    i = (1 + result["apr"][2]/100)**(1/12) - 1
+    assert close(result["emi"][2]*-np.expm1(-240*np.log1p(i))/i, 1.0)
+
+
+@needs_numpy
+def test_ranked_rows_without_optional_columns(rng):
+    names = [f"L{k}" for k in range(50)]
+    result = ft.loan_offers_batch([rng.uniform(1e5, 1e7) for _ in names], [rng.uniform(6, 14) for _ in names], 20)
+    rows = list(ft.iter_ranked_offer_rows(names, result))
+    assert [r[0] for r in rows] == list(range(1, 51))
+    assert [r[5] for r in rows] == sorted(r[5] for r in rows)
+    assert all(r[7] is None and r[8] is None for r in rows) == ("break_even" not in result)
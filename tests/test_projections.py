@@ -0,0 +1,92 @@
+import itertools
+
+import pytest
+
+import finance_toolkit as ft
+from reference import CASES, close, needs_numpy
+import reference as ref
+
+
+def random_sip(rng):
+    return (rng.uniform(100, 1e5), rng.randint(1, 40), rng.choice([0.0, rng.uniform(0.01, 25)]),
+            rng.choice([0.0, rng.uniform(0.01, 20)]), rng.choice([0.0, rng.uniform(0, 1e7)]))
+
+
+def test_project_sip_matches_contribution_by_contribution(rng):
+    cases = [random_sip(rng) for _ in range(CASES)]
+    r = rng.uniform(1, 20)
+    cases.append((5000.0, 30, r, ((1 + r/1200)**12 - 1)*100, 0.0))    # step-up equal to the yearly growth
+    for sip, years, rate, step_up, start in cases:
+        want = ref.fv(sip, years, rate, step_up, start)
+        got = ft.project_sip(sip, years, rate, step_up, start)[1][-1]
+        assert close(got, want), (sip, years, rate, step_up, start)
+        glide = ft._project_sip_schedule(sip, years, [rate]*years, step_up, start)[1][-1]
+        assert close(glide, want), (sip, years, rate, step_up, start)
+
+
+def test_annuity_factor(rng):
+    for _ in range(CASES):
+        years, rate = rng.randint(1, 40), rng.choice([0.0, rng.uniform(0.01, 25)])
+        assert close(ft.annuity_factor(rate, years)[1], ref.fv(1.0, years, rate)), (rate, years)
+
+
+@needs_numpy
+def test_step_up_fv_vec(rng):
+    import numpy as np
+    cases = [random_sip(rng)[:4] for _ in range(CASES)]
+    r = rng.uniform(1, 20)
+    cases.append((5000.0, 30, r, ((1 + r/1200)**12 - 1)*100))
+    sip, years, rate, step_up = (np.array(c) for c in zip(*cases))
+    got = ft.step_up_fv_vec(sip, rate, step_up, years)
+    for k, (s, y, r, g) in enumerate(cases):
+        assert close(got[k], ref.fv(s, y, r, g)), cases[k]
+
+
+@pytest.mark.parametrize("policy", ["half_up", "half_even"])
+def test_fixed_point_rounding_matches_decimal_ledger(rng, policy):
+    for _ in range(CASES//4):
+        sip, years = round(rng.uniform(100, 1e5), 2), rng.randint(1, 30)
+        rate = rng.choice([0.0, round(rng.uniform(0.01, 25), 2)])
+        step_up, start = rng.choice([0.0, 10.0, 7.5]), rng.choice([0.0, round(rng.uniform(0, 1e7), 2)])
+        want = ref.rounded_sip(sip, years, rate, step_up, start, policy)
+        got = ft.project_sip(sip, years, rate, step_up, start, rounding=policy)
+        assert got == want, (sip, years, rate, step_up, start)
+
+
+@pytest.mark.parametrize("compounding", ["daily", "monthly", "quarterly", "annual"])
+def test_project_calendar_matches_day_by_day_accrual(rng, compounding):
+    for _ in range(10):
+        start = ft._as_date(f"{rng.randint(2000, 2030)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        flows = [(ft._add_months(start, rng.randint(0, 36), rng.randint(1, 31)), rng.uniform(100, 1e5))
+                 for _ in range(rng.randint(1, 30))]
+        first = min(d for d, _ in flows)
+        queries = [max(first, ft._add_months(first, rng.randint(0, 48), rng.randint(1, 31))) for _ in range(5)]
+        rate = rng.choice([0.0, rng.uniform(0.01, 20)])
+        got = ft.project_calendar(flows, rate, queries, compounding)
+        want = ref.calendar_values(flows, rate, queries, compounding)
+        for q, g, w in zip(queries, got, want):
+            assert close(g, w, 1e-9, 1e-4), (compounding, rate, q)
+
+
+def test_project_sip_calendar_matches_day_by_day_accrual(rng):
+    for _ in range(10):
+        start = f"{rng.randint(2000, 2030)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        sip, years, rate = rng.uniform(500, 5e4), rng.randint(1, 6), rng.choice([0.0, rng.uniform(0.01, 20)])
+        debit_day, compounding = rng.choice([None, 1, 15, 31]), rng.choice(ft.COMPOUNDING_CONVENTIONS)
+        _invested, got = ft.project_sip_calendar(sip, years, rate, start, debit_day, compounding=compounding)
+        anniversaries = [ft._add_months(ft._as_date(start), 12*(y + 1)) for y in range(years)]
+        flows = list(ft.sip_calendar(sip, years, start, debit_day))
+        want = ref.calendar_values(flows, rate, anniversaries, compounding)
+        for g, w in zip(got, want):
+            assert close(g, w, 1e-9, 1e-4), (start, rate, debit_day, compounding)
+
+
+def test_project_sip_calendar_invested_equals_value_at_zero_rate(rng):
+    # Every debit is counted in the same year's invested as its year-end value, including debits
+    # falling on an anniversary
+    for _ in range(CASES//4):
+        start = f"{rng.randint(2000, 2030)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        invested, values = ft.project_sip_calendar(rng.uniform(500, 5e4), rng.randint(1, 10), 0.0, start,
+                                                   rng.choice([None, 1, 15, 28, 31]), rng.uniform(0, 15),
+                                                   rng.choice(ft.COMPOUNDING_CONVENTIONS))
+        assert all(close(sum(invested[:y + 1]), v) for y, v in enumerate(values)), start
@@ -0,0 +1,16 @@
+import pytest
+
+import finance_toolkit as ft
+
+pytestmark = pytest.mark.skipif(not ft.PYARROW_AVAILABLE, reason="pyarrow not installed")
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".arrow"])
+def test_streamed_floats_after_an_integer_batch_are_kept(tmp_path, monkeypatch, ext):
+    monkeypatch.setattr(ft, "ARROW_BATCH_ROWS", 2)
+    rows = [[1, "a", 100], [2, "b", 200], [3, "c", 2.5], [4, "d", 3.75]]
+    path = ft.stream_report(str(tmp_path / f"t{ext}"), ["Year", "Name", "Amount"], iter(rows),
+                            int_columns=("Year",))
+    headers, got, _summary = ft.load_report(path)
+    assert got == rows
+    assert [type(r[0]) for r in got] == [int]*4
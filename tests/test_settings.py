@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+import finance_toolkit as ft
+
+
+@pytest.fixture(autouse=True)
+def restore_settings(monkeypatch):
+    monkeypatch.setattr(ft, "MONEY_MODE", ft.MONEY_MODE)
+    monkeypatch.setattr(ft, "ROUNDING_POLICY", ft.ROUNDING_POLICY)
+    monkeypatch.delenv("FINANCE_MONEY_MODE", raising=False)
+    monkeypatch.delenv("FINANCE_ROUNDING", raising=False)
+
+
+def test_environment_overrides_settings_file(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"money_mode": "paise", "rounding": "half_up"}))
+    assert ft.load_settings(str(path)) == {"money_mode": "paise", "rounding": "half_up"}
+    monkeypatch.setenv("FINANCE_ROUNDING", "half_even")
+    assert ft.load_settings(str(path)) == {"money_mode": "paise", "rounding": "half_even"}
+    assert ft.load_settings(str(tmp_path / "missing.json")) == {"money_mode": "float", "rounding": "half_even"}
+
+
+def test_configured_rounding_is_the_projection_default():
+    ft.configure("paise", "half_even")
+    assert ft.MONEY_MODE == "paise"
+    assert ft.sip_summary(1234.56, 3, 7.25)["fv_by_year"] == ft.project_sip(1234.56, 3, 7.25, rounding="half_even")[1]
+    assert ft.sip_summary(1234.56, 3, 7.25, rounding="float")["fv_by_year"] == ft.project_sip(
+        1234.56, 3, 7.25, rounding="float")[1]
+    with pytest.raises(ValueError):
+        ft.configure(rounding="bankers")
+
+
+@pytest.mark.parametrize("text", ["{\"money_mode\": ", "[\"paise\"]"])
+def test_malformed_settings_file_is_a_usage_error(tmp_path, monkeypatch, capsys, text):
+    path = tmp_path / "settings.json"
+    path.write_text(text)
+    monkeypatch.setattr(ft, "SETTINGS_PATH", str(path))
+    with pytest.raises(SystemExit) as ex:
+        ft.main([])
+    assert ex.value.code == 2
+    assert f"{path}: " in capsys.readouterr().err
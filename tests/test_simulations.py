@@ -0,0 +1,33 @@
+import finance_toolkit as ft
+from reference import needs_numpy
+import reference as ref
+
+pytestmark = needs_numpy
+
+
+def test_portfolio_chunks_and_threshold_band(rng):
+    import numpy as np
+    seed = rng.randrange(1 << 30)
+    w = [[0.6, 0.3, 0.1], [1.0, 0.0, 0.0]]
+    returns, vols = [v[0] for v in ft.ASSET_CLASSES.values()], [v[1] for v in ft.ASSET_CLASSES.values()]
+    # Threshold rebalancing only (band is a fraction: 0.05 = 5 points of drift)
+    sim = lambda **kw: ft.simulate_portfolios(w, returns, vols, 10000, 10, paths=300, seed=seed,
+                                              rebalance="none", **kw)
+    whole, chunked = sim(band=0.05), sim(band=0.05, chunk_elements=1000)
+    assert np.allclose(whole, chunked, rtol=1e-12)
+    assert not np.allclose(whole[0], sim()[0])
+
+
+def test_portfolio_without_volatility_is_the_monthly_projection():
+    import numpy as np
+    flat = ft.simulate_portfolios([[1, 0, 0]], [12, 0, 0], [0, 0, 0], 5000, 20, paths=4, start=1e5)
+    want = ft.project_sip(5000, 20, ((1.12)**(1/12) - 1)*1200, start=1e5)[1]
+    assert np.allclose(flat[0], want, rtol=1e-9)
+
+
+def test_drawdown_matches_path_by_path(rng):
+    growth = ft.drawdown_returns(200, 30, 9, 14, rng.randrange(1 << 30))
+    for asset in ("None", rng.choice(list(ft.CAPITAL_GAINS))):
+        rate = rng.uniform(2, 7)
+        fast = ft.simulate_drawdown(1e7, [rate], growth, 6.0, asset=asset)["success"][0]
+        assert fast == ref.drawdown_success(1e7, rate, growth, 6.0, asset), (rate, asset)
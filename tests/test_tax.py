@@ -0,0 +1,72 @@
+import finance_toolkit as ft
+from reference import CASES, close, needs_numpy
+import reference as ref
+
+
+def random_plan(rng):
+    return dict(sip=rng.uniform(500, 5e4), years=rng.randint(1, 25),
+                rate=rng.choice([0.0, rng.uniform(0.01, 20)]), step_up=rng.choice([0.0, rng.uniform(0, 15)]),
+                start=rng.choice([0.0, rng.uniform(0, 5e6)]), inflation=rng.uniform(0, 10),
+                asset=rng.choice(list(ft.CAPITAL_GAINS)))
+
+
+def test_redemption_table_matches_lot_by_lot(rng):
+    for _ in range(CASES//4):
+        c = random_plan(rng)
+        table = ft.redemption_table(c["sip"], c["years"], c["rate"], c["step_up"], c["start"], c["asset"],
+                                    c["inflation"])
+        want = ref.lots(c["sip"], c["years"], c["rate"], c["step_up"], c["start"], c["asset"], c["inflation"])
+        for key, value in want.items():
+            assert close(table[key][-1], value, 1e-9, 1e-4), (key, c)
+
+
+@needs_numpy
+def test_post_tax_fv_vec_matches_post_tax_values(rng):
+    for _ in range(CASES//4):
+        c = random_plan(rng)
+        other_income, regime = rng.choice([0.0, rng.uniform(0, 3e6)]), rng.choice(list(ft.TAX_REGIMES))
+        net = ft.post_tax_values(c["sip"], c["years"], c["rate"], c["asset"], c["step_up"], c["start"],
+                                 c["inflation"], other_income, regime)[1][-1]
+        fast = float(ft.post_tax_fv_vec(c["sip"], c["rate"], c["step_up"], c["years"], c["asset"], c["start"],
+                                        c["inflation"], other_income, regime))
+        assert close(fast, net, 1e-9, 1e-3), c
+
+
+def random_withdrawal(rng):
+    # Up to ₹100 crore, well past the last kink of the slab table
+    return (rng.choice(list(ft.CAPITAL_GAINS)), rng.choice(list(ft.TAX_REGIMES)), rng.choice([0.0, rng.uniform(0, 3e6)]),
+            rng.choice([0.0, 1.0, rng.random()]), rng.choice([rng.uniform(0, 5e6), rng.uniform(0, 1e9)]))
+
+
+def test_withdrawal_gross_up_leaves_net_after_tax(rng):
+    for _ in range(CASES):
+        asset, regime, other_income, share, want = random_withdrawal(rng)
+        gross = ft.withdrawal_gross_up(want, share, asset, other_income, regime)
+        left = gross - ft.capital_gains_tax(gross*share, 0.0, asset, other_income, regime)
+        assert close(float(left), want, 1e-9, 1e-3), (want, share, asset, regime, other_income)
+
+
+@needs_numpy
+def test_withdrawal_gross_up_arrays_match_scalars(rng):
+    import numpy as np
+    for _ in range(CASES//10):
+        asset, regime, other_income, _share, _want = random_withdrawal(rng)
+        cases = [random_withdrawal(rng)[3:] for _ in range(20)]
+        share, want = (np.array(c) for c in zip(*cases))
+        got = ft.withdrawal_gross_up(want, share, asset, other_income, regime)
+        for k, (s, w) in enumerate(cases):
+            assert close(got[k], ft.withdrawal_gross_up(w, s, asset, other_income, regime)), (k, asset, regime)
+
+
+def test_fire_plan_reaches_post_tax_target(rng):
+    for _ in range(CASES//4):
+        exp, years = rng.uniform(1e4, 2e5), rng.randint(1, 35)
+        current, rate = rng.choice([0.0, rng.uniform(0, 2e7)]), rng.choice([0.0, rng.uniform(0.01, 15)])
+        asset, swr = rng.choice(ft.TAX_TREATMENTS), rng.uniform(2.5, 6)
+        data = ft.fire_summary(exp, current, years, rate, swr, asset)
+        if data["required_monthly"] > 0:
+            net = ft.post_tax_values(data["required_monthly"], years, rate, asset, start=current)[1][-1]
+            assert close(net, data["fire_target"], 1e-6, 1.0), (exp, current, years, rate, asset, swr)
+        if ft.NUMPY_AVAILABLE:
+            fast = float(ft.fire_required_sip_vec(exp, current, rate, years, asset, withdrawal_rate=swr))
+            assert close(fast, data["required_monthly"], 1e-6, 1e-2), (exp, current, years, rate, asset, swr)
@@ -0,0 +1,63 @@
+# Throughput floors for the vectorized paths, in evaluations per second; set well under what a
+# laptop manages so only a real regression (e.g. an accidental Python-level loop) trips them.
+import time
+
+import pytest
+
+import finance_toolkit as ft
+from reference import needs_numpy
+
+pytestmark = needs_numpy
+
+FLOORS = {
+    "step_up_fv_vec": 2e6,
+    "post_tax_fv_vec": 2e5,
+    "fire_required_sip_vec": 2e4,
+    "xirr_batch": 2e4,
+    "simulate_portfolios": 2e5,   # path-months
+}
+
+
+def rate_of(count, fn):
+    t0 = time.perf_counter()
+    fn()
+    return count/max(time.perf_counter() - t0, 1e-9)
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    import numpy as np
+    n = 1 << 20
+    return {"n": n, "sip": np.full(n, 5000.0), "rate": np.linspace(0, 20, n),
+            "step_up": np.linspace(0, 15, n), "years": np.full(n, 25.0)}
+
+
+def test_step_up_fv_vec(inputs):
+    x = inputs
+    assert rate_of(x["n"], lambda: ft.step_up_fv_vec(x["sip"], x["rate"], x["step_up"], x["years"])) \
+        >= FLOORS["step_up_fv_vec"]
+
+
+def test_post_tax_fv_vec(inputs):
+    m = inputs["n"] >> 2
+    x = {k: v[:m] for k, v in inputs.items() if k != "n"}
+    assert rate_of(m, lambda: ft.post_tax_fv_vec(x["sip"], x["rate"], x["step_up"], x["years"], "Debt",
+                                                 0.0, 5.0, 1e6)) >= FLOORS["post_tax_fv_vec"]
+
+
+def test_fire_required_sip_vec(inputs):
+    m = 1 << 14
+    assert rate_of(m, lambda: ft.fire_required_sip_vec(5e4, 1e6, inputs["rate"][:m], inputs["years"][:m],
+                                                       "Equity")) >= FLOORS["fire_required_sip_vec"]
+
+
+def test_xirr_batch(rng):
+    import numpy as np
+    flows = np.array([[-1000.0]*23 + [rng.uniform(3e4, 6e4)] for _ in range(1 << 14)])
+    assert rate_of(len(flows), lambda: ft.xirr_batch(flows, np.arange(24)/12)) >= FLOORS["xirr_batch"]
+
+
+def test_simulate_portfolios():
+    assert rate_of(2000*240, lambda: ft.simulate_portfolios(
+        [[0.6, 0.3, 0.1]], [12, 7, 8], [18, 3, 15], 10000, 20, paths=2000, seed=1)) \
+        >= FLOORS["simulate_portfolios"]
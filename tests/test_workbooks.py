@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+import finance_toolkit as ft
+
+pytestmark = pytest.mark.skipif(not ft.OPENPYXL_AVAILABLE, reason="openpyxl not installed")
+
+
+def test_client_filenames_are_unique():
+    taken = set()
+    names = [ft.client_filename(c, i, taken) for i, c in enumerate(
+        [{"name": "A. Rao"}, {"name": "a. rao"}, {"name": "A. Rao"}, {}, {"name": "Client_4"}])]
+    assert names == ["A. Rao.xlsx", "a. rao_2.xlsx", "A. Rao_3.xlsx", "Client_4.xlsx", "Client_4_2.xlsx"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bad_client_is_reported_and_the_batch_goes_on(tmp_path, workers):
+    clients = [{"name": "A", "loan": {"principal": 1e6, "rate": 9, "years": 10}},
+               {"name": "A", "loan": {"principal": 1e6, "rate": 9, "tenure": 10}},
+               {"name": "A", "inflation": {"amount": 1e5, "rate": 6, "years": 10}}]
+    results = list(ft.write_client_workbooks(iter(clients), str(tmp_path), workers, charts=False))
+    assert [os.path.basename(p) for p, _ in results] == ["A.xlsx", "A_2.xlsx", "A_3.xlsx"]
+    assert [e is None for _, e in results] == [True, False, True]
+    assert results[1][1].startswith("TypeError")
+    assert sorted(os.listdir(tmp_path)) == ["A.xlsx", "A_3.xlsx"]